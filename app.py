@@ -1,9 +1,33 @@
+import os
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 from streamlit_gsheets import GSheetsConnection
+from cronograma.colors import COLOR_MAP_ESP, MODOS_COLOR, color_bars
+from cronograma.datasource import CachedTable, GSheetsSource, SnapshotStore, gspread_client
+from cronograma.export import to_tempfile, write_csv, write_xlsx
+from cronograma.filters import ESTADOS, TaskFilter, apply_editor_state, editor_slice, merge_slice
+from cronograma.gantt import build_gantt_frame, hide_subtrees
+from cronograma.headless import apply_schedule, compute
+from cronograma.incremental import ScheduleCache
+from cronograma.large_timeline import build_large_figure
+from cronograma.burnup_chart import build_burnup_figure
+from cronograma.load_chart import build_load_heatmap
+from cronograma.memo import ContentCache, schedule_fingerprint
+from cronograma.normalize import prepare_editor_frame
+from cronograma.portfolio import SOURCE_COLUMN, PortfolioTable
+from cronograma.profiling import StageTimer
+from cronograma.progress import FRECUENCIAS, PORTAFOLIO, ProgressLog, earned_value
+from cronograma.report import build_report
+from cronograma.resources import assignee_index, resource_load
+from cronograma.shared import ConflictError, PartialWriteError, SharedTable
+from cronograma.scenarios import (
+    CAMPOS, SIN_DEPENDENCIAS, Scenario, ScenarioLibrary, apply_scenario, baseline_frame, compare_projects, compare_tasks,
+)
+from cronograma.store import TaskStore
+from cronograma.summary import portfolio_aggregates
+from cronograma.timeline import build_timeline_figure
+from cronograma.workdays import WorkCalendar
 
 # Configuración de la página
 st.set_page_config(layout="wide")
@@ -12,33 +36,149 @@ st.title("Diagnóstico 25 Empresas")
 # === 1. CONFIGURA TU GOOGLE SHEET AQUÍ ===
 SHEET_URL = "https://docs.google.com/spreadsheets/d/1O8aZdaPzIiYDreFA_9yRdfjOd9oMRy2TpAnl3mDwTBY/edit" 
 TAB_NAME = "Sheet1" 
+# Una entrada por hoja (unidad de negocio): nombre -> (URL, pestaña).
+# Con varias hojas los Task ID se muestran como "Nombre::ID".
+HOJAS = {
+    "Principal": (SHEET_URL, TAB_NAME),
+}
+HILOS_CARGA = 8  # Hojas que se leen al mismo tiempo
+CACHE_TTL_SEGUNDOS = 60  # Tiempo antes de releer la hoja en segundo plano
+UMBRAL_MODO_GRANDE = 300  # Con más tareas el Gantt usa WebGL y pliega subtareas
+MEMO_MAX_ENTRADAS = 64  # Gráficos/reportes cacheados por huella del cronograma
+MEMO_MAX_MB = 256
+SEMANA_LABORAL = "1111100"  # Lunes a viernes (1 = día hábil)
+PROYECTOS_POR_PAGINA = 10  # Proyectos por página en el editor, el gráfico y el reporte
+HORAS_POR_DIA = 8  # Capacidad diaria de cada responsable para marcar sobreasignación
+ARCHIVO_FERIADOS = "feriados.csv"  # Fecha[,Responsable]; sin Responsable = feriado para todos
+ARCHIVO_SNAPSHOT = "cronograma_snapshot.sqlite"  # Copia local de la última lectura buena (None = desactivado)
+ARCHIVO_ESCENARIOS = "cronograma_escenarios.sqlite"  # Líneas base y escenarios guardados
+ARCHIVO_AVANCE = "cronograma_avance.sqlite"  # Fotos diarias de horas y % de avance (valor ganado)
+INTERVALO_AVISOS_SEGUNDOS = 15  # Cada cuánto revisa cada sesión si otras personas guardaron
+PERFIL_LOG = None  # Ruta de un .jsonl para registrar los tiempos por etapa de cada rerun
 # ============================================
 
-# Diccionario de colores
-COLOR_MAP_ESP = {
-    "Por defecto": "",
-    "Azul": "#4285F4",
-    "Rojo": "#EA4335",
-    "Verde": "#34A853",
-    "Amarillo": "#FBBC05",
-    "Naranja": "#FF6D01",
-    "Morado": "#8E24AA",
-    "Rosa": "#E91E63",
-    "Gris": "#9E9E9E",
-    "Cian": "#00BCD4"
-}
 opciones_color = list(COLOR_MAP_ESP.keys())
 
 conn = st.connection("gsheets", type=GSheetsConnection)
+
+@st.cache_resource
+def get_cliente_gspread():
+    # Con cuenta de servicio se guardan sólo las filas que cambiaron; sin ella, la hoja completa
+    try:
+        secretos = st.secrets["connections"]["gsheets"].to_dict()
+    except (KeyError, FileNotFoundError):
+        return None
+    return gspread_client(secretos)
+
+@st.cache_resource
+def get_tabla_tareas():
+    # Compartida entre sesiones y reruns: cada hoja se lee a lo sumo una vez por TTL.
+    # Con snapshot, el arranque en frío muestra la copia local mientras se lee la hoja.
+    snapshot = SnapshotStore(ARCHIVO_SNAPSHOT) if ARCHIVO_SNAPSHOT else None
+    cliente = get_cliente_gspread()
+    return PortfolioTable(
+        {
+            nombre: CachedTable(GSheetsSource(conn, url, pestana, cliente), ttl=CACHE_TTL_SEGUNDOS, snapshot=snapshot, name=nombre)
+            for nombre, (url, pestana) in HOJAS.items()
+        },
+        max_workers=HILOS_CARGA,
+    )
+
+tabla_tareas = get_tabla_tareas()
+
+@st.cache_resource
+def get_tabla_compartida():
+    # Copia de trabajo común a todas las sesiones: versión por fila, guardado con fusión y avisos
+    return SharedTable(tabla_tareas.save)
+
+tabla_compartida = get_tabla_compartida()
+
+@st.cache_resource
+def get_memo_salidas():
+    # LRU compartido de gráficos, resúmenes y reportes ya construidos
+    return ContentCache(max_entries=MEMO_MAX_ENTRADAS, max_bytes=MEMO_MAX_MB * 1024 * 1024)
+
+@st.cache_resource
+def get_calendario(version_archivo):
+    # Se vuelve a leer sólo cuando cambia la fecha de modificación del archivo
+    return WorkCalendar.from_file(ARCHIVO_FERIADOS, weekmask=SEMANA_LABORAL)
+
+@st.cache_resource
+def get_biblioteca():
+    return ScenarioLibrary(ARCHIVO_ESCENARIOS)
+
+biblioteca = get_biblioteca()
+
+@st.cache_resource
+def get_registro_avance():
+    return ProgressLog(ARCHIVO_AVANCE)
+
+registro_avance = get_registro_avance()
+
+calendario = get_calendario(os.path.getmtime(ARCHIVO_FERIADOS) if os.path.exists(ARCHIVO_FERIADOS) else None)
+
 hoy = datetime.today().date()
 default_start = pd.to_datetime(hoy)
 
+# Modo depuración: tiempo, filas y pico de memoria de cada etapa de este rerun
+modo_depuracion = st.sidebar.toggle("🐞 Modo depuración", help="Muestra cuánto tarda cada etapa de la app.")
+perfil = StageTimer(memoria=modo_depuracion)
+
+# Cada sesión recibe en su buzón las tareas que otras guardaron
+if st.session_state.get("suscripcion") is None or st.session_state["suscripcion"].table is not tabla_compartida:
+    st.session_state["suscripcion"] = tabla_compartida.subscribe()
+suscripcion = st.session_state["suscripcion"]
+clave_editor = f"editor_tareas_{st.session_state.setdefault('editor_gen', 0)}"
+
+def ediciones_pendientes():
+    # También cuentan las que se pasaron a la tabla al cambiar de filtro o de página
+    cambios = st.session_state.get(clave_editor) or {}
+    return bool(
+        st.session_state.get('ediciones_fusionadas')
+        or cambios.get("edited_rows") or cambios.get("added_rows") or cambios.get("deleted_rows")
+    )
+
+def conservar_ediciones():
+    # Antes de que cambie el corte del editor, lo editado pasa a la tabla completa;
+    # el editor vuelve a empezar con otra llave y se guarda todo junto después
+    cambios = st.session_state.get(clave_editor) or {}
+    if not (cambios.get("edited_rows") or cambios.get("added_rows") or cambios.get("deleted_rows")):
+        return
+    corte, etiquetas = st.session_state['corte_editor']
+    editado = apply_editor_state(corte, cambios)
+    st.session_state['tasks'] = editado if etiquetas is None else merge_slice(st.session_state['tasks'], etiquetas, editado)
+    st.session_state['ediciones_fusionadas'] = True
+    st.session_state['editor_gen'] += 1
+
 # 2. Lógica de Base de Datos y Limpieza
 try:
-    df = conn.read(spreadsheet=SHEET_URL, worksheet=TAB_NAME, ttl=0)
-    df = df.dropna(how="all") 
+    with perfil.stage("lectura") as etapa:
+        # La versión se toma antes de leer: si cambia en medio sólo cuesta una comparación más
+        version_fuente = tabla_tareas.version
+        df = tabla_tareas.get()
+        df = df.dropna(how="all") 
+        etapa["filas"] = len(df)
+
+    sin_conexion = tabla_tareas.offline_sources
+    if sin_conexion:
+        hojas_txt = f" ({', '.join(sin_conexion)})" if len(HOJAS) > 1 else ""
+        st.warning(
+            f"🔌 Modo sin conexión{hojas_txt}: se muestra la copia local del "
+            f"{tabla_tareas.snapshot_at:%d/%m/%Y %H:%M} UTC. Puedes revisar el cronograma, pero no guardar cambios."
+            if tabla_tareas.snapshot_at is not None else
+            f"🔌 Modo sin conexión{hojas_txt}: se muestra la última lectura. Puedes revisar el cronograma, pero no guardar cambios."
+        )
+    elif tabla_tareas.snapshot_at is not None:
+        st.caption(f"Mostrando la copia local del {tabla_tareas.snapshot_at:%d/%m/%Y %H:%M} UTC mientras se sincroniza con Google Sheets…")
+
+    if tabla_tareas.errors:
+        st.warning("No se pudieron leer algunas hojas: " + "; ".join(f"{nombre} ({e})" for nombre, e in tabla_tareas.errors.items()))
     
-    if df.empty:
+    if df.empty and st.session_state.get('ediciones_fusionadas'):
+        pass  # El ejemplo ya tiene ediciones que se pasaron a la tabla
+    elif df.empty:
+        st.session_state['base_tasks'] = None
+        st.session_state['base_revision'] = tabla_compartida.current.revision
         st.session_state['tasks'] = pd.DataFrame([
             {"Task ID": "T1", "Parent Task ID": None, "Project Name": "Proyecto Alfa", "Task Name": "Fase de Desarrollo", "Depends On": None, "Duration (Days)": 7, "Start Date": hoy, "Horas Invertidas": 0, "Responsable(s)": "Equipo Tech", "Notas Extra": "", "Color": "Gris"},
             {"Task ID": "T2", "Parent Task ID": "T1", "Project Name": "Proyecto Alfa", "Task Name": "Frontend", "Depends On": None, "Duration (Days)": 3, "Start Date": hoy, "Horas Invertidas": 40, "Responsable(s)": "Carlos M.", "Notas Extra": "", "Color": "Azul"},
@@ -47,38 +187,94 @@ try:
             {"Task ID": "T5", "Parent Task ID": None, "Project Name": "Proyecto Beta", "Task Name": "Reunión Flash", "Depends On": None, "Duration (Days)": 1, "Start Date": hoy + pd.Timedelta(days=10), "Horas Invertidas": 2, "Responsable(s)": "Todos", "Notas Extra": "Tarea de 1 solo día", "Color": "Amarillo"},
         ])
     else:
-        for col in ["Notas Extra", "Parent Task ID", "Responsable(s)"]:
-            if col not in df.columns: df[col] = ""
-            
-        if "Horas Invertidas" not in df.columns: df["Horas Invertidas"] = 0
-        if "Duration (Days)" not in df.columns: df["Duration (Days)"] = 1
-        
-        if "Color" not in df.columns:
-            df["Color"] = "Por defecto"
-        else:
-            df["Color"] = df["Color"].apply(lambda x: x if x in opciones_color else "Por defecto")
-            
-        for col in ["Task ID", "Parent Task ID", "Project Name", "Task Name", "Responsable(s)", "Notas Extra", "Depends On"]:
-            if col in df.columns:
-                df[col] = df[col].astype(str).replace(["nan", "None", "NaN"], None)
-                
-        if "Horas Invertidas" in df.columns:
-            df["Horas Invertidas"] = pd.to_numeric(df["Horas Invertidas"], errors='coerce').fillna(0)
-            
-        if "Duration (Days)" in df.columns:
-            df["Duration (Days)"] = pd.to_numeric(df["Duration (Days)"], errors='coerce').fillna(1).astype(int)
-            
-        if "Start Date" in df.columns:
-            df["Start Date"] = pd.to_datetime(df["Start Date"], errors='coerce').dt.date
-            
-        st.session_state['tasks'] = df
+        # Sólo se normaliza y compara si la hoja trae una versión nueva
+        with perfil.stage("normalizacion", filas=len(df)):
+            compartida = tabla_compartida.sync(version_fuente, lambda: prepare_editor_frame(df, opciones_color))
+        if st.session_state.get('base_tasks') is None or not ediciones_pendientes():
+            # Sin ediciones en curso el editor sigue a la copia compartida; con ediciones
+            # se queda en su revisión (las filas no se corren) y se fusiona al guardar
+            st.session_state['tasks'] = compartida.frame
+            st.session_state['base_tasks'] = compartida.frame
+            st.session_state['base_revision'] = compartida.revision
+            suscripcion.drain()
+        # Primera visita del día: foto de horas y % de avance para el valor ganado
+        if registro_avance.last_day() != pd.Timestamp(hoy):
+            registro_avance.record_table(hoy, compartida.frame)
 
 except Exception as e:
     st.error(f"Error de conexión con Google Sheets: {e}")
+    perfil.finish()
     st.stop()
 
+# === FILTROS DE VISTA ===
+# El cálculo siempre es del portafolio completo; los filtros sólo recortan lo que se dibuja
+tareas = st.session_state['tasks']
+st.sidebar.header("🔎 Filtros")
+filtro_proyectos = st.sidebar.multiselect(
+    "Proyecto", sorted(tareas["Project Name"].dropna().astype(str).unique()), on_change=conservar_ediciones
+)
+filtro_estados = st.sidebar.multiselect("Estado", ESTADOS)
+filtro_responsables = st.sidebar.multiselect(
+    "Responsable", list(assignee_index(tareas["Responsable(s)"])[2]), on_change=conservar_ediciones
+)
+ventana = st.sidebar.date_input("Ventana de fechas", value=(), format="YYYY-MM-DD")
+filtro = TaskFilter(
+    filtro_proyectos, filtro_estados, filtro_responsables,
+    desde=ventana[0] if len(ventana) > 0 else None,
+    hasta=ventana[1] if len(ventana) > 1 else None,
+    por_pagina=PROYECTOS_POR_PAGINA,
+)
+paginas = filtro.pages(tareas)
+if len(paginas) > 1:
+    filtro.pagina = st.sidebar.number_input(
+        f"Página (de {len(paginas)})", min_value=1, max_value=len(paginas), value=1, step=1, on_change=conservar_ediciones
+    )
+    st.sidebar.caption("Proyectos en esta página: " + ", ".join(paginas[filtro.pagina - 1]))
+proyectos_pagina = filtro.page_projects(tareas)
+
+# === ESCENARIOS Y LÍNEA BASE DEL GRÁFICO ===
+st.sidebar.header("🔀 Escenarios")
+escenarios = {e.nombre: e for e in biblioteca.scenarios()}
+lineas_base = biblioteca.baselines()
+nombre_escenario = st.sidebar.selectbox("Escenario en el gráfico", [None, *escenarios], format_func=lambda n: n or "Plan actual")
+nombre_linea_base = st.sidebar.selectbox(
+    "Línea base", [None, *lineas_base],
+    format_func=lambda n: f"{n} ({lineas_base[n]:%d/%m/%Y})" if n else ("Plan actual" if nombre_escenario else "Ninguna"),
+    help="Se dibuja como barra fantasma bajo cada tarea, con el desvío en días hábiles.",
+)
+escenario = escenarios.get(nombre_escenario)
+modo_color = st.sidebar.selectbox(
+    "🎨 Colorear barras por", list(MODOS_COLOR), format_func=MODOS_COLOR.get,
+    help="El gráfico dibuja una traza por color, así que cualquier modo se mantiene liviano.",
+)
+
 st.write("### 1. Edita el Calendario de Proyectos")
 
+@st.fragment(run_every=INTERVALO_AVISOS_SEGUNDOS)
+def avisos_de_cambios():
+    # Sin ediciones en curso se recarga la app (sólo se recalculan las tareas que cambiaron)
+    cambios = suscripcion.pending()
+    if cambios is not None and not cambios:
+        return
+    if not ediciones_pendientes():
+        st.rerun(scope="app")
+    cuantas = "toda la tabla" if cambios is None else f"{len(cambios)} tarea(s)"
+    st.info(f"🔄 Otras personas guardaron cambios en {cuantas} mientras editabas. Al guardar se fusionan con los tuyos celda por celda.")
+
+avisos_de_cambios()
+
+mascara_editor = filtro.editor_mask(tareas)
+editor_recortado = not mascara_editor.all()
+if editor_recortado:
+    tareas_editor, etiquetas_editor = editor_slice(tareas, mascara_editor)
+    st.caption(
+        f"Mostrando {len(tareas_editor)} de {len(tareas)} filas. Al cambiar de filtro o de página "
+        "lo editado se conserva hasta que guardes."
+    )
+else:
+    tareas_editor, etiquetas_editor = tareas, None
+st.session_state['corte_editor'] = (tareas_editor, etiquetas_editor)
+
 # 3. Editor de Datos PRINCIPAL
 orden_columnas = [
     "Task ID", 
@@ -89,544 +285,408 @@ orden_columnas = [
     "Duration (Days)", 
     "Start Date",
     "Horas Invertidas",
+    "% Avance",
     "Responsable(s)",
     "Notas Extra", 
     "Color" 
 ]
+if len(HOJAS) > 1:
+    orden_columnas.insert(0, SOURCE_COLUMN)
 
-edited_df = st.data_editor(
-    st.session_state['tasks'], 
-    num_rows="dynamic", 
-    width="stretch",
-    column_order=orden_columnas, 
-    column_config={
-        "Task ID": st.column_config.TextColumn("Task ID", required=True),
-        "Parent Task ID": st.column_config.TextColumn("Parent Task ID (Padre)"),
-        "Project Name": st.column_config.TextColumn("Project Name", required=True), 
-        "Task Name": st.column_config.TextColumn("Task Name", required=True),
-        "Depends On": st.column_config.TextColumn("Depends On (Task ID)"),
-        "Duration (Days)": st.column_config.NumberColumn("Duración (Días)", min_value=1, step=1, required=True),
-        "Start Date": st.column_config.DateColumn("Start Date", format="YYYY-MM-DD"),
-        "Horas Invertidas": st.column_config.NumberColumn("Horas Invertidas", min_value=0),
-        "Responsable(s)": st.column_config.TextColumn("Responsables"),
-        "Notas Extra": st.column_config.TextColumn("Notas Extra"), 
-        "Color": st.column_config.SelectboxColumn(
-            "Color de Tarea", 
-            options=opciones_color,
-            default="Por defecto"
-        ),
-    }
-)
+with perfil.stage("editor", filas=len(tareas_editor)):
+    edited_df = st.data_editor(
+        tareas_editor, 
+        key=clave_editor,
+        num_rows="dynamic", 
+        width="stretch",
+        column_order=orden_columnas, 
+        column_config={
+            "Task ID": st.column_config.TextColumn("Task ID", required=True),
+            "Parent Task ID": st.column_config.TextColumn("Parent Task ID (Padre)"),
+            "Project Name": st.column_config.TextColumn("Project Name", required=True), 
+            "Task Name": st.column_config.TextColumn("Task Name", required=True),
+            "Depends On": st.column_config.TextColumn(
+                "Depends On (Task ID)",
+                help="Una o varias separadas por comas. Tipo (FS, SS, FF, SF) y desfase en días opcionales: T3, T5 SS+2, T7 FF-1",
+            ),
+            "Duration (Days)": st.column_config.NumberColumn("Duración (Días hábiles)", min_value=1, step=1, required=True),
+            "Start Date": st.column_config.DateColumn("Start Date", format="YYYY-MM-DD"),
+            "Horas Invertidas": st.column_config.NumberColumn("Horas Invertidas", min_value=0),
+            "% Avance": st.column_config.NumberColumn("% Avance", min_value=0, max_value=100, step=5, format="%d%%"),
+            "Responsable(s)": st.column_config.TextColumn("Responsables"),
+            "Notas Extra": st.column_config.TextColumn("Notas Extra"), 
+            "Color": st.column_config.SelectboxColumn(
+                "Color de Tarea", 
+                options=opciones_color,
+                default="Por defecto"
+            ),
+            SOURCE_COLUMN: st.column_config.SelectboxColumn("Hoja", options=list(HOJAS)),
+        }
+    )
+    if editor_recortado:
+        # Lo editado en el corte vuelve a la tabla completa antes del cálculo y del guardado
+        edited_df = merge_slice(tareas, etiquetas_editor, edited_df)
 
 # === 4. LÓGICA DE CÁLCULO DINÁMICO ===
-calculated_data = {}
+store = TaskStore()
 
 try:
-    for index, row in edited_df.iterrows():
-        if pd.isna(row["Task ID"]) or str(row["Task ID"]).strip() in ["None", ""]:
-            continue
-            
-        t_id = str(row["Task ID"]).strip()
-        t_parent_raw = row.get("Parent Task ID")
-        t_parent = str(t_parent_raw).strip() if pd.notna(t_parent_raw) and str(t_parent_raw) not in ["None", "nan", "NaN", ""] else None
-        
-        t_project = str(row["Project Name"]).strip() if pd.notna(row["Project Name"]) and str(row["Project Name"]) != "None" else "Sin Proyecto"
-        t_task = str(row["Task Name"]).strip()
-        t_resp = str(row.get("Responsable(s)", "")).strip() if pd.notna(row.get("Responsable(s)")) else ""
-        
-        raw_horas = row.get("Horas Invertidas", 0)
-        t_horas = float(raw_horas) if pd.notna(raw_horas) and str(raw_horas).strip() != "" else 0.0
-        
-        t_notas = str(row.get("Notas Extra", "")).strip() if pd.notna(row.get("Notas Extra")) else ""
-        t_color_raw = str(row.get("Color", "Por defecto")).strip()
-        
-        t_pre_raw = row["Depends On"]
-        t_pre = str(t_pre_raw).strip() if pd.notna(t_pre_raw) and str(t_pre_raw) not in ["None", "nan", "NaN", ""] else ""
-        
-        t_manual_start = pd.to_datetime(row["Start Date"]) if pd.notna(row["Start Date"]) and row["Start Date"] != "" else None
-        
-        try:
-            t_duration = int(row["Duration (Days)"])
-        except (ValueError, TypeError):
-            t_duration = 1
-            
-        calculated_data[t_id] = {
-            "Task ID": t_id,
-            "Parent Task ID": t_parent,
-            "Project Name": t_project,
-            "Task Name": t_task,
-            "Responsable(s)": t_resp,
-            "Horas Invertidas": t_horas,
-            "Notas Extra": t_notas,
-            "Color_Raw": t_color_raw, 
-            "Manual_Start": t_manual_start,
-            "Manual_Duration": max(1, t_duration),
-            "Depends_On_ID": t_pre, 
-            "Dependency Info": "",
-            "Original_Start": None,
-            "Original_Finish": None,
-            "Duration": 0
-        }
+    if "schedule_cache" not in st.session_state:
+        st.session_state["schedule_cache"] = ScheduleCache(opciones_color)
 
-    visited = set()
-    resolving = set()
-    
-    def compute_dates(tid):
-        if tid in visited:
-            return calculated_data[tid]["Original_Start"], calculated_data[tid]["Original_Finish"]
-        if tid in resolving:
-            s = calculated_data[tid]["Manual_Start"] if calculated_data[tid]["Manual_Start"] else default_start
-            dur = calculated_data[tid]["Manual_Duration"]
-            return s, s + pd.Timedelta(days=dur)
-            
-        resolving.add(tid)
-        data = calculated_data[tid]
-        
-        hijos = [h_id for h_id, h_data in calculated_data.items() if h_data["Parent Task ID"] == tid]
-        
-        if hijos:
-            # === TAREA PADRE ===
-            min_s, max_f = None, None
-            horas_totales = 0
-            resps = set()
-            
-            for h in hijos:
-                c_s, c_f = compute_dates(h)
-                
-                if min_s is None or c_s < min_s: min_s = c_s
-                if max_f is None or c_f > max_f: max_f = c_f
-                
-                horas_totales += calculated_data[h]["Horas Invertidas"]
-                if calculated_data[h]["Responsable(s)"]:
-                    for r in str(calculated_data[h]["Responsable(s)"]).split(","):
-                        if r.strip(): resps.add(r.strip())
-            
-            s = min_s if min_s else default_start
-            f = max_f if max_f else (s + pd.Timedelta(days=1))
-            dur = max(1, (f - s).days)
-            
-            calculated_data[tid]["Original_Start"] = s
-            calculated_data[tid]["Original_Finish"] = f
-            calculated_data[tid]["Duration"] = dur
-            calculated_data[tid]["Horas Invertidas"] = horas_totales
-            
-            if not data["Responsable(s)"]:
-                calculated_data[tid]["Responsable(s)"] = ", ".join(list(resps))
-                
-            calculated_data[tid]["Dependency Info"] = "Tarea Padre 📂"
-            
-        else:
-            # === TAREA HIJA / INDEPENDIENTE ===
-            dep_id = data["Depends_On_ID"]
-            manual_s = data["Manual_Start"]
-            dur = data["Manual_Duration"]
-            
-            if dep_id and dep_id in calculated_data:
-                _, dep_f = compute_dates(dep_id)
-                s = dep_f # INICIA EXACTAMENTE AL TERMINAR SU DEPENDENCIA
-                calculated_data[tid]["Dependency Info"] = f"Depende de: {dep_id} 🔗"
-            else:
-                s = manual_s if manual_s else default_start
-                calculated_data[tid]["Dependency Info"] = "Independiente 🟢"
-                
-            f = s + pd.Timedelta(days=dur)
-            
-            calculated_data[tid]["Original_Start"] = s
-            calculated_data[tid]["Original_Finish"] = f
-            calculated_data[tid]["Duration"] = dur
-            
-        resolving.remove(tid)
-        visited.add(tid)
-        return calculated_data[tid]["Original_Start"], calculated_data[tid]["Original_Finish"]
-        
-    for tid in calculated_data:
-        compute_dates(tid)
-        
-    padres_ids = set([data["Parent Task ID"] for t_id, data in calculated_data.items() if data["Parent Task ID"]])
-
-    def get_root_task(task_id, visited_nodes=None):
-        if visited_nodes is None: visited_nodes = set()
-        if task_id in visited_nodes: return task_id 
-        visited_nodes.add(task_id)
-        if task_id not in calculated_data: return task_id
-        pred_id = calculated_data[task_id].get("Depends_On_ID", "")
-        if not pred_id or pred_id not in calculated_data: return task_id
-        if calculated_data[task_id]["Parent Task ID"] != calculated_data[pred_id]["Parent Task ID"]: return task_id
-        return get_root_task(pred_id, visited_nodes)
-
-    for tid, data in calculated_data.items():
-        if data["Parent Task ID"]: 
-            root_id = get_root_task(tid)
-            calculated_data[tid]["Root_ID"] = root_id
-            if root_id in calculated_data:
-                root_name = calculated_data[root_id]["Task Name"]
-                calculated_data[tid]["Track_Name"] = f"   ↳ Ruta: {root_name}"
-            else:
-                calculated_data[tid]["Track_Name"] = f"   ↳ Subtareas"
+    with perfil.stage("calculo", filas=len(edited_df)):
+        store, resultado = st.session_state["schedule_cache"].update(edited_df, default_start, calendario)
+    padres_ids = resultado.padres_ids
+
+    duplicadas = [r for r in st.session_state["schedule_cache"].rejected if r["Task ID"] is not None]
+    if duplicadas:
+        st.warning("Filas ignoradas: " + "; ".join(f"fila {r['fila']} ({r['Task ID']}): {r['motivo']}" for r in duplicadas))
+
+    if resultado.cycles:
+        ciclos_txt = "; ".join(" → ".join(c) for c in resultado.cycles)
+        st.warning(f"Se detectaron ciclos de dependencias y se usó su fecha manual: {ciclos_txt}")
 
 except Exception as e:
     st.error(f"Error procesando relaciones: {e}")
 
-if st.button("💾 Guardar Cambios en Google Sheets"):
+def mostrar_enviadas(deltas):
+    for nombre, delta in deltas.items():
+        if delta is not None:
+            hoja = f"{nombre}: " if len(HOJAS) > 1 else ""
+            st.caption(f"{hoja}Filas enviadas: {len(delta.changed)} modificadas, {len(delta.inserted)} nuevas, {len(delta.deleted)} borradas.")
+
+if st.button("💾 Guardar Cambios en Google Sheets", disabled=bool(sin_conexion), help="Sin conexión: sólo lectura" if sin_conexion else None):
     try:
-        df_to_save = edited_df.copy()
-        for index, row in df_to_save.iterrows():
-            t_id = str(row["Task ID"]).strip()
-            if t_id in calculated_data:
-                df_to_save.at[index, "Start Date"] = calculated_data[t_id]["Original_Start"].date()
-                if calculated_data[t_id]["Dependency Info"] == "Tarea Padre 📂":
-                    df_to_save.at[index, "Duration (Days)"] = calculated_data[t_id]["Duration"]
-                    df_to_save.at[index, "Horas Invertidas"] = calculated_data[t_id]["Horas Invertidas"]
-                    
-        # Limpiar End Date si quedo del intento anterior
-        if "End Date" in df_to_save.columns:
-            df_to_save = df_to_save.drop(columns=["End Date"])
-
-        conn.update(spreadsheet=SHEET_URL, worksheet=TAB_NAME, data=df_to_save)
+        def _finalizar(tabla):
+            # Si nadie más guardó se reutiliza el cálculo de esta sesión; si no, se recalcula lo fusionado
+            if tabla is edited_df:
+                return apply_schedule(edited_df, store, padres_ids)
+            return compute(tabla, default_start, calendario, opciones_color).scheduled_table()
+
+        # Lo editado se fusiona con lo que otros guardaron desde que se cargó; sólo se envían las filas que cambiaron
+        with perfil.stage("guardado", filas=len(edited_df)):
+            revision, deltas, conflictos = tabla_compartida.commit(
+                st.session_state.get('base_revision'), st.session_state.get('base_tasks'), edited_df, _finalizar
+            )
         st.success("¡Base de datos actualizada! Todas las fechas encajan perfectamente a través de la duración.")
+        if conflictos:
+            st.warning(f"{len(conflictos)} cambio(s) no se guardaron porque otra persona cambió lo mismo mientras editabas:")
+            st.dataframe(pd.DataFrame(conflictos).astype(str), hide_index=True)
+        mostrar_enviadas(deltas)
+        # El editor vuelve a empezar desde lo guardado en el próximo rerun
+        st.session_state['editor_gen'] += 1
+        st.session_state['ediciones_fusionadas'] = False
+        st.session_state['base_revision'] = revision
+        suscripcion.drain()
+        registro_avance.record_table(hoy, tabla_compartida.current.frame)
         st.cache_data.clear() 
+    except ConflictError as e:
+        st.error(f"No se guardó: {e}")
+    except PartialWriteError as e:
+        # Lo guardado ya está en la copia compartida; el editor conserva lo demás para reintentar
+        mostrar_enviadas(e.written)
+        st.error(f"No se guardaron algunas hojas: {e}. Lo demás sí quedó guardado; vuelve a guardar para reintentar.")
     except Exception as e:
         st.error(f"Error al guardar: {e}")
 
 try:
-    final_tasks = []
     fecha_hoy_segura = pd.to_datetime(hoy)
-    
-    for t_id, data in calculated_data.items():
-        o_start = data["Original_Start"]
-        o_finish = data["Original_Finish"]
-        
-        if o_start.date() < hoy and o_finish.date() > hoy:
-            final_tasks.append({**data, "Start": o_start, "Finish": fecha_hoy_segura, "Status": "Pasado", "Hide_Label": True})
-            final_tasks.append({**data, "Start": fecha_hoy_segura, "Finish": o_finish, "Status": "Activo", "Hide_Label": False})
-        elif o_finish.date() <= hoy:
-            final_tasks.append({**data, "Start": o_start, "Finish": o_finish, "Status": "Pasado", "Hide_Label": False})
-        else:
-            final_tasks.append({**data, "Start": o_start, "Finish": o_finish, "Status": "Activo", "Hide_Label": False})
-            
-    final_df = pd.DataFrame(final_tasks)
-    
-    if not final_df.empty:
-        # Generar espacio visual restando unas horitas al grafico (solo visual)
-        def adjust_finish_for_plot(row):
-            if row["Finish"] == row["Original_Finish"]:
-                return row["Finish"] - pd.Timedelta(hours=3)
-            return row["Finish"]
-            
-        final_df["Plot_Finish"] = final_df.apply(adjust_finish_for_plot, axis=1)
-        
-        def get_sort_key(row_data):
-            p_id = row_data["Parent Task ID"]
-            t_id = row_data["Task ID"]
-            
-            if p_id and p_id in calculated_data:
-                parent_start = calculated_data[p_id]["Original_Start"].timestamp()
-                root_id = row_data.get("Root_ID", t_id)
-                if root_id in calculated_data:
-                    root_start = calculated_data[root_id]["Original_Start"].timestamp()
-                else:
-                    root_start = row_data['Original_Start'].timestamp()
-                return f"{parent_start}_1_{root_start}_{root_id}" 
-            elif t_id in padres_ids:
-                return f"{row_data['Original_Start'].timestamp()}_0_0_{t_id}"
-            else:
-                return f"{row_data['Original_Start'].timestamp()}_0_0_{t_id}"
-
-        final_df["Sort_Key"] = final_df.apply(get_sort_key, axis=1)
-        
-        # Orden Cronológico de Proyectos
-        project_starts = final_df.groupby("Project Name")["Original_Start"].min().to_dict()
-        final_df["Project_Min_Start"] = final_df["Project Name"].map(project_starts)
-        final_df = final_df.sort_values(by=["Project_Min_Start", "Project Name", "Sort_Key", "Original_Start"])
-        
-        def get_y_axis_name(row_data):
-            p_id = row_data["Parent Task ID"]
-            t_id = row_data["Task ID"]
-            
-            if p_id and p_id in calculated_data:
-                return row_data.get("Track_Name", f"   ↳ Subtareas")
-            elif t_id in padres_ids:
-                return f"📂 {row_data['Task Name']}"
-            else:
-                return row_data["Task Name"]
-
-        final_df["Llave_Secreta"] = final_df["Project Name"].astype(str) + "|||" + final_df.apply(get_y_axis_name, axis=1)
-        
-        # === TEXTO VISUAL DENTRO DE LA BARRA ===
-        final_df["Orig_Start_str"] = final_df["Original_Start"].dt.strftime('%d %b')
-        final_df["Display_Finish_str"] = (final_df["Original_Finish"] - pd.Timedelta(days=1)).dt.strftime('%d %b')
-        
-        def generar_label(x):
-            if x.get("Hide_Label", False): return ""
-            return (
-                f"<b>{x['Project Name']} - {x['Task Name']}</b><br>"
-                f"{x['Orig_Start_str']} a {x['Display_Finish_str']} - {x['Duration']} días<br>"
-                f"{x['Horas Invertidas']} hrs<br>"
-                f"{x['Responsable(s)']}"
+
+    # Gráfico, resumen y reporte se reutilizan mientras el cronograma no cambie
+    with perfil.stage("to_frame", filas=len(store)):
+        sched_df = store.to_frame()
+        huella = schedule_fingerprint(sched_df, hoy, calendario.signature())
+    memo = get_memo_salidas()
+
+    # El gráfico puede mostrar un escenario; resumen, carga y reporte son siempre del plan actual.
+    # Sólo se cachean frames: el escenario comparte registros con el store de la sesión.
+    with perfil.stage("escenario", filas=len(escenario or ())):
+        if escenario is not None:
+            gantt_sched_df = memo.get_or_build(
+                ("escenario", huella, escenario.signature()),
+                lambda: apply_scenario(store, resultado, escenario, default_start).to_frame(),
             )
+        else:
+            gantt_sched_df = sched_df
+        if nombre_linea_base is not None:
+            linea_base = memo.get_or_build(("linea_base", nombre_linea_base, lineas_base[nombre_linea_base]), lambda: biblioteca.load_baseline(nombre_linea_base))
+        else:
+            linea_base = baseline_frame(store) if escenario is not None else None
+    llave_gantt = (escenario.signature() if escenario else None, nombre_linea_base and (nombre_linea_base, lineas_base[nombre_linea_base]))
 
-        final_df["Label"] = final_df.apply(generar_label, axis=1)
-
-        # === TEXTO DEL HOVER (EL POPUP AL PASAR EL MOUSE) ===
-        nombres_tareas = {t_id: data["Task Name"] for t_id, data in calculated_data.items()}
-
-        def generar_hover(x):
-            dep_id = x.get("Depends_On_ID", "")
-            if dep_id and dep_id in nombres_tareas:
-                dep_text = nombres_tareas[dep_id]
-            elif x.get("Dependency Info", "") == "Tarea Padre 📂":
-                dep_text = "N/A (Es tarea padre)"
-            else:
-                dep_text = "Ninguna"
-
-            return (
-                f"<b>{x['Project Name']}</b><br>"
-                f"{x['Orig_Start_str']} - {x['Display_Finish_str']} - {x['Duration']} días transcurridos<br>"
-                f"Responsable: {x['Responsable(s)']}<br>"
-                f"Horas transcurridas: {x['Horas Invertidas']}<br>"
-                f"Depende de: {dep_text}"
+    with perfil.stage("gantt_frame") as etapa:
+        final_df = memo.get_or_build(
+            ("gantt", huella, llave_gantt),
+            lambda: build_gantt_frame(gantt_sched_df, fecha_hoy_segura, padres_ids, linea_base, calendario),
+        )
+        etapa["filas"] = len(final_df)
+
+    # Color final de cada barra sobre todo el portafolio: filtrar no cambia los colores
+    with perfil.stage("colores", filas=len(final_df)):
+        if not final_df.empty:
+            final_df = memo.get_or_build(
+                ("colores", huella, llave_gantt, modo_color),
+                lambda: color_bars(final_df, modo_color, COLOR_MAP_ESP, fecha_hoy_segura),
             )
-            
-        final_df["Hover_Text"] = final_df.apply(generar_hover, axis=1)
-        
-        final_df["Color_Key"] = final_df.apply(lambda row: f"{row['Task ID']} (Completado)" if row["Status"] == "Pasado" else row["Task ID"], axis=1)
-        
-        color_map = {} 
-        pastel_colors = px.colors.qualitative.Pastel
-        color_idx = 0
-        project_default_colors = {}
-        for p in final_df["Project Name"].unique():
-            project_default_colors[p] = pastel_colors[color_idx % len(pastel_colors)]
-            color_idx += 1
-            
-        for index, row in final_df.iterrows():
-            tid = row["Task ID"]
-            active_key = tid
-            past_key = f"{tid} (Completado)"
-            
-            if active_key not in color_map:
-                user_color = str(row.get("Color_Raw", "Por defecto")).strip()
-                if user_color != "Por defecto" and user_color in COLOR_MAP_ESP:
-                    base_color = COLOR_MAP_ESP[user_color]
-                else:
-                    base_color = project_default_colors.get(row["Project Name"], "#3366cc")
-                    
-                color_map[active_key] = base_color
-                
-                c_str = str(base_color).strip().lower()
-                try:
-                    if c_str.startswith('#'):
-                        hex_c = c_str.lstrip('#')
-                        if len(hex_c) == 3: hex_c = "".join([c*2 for c in hex_c])
-                        r, g, b = tuple(int(hex_c[i:i+2], 16) for i in (0, 2, 4))
-                    else:
-                        r, g, b = 150, 150, 150
-                    muted_color = f'rgba({r},{g},{b}, 0.3)'
-                except Exception:
-                    muted_color = "rgba(211,211,211, 0.3)"
-                
-                color_map[past_key] = muted_color
+
+    # Sólo las tareas visibles pasan a la figura y a la tabla
+    with perfil.stage("filtro", filas=len(sched_df)):
+        visibles = filtro.schedule_mask(gantt_sched_df, fecha_hoy_segura, proyectos_pagina)
+        if visibles.all():
+            llave_vista, vista_df = None, final_df
+        else:
+            llave_vista = filtro.signature()
+            vista_df = final_df[final_df["Task ID"].isin(gantt_sched_df.loc[visibles, "Task ID"])]
+        tareas_vista = int(visibles.sum())
+        # Valor ganado y reporte son del plan actual: con escenario las fechas (y la máscara) cambian
+        visibles_plan = visibles if gantt_sched_df is sched_df else filtro.schedule_mask(sched_df, fecha_hoy_segura, proyectos_pagina)
+        filtra_plan = not visibles_plan.all()
     
     st.write("---") 
     st.write("### 📊 Resumen del Portafolio")
     
+    # Una sola agregación por proyecto alimenta las métricas, el detalle y los hitos del gráfico
+    with perfil.stage("resumen", filas=len(store)):
+        agregados = memo.get_or_build(("resumen", huella), lambda: portfolio_aggregates(sched_df, hoy, padres_ids, calendario))
+        if escenario is not None:
+            agregados_gantt = memo.get_or_build(
+                ("resumen", huella, llave_gantt[0]), lambda: portfolio_aggregates(gantt_sched_df, hoy, padres_ids, calendario)
+            )
+        else:
+            agregados_gantt = agregados
+
     if not final_df.empty:
-        fecha_inicio_global = final_df["Original_Start"].min()
-        fecha_fin_global = final_df["Original_Finish"].max()
-        
-        dias_totales = (fecha_fin_global - fecha_inicio_global).days
-        dias_restantes = max(0, (fecha_fin_global.date() - hoy).days)
-        tareas_unicas = len([t for t, d in calculated_data.items() if t not in padres_ids])
-        total_horas = sum([d["Horas Invertidas"] for t, d in calculated_data.items() if t not in padres_ids])
-        
-        tareas_activas = 0
-        proyectos_stats = {}
-        
-        for t_id, data in calculated_data.items():
-            o_start = data["Original_Start"].date()
-            o_finish = data["Original_Finish"].date()
-            
-            if t_id not in padres_ids:
-                if o_start <= hoy < o_finish:
-                    tareas_activas += 1
-                    
-            proj = data["Project Name"]
-            if proj not in proyectos_stats:
-                proyectos_stats[proj] = {"inicio": o_start, "fin": o_finish}
-            else:
-                if o_start < proyectos_stats[proj]["inicio"]: proyectos_stats[proj]["inicio"] = o_start
-                if o_finish > proyectos_stats[proj]["fin"]: proyectos_stats[proj]["fin"] = o_finish
-                
-        proyectos_activos = sum(1 for p, dates in proyectos_stats.items() if dates["inicio"] <= hoy < dates["fin"])
-
-        col1, col2, col3, col4, col5, col6 = st.columns(6)
-        col1.metric("⏳ Duración Portafolio", f"{dias_totales} días")
-        col2.metric("📅 Días Restantes", f"{dias_restantes} días")
-        col3.metric("📝 Total de Tareas", tareas_unicas)
-        col4.metric("⏱️ Horas Totales", f"{total_horas} hrs")
-        col5.metric("🚀 Tareas Activas", tareas_activas)
-        col6.metric("📂 Proyectos Activos", proyectos_activos)
+        resumen = agregados.totals
+        col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
+        col1.metric("⏳ Duración Portafolio", f"{resumen['dias_totales']} días")
+        col2.metric("📅 Días Restantes", f"{resumen['dias_restantes']} días")
+        col3.metric("📝 Total de Tareas", resumen["tareas_unicas"])
+        col4.metric("⏱️ Horas Totales", f"{resumen['total_horas']} hrs")
+        col5.metric("🚀 Tareas Activas", resumen["tareas_activas"])
+        col6.metric("📂 Proyectos Activos", resumen["proyectos_activos"])
+        col7.metric("📈 Avance", f"{resumen['avance']:.0%}", help="Días hábiles transcurridos sobre el plazo de las tareas.")
+
+        with st.expander("Detalle por proyecto"):
+            st.dataframe(
+                agregados.projects, use_container_width=True, hide_index=True,
+                column_config={
+                    "Inicio": st.column_config.DateColumn("Inicio", format="DD/MM/YYYY"),
+                    "Fin": st.column_config.DateColumn("Fin", format="DD/MM/YYYY"),
+                    "Horas": st.column_config.NumberColumn("Horas", format="%.1f"),
+                    "Avance": st.column_config.ProgressColumn("Avance", min_value=0.0, max_value=1.0, format="percent"),
+                },
+            )
 
     st.write("### 2. Línea de Tiempo de Proyectos")
     
-    if not final_df.empty:
-        fig = px.timeline(
-            final_df, 
-            x_start="Start", 
-            x_end="Plot_Finish", 
-            y="Llave_Secreta", 
-            color="Color_Key", 
-            color_discrete_map=color_map, 
-            text="Label",
-            custom_data=["Hover_Text"] # Agregamos la columna que creamos para el tooltip
+    if escenario is not None:
+        st.caption(
+            f"Escenario «{escenario.nombre}» ({len(escenario)} cambio(s)); las barras grises son "
+            + (f"la línea base «{nombre_linea_base}»." if nombre_linea_base else "el plan actual.")
         )
-        
-        fig.update_traces(
-            textfont_size=12, 
-            textfont_color="black",
-            textposition='inside', 
-            insidetextanchor='middle',
-            hovertemplate="%{customdata[0]}<extra></extra>" # Inyecta el texto limpio sin la información default de Plotly
+    if llave_vista is not None:
+        st.caption(f"Vista filtrada: {tareas_vista} de {len(store)} tareas (incluye los padres de las tareas que coinciden).")
+
+    ids_vista = set(vista_df["Task ID"])
+    nombres_padres = {t_id: f"{store[t_id].project} - {store[t_id].name}" for t_id in padres_ids if t_id in ids_vista}
+
+    if not vista_df.empty and tareas_vista > UMBRAL_MODO_GRANDE:
+        st.caption(f"Portafolio grande ({tareas_vista} tareas): vista agrupada con WebGL; las subtareas se muestran dentro de su padre.")
+        expandidos = st.multiselect(
+            "Expandir subtareas de:",
+            options=sorted(nombres_padres, key=nombres_padres.get),
+            format_func=nombres_padres.get,
         )
-        
-        for trace in fig.data:
-            if getattr(trace, "y", None) is not None:
-                proyectos = [str(val).split("|||")[0] for val in trace.y]
-                tareas = [str(val).split("|||")[1] for val in trace.y]
-                trace.y = [proyectos, tareas] 
-                
-        hitos_unicos = set()
-        fechas_fin_proy = {}
-        for idx, row in final_df.iterrows():
-            p = row["Project Name"]
-            f = row["Original_Finish"]
-            t = row["Llave_Secreta"].split("|||")[1] 
-            if p not in fechas_fin_proy or f > fechas_fin_proy[p]["fecha"]:
-                fechas_fin_proy[p] = {"fecha": f, "tarea": t}
-                
-        for p, datos in fechas_fin_proy.items():
-            hitos_unicos.add((p, datos["tarea"], datos["fecha"]))
-            
-        for idx, row in final_df.iterrows():
-            if "Independiente" in row["Dependency Info"] and row["Task ID"] not in padres_ids:
-                hitos_unicos.add((row["Project Name"], row["Llave_Secreta"].split("|||")[1], row["Original_Finish"]))
-                
-        hitos_x = []
-        hitos_y_proy = []
-        hitos_y_tarea = []
-        
-        for p, t, f in hitos_unicos:
-            hitos_x.append(f)
-            hitos_y_proy.append(p)
-            hitos_y_tarea.append(t)
-            
-        fig.add_trace(go.Scatter(
-            x=hitos_x,
-            y=[hitos_y_proy, hitos_y_tarea],
-            mode='markers+text',
-            marker=dict(symbol='diamond', size=16, color='#D30000', line=dict(color='black', width=1.5)),
-            text=["Fin"] * len(hitos_x),
-            textposition="middle right",
-            textfont=dict(color="black", size=10, family="Arial"),
-            hoverinfo='skip',
-            showlegend=False
-        ))
-
-        fig.update_yaxes(
-            autorange="reversed", 
-            title_text="",
-            type="multicategory",
-            dividercolor="gray",  
-            dividerwidth=1        
+        with perfil.stage("figura", filas=len(vista_df)):
+            fig = memo.get_or_build(
+                ("figura_grande", huella, llave_gantt, modo_color, llave_vista, tuple(sorted(expandidos))),
+                lambda: build_large_figure(vista_df, hoy, agregados_gantt, expandidos),
+            )
+        with perfil.stage("plotly_chart", filas=len(vista_df)):
+            st.plotly_chart(fig, width="stretch", use_container_width=True)
+    elif not vista_df.empty:
+        contraidos = st.multiselect(
+            "Contraer subtareas de:",
+            options=sorted(nombres_padres, key=nombres_padres.get),
+            format_func=nombres_padres.get,
+        ) if nombres_padres else []
+        # Contraer un padre oculta todo su subárbol, a cualquier profundidad
+        figura_df = hide_subtrees(vista_df, contraidos) if contraidos else vista_df
+        with perfil.stage("figura", filas=len(figura_df)):
+            fig = memo.get_or_build(
+                ("figura", huella, llave_gantt, modo_color, llave_vista, tuple(sorted(contraidos))),
+                lambda: build_timeline_figure(figura_df, hoy, agregados_gantt),
+            )
+        with perfil.stage("plotly_chart", filas=len(figura_df)):
+            st.plotly_chart(fig, width="stretch", use_container_width=True)
+    elif not final_df.empty:
+        st.info("Ninguna tarea coincide con los filtros.")
+    else:
+        st.info("No hay tareas válidas para mostrar en el gráfico.")
+
+    st.write("### 🔀 Escenarios y Líneas Base")
+    with st.expander("¿Qué pasa si…? Escenarios, líneas base y comparación", expanded=False):
+        col_base, col_borrar_base = st.columns([3, 1])
+        nombre_nueva_base = col_base.text_input("Nombre de la línea base", value=f"Línea base {hoy:%d/%m/%Y}")
+        if col_base.button("📌 Guardar el plan actual como línea base", disabled=not len(store)):
+            biblioteca.save_baseline(nombre_nueva_base.strip() or f"Línea base {hoy:%d/%m/%Y}", store)
+            st.rerun()
+        if nombre_linea_base and col_borrar_base.button(f"🗑️ Borrar «{nombre_linea_base}»"):
+            biblioteca.delete_baseline(nombre_linea_base)
+            st.rerun()
+
+        st.write("**Escenarios**")
+        st.caption(
+            "Cada fila cambia una tarea: duración nueva, retraso (días hábiles que se suman), inicio o "
+            f"dependencias (\"{SIN_DEPENDENCIAS}\" las quita). Las celdas vacías no cambian nada. "
+            "Los padres se mueven a través de sus subtareas."
         )
-        fig.layout.yaxis.categoryarray = None 
-        
-        unique_llaves = final_df["Llave_Secreta"].unique()
-        proyectos_ordenados = [llave.split("|||")[0] for llave in unique_llaves]
-        
-        for i in range(1, len(proyectos_ordenados)):
-            if proyectos_ordenados[i] != proyectos_ordenados[i-1]:
-                fig.add_hline(
-                    y=i - 0.5, 
-                    line_width=1.5, 
-                    line_dash="dot", 
-                    line_color="gray", 
-                    opacity=0.6
+        editar = st.selectbox("Escenario a editar", [None, *escenarios], format_func=lambda n: n or "➕ Nuevo escenario")
+        nombre_editado = st.text_input("Nombre del escenario", value=editar or "", key=f"nombre_escenario_{editar}")
+        cambios_df = st.data_editor(
+            (escenarios[editar] if editar else Scenario("")).to_frame(),
+            key=f"cambios_escenario_{editar}",
+            num_rows="dynamic",
+            width="stretch",
+            column_config={
+                "Task ID": st.column_config.TextColumn("Task ID", required=True),
+                CAMPOS["duracion"]: st.column_config.NumberColumn(CAMPOS["duracion"], min_value=1, step=1),
+                CAMPOS["retraso"]: st.column_config.NumberColumn(CAMPOS["retraso"], step=1),
+                CAMPOS["inicio"]: st.column_config.DateColumn(CAMPOS["inicio"], format="YYYY-MM-DD"),
+                CAMPOS["depende"]: st.column_config.TextColumn(CAMPOS["depende"]),
+            },
+        )
+        col_guardar, col_borrar = st.columns(2)
+        if col_guardar.button("💾 Guardar escenario", disabled=not nombre_editado.strip()):
+            if editar and editar != nombre_editado.strip():
+                biblioteca.delete_scenario(editar)
+            biblioteca.save_scenario(Scenario.from_frame(nombre_editado.strip(), cambios_df))
+            st.rerun()
+        if editar and col_borrar.button(f"🗑️ Borrar escenario «{editar}»"):
+            biblioteca.delete_scenario(editar)
+            st.rerun()
+
+        if escenarios:
+            # Todos los escenarios lado a lado; cada uno ocupa sólo las tareas que cambió
+            def _etapa_comparacion():
+                calculados = [apply_scenario(store, resultado, e, default_start) for e in escenarios.values()]
+                ignoradas = {c.nombre: c.ignoradas for c in calculados if c.ignoradas}
+                return compare_projects(store, calculados, calendario), compare_tasks(store, calculados, calendario), ignoradas
+
+            with perfil.stage("comparacion", filas=len(escenarios)):
+                por_proyecto, por_tarea, ignoradas = memo.get_or_build(
+                    ("comparacion", huella, tuple(e.signature() for e in escenarios.values())), _etapa_comparacion
                 )
-        
-        fig.update_layout(
-            plot_bgcolor='white', 
-            height=max(450, len(final_df['Llave_Secreta'].unique()) * 100),
-            margin=dict(l=150, r=50),
-            showlegend=False 
-        ) 
-        
-        fig.update_xaxes(
-            type='date',
-            showgrid=True, 
-            gridcolor='lightgray', 
-            gridwidth=1,
-            tickformat="%d %b %Y"
+            for nombre, ids in ignoradas.items():
+                st.caption(f"«{nombre}»: se ignoraron {', '.join(map(str, ids))} (no existen o son tareas padre).")
+            fechas = {c: "DD/MM/YYYY" for c in por_proyecto.columns if c.startswith("Fin")}
+            st.write("Fin de cada proyecto (Δ en días hábiles contra el plan actual)")
+            st.dataframe(
+                por_proyecto, use_container_width=True, hide_index=True,
+                column_config={c: st.column_config.DateColumn(c, format=f) for c, f in fechas.items()},
+            )
+            st.write(f"Tareas que se mueven en algún escenario ({len(por_tarea)})")
+            st.dataframe(
+                por_tarea, use_container_width=True, hide_index=True,
+                column_config={c: st.column_config.DateColumn(c, format=f) for c, f in fechas.items()},
+            )
+
+    st.write("### 👥 Carga por Responsable")
+
+    with perfil.stage("carga", filas=len(store)):
+        carga = memo.get_or_build(("carga", huella), lambda: resource_load(sched_df, padres_ids, calendario))
+
+    if carga.empty:
+        st.info("No hay responsables asignados para calcular la carga.")
+    else:
+        sobreasignados = carga.overallocated(HORAS_POR_DIA)
+        if len(sobreasignados):
+            st.warning(
+                f"{sobreasignados['Responsable'].nunique()} responsable(s) con {len(sobreasignados)} "
+                f"día(s) por encima de {HORAS_POR_DIA} hrs."
+            )
+        with perfil.stage("figura_carga", filas=len(carga.people)):
+            fig_carga = memo.get_or_build(
+                ("figura_carga", huella, HORAS_POR_DIA), lambda: build_load_heatmap(carga, HORAS_POR_DIA, hoy)
+            )
+            st.plotly_chart(fig_carga, width="stretch", use_container_width=True)
+
+        with st.expander("Detalle de carga y sobreasignación"):
+            st.dataframe(carga.summary(HORAS_POR_DIA), use_container_width=True, hide_index=True)
+            if len(sobreasignados):
+                st.dataframe(
+                    sobreasignados.assign(Fecha=sobreasignados["Fecha"].dt.strftime("%d/%m/%Y")),
+                    use_container_width=True, hide_index=True,
+                )
+
+    st.write("### 📈 Avance y Valor Ganado")
+    st.caption(
+        f"Presupuesto (BAC) = días hábiles del plan × {HORAS_POR_DIA} hrs; EV = BAC × % de avance; AC = horas invertidas. "
+        "Se toma una foto de horas y avance al día y cada vez que se guarda."
+    )
+    col_frecuencia, col_proyecto_ev = st.columns(2)
+    frecuencia = col_frecuencia.selectbox("Periodo", list(FRECUENCIAS), index=1, format_func=FRECUENCIAS.get)
+    with perfil.stage("valor_ganado", filas=len(sched_df)):
+        base_ev = linea_base if nombre_linea_base is not None else None
+        valor_ganado = memo.get_or_build(
+            ("valor_ganado", huella, registro_avance.revision(), frecuencia, llave_gantt[1]),
+            lambda: earned_value(sched_df, padres_ids, registro_avance.history(hoy), hoy, frecuencia, HORAS_POR_DIA, calendario, base_ev),
         )
-        
-        hoy_ms = int(pd.Timestamp(hoy).timestamp() * 1000)
-        fecha_texto = hoy.strftime("%d/%m/%Y") 
-        
-        fig.add_vline(
-            x=hoy_ms, 
-            line_width=3, 
-            line_dash="dash", 
-            line_color="darkblue", 
-            annotation_text=f" HOY ({fecha_texto}) ", 
-            annotation_position="top right", 
-            annotation_font_color="darkblue",
-            annotation_font_size=14
+    proyecto_ev = col_proyecto_ev.selectbox("Curva de", [PORTAFOLIO, *valor_ganado.projects["Proyecto"]])
+
+    totales = valor_ganado.totals
+    col_bac, col_pv, col_ev, col_ac, col_spi, col_cpi = st.columns(6)
+    col_bac.metric("BAC", f"{totales['bac']:,.0f} hrs")
+    col_pv.metric("PV", f"{totales['pv']:,.0f} hrs")
+    col_ev.metric("EV", f"{totales['ev']:,.0f} hrs")
+    col_ac.metric("AC", f"{totales['ac']:,.0f} hrs")
+    col_spi.metric("SPI", "N/A" if pd.isna(totales["spi"]) else f"{totales['spi']:.2f}")
+    col_cpi.metric("CPI", "N/A" if pd.isna(totales["cpi"]) else f"{totales['cpi']:.2f}")
+
+    with perfil.stage("figura_avance", filas=len(valor_ganado.curves)):
+        fig_avance = memo.get_or_build(
+            ("figura_avance", huella, registro_avance.revision(), frecuencia, llave_gantt[1], proyecto_ev),
+            lambda: build_burnup_figure(valor_ganado.curves, proyecto_ev, hoy),
         )
-        
-        st.plotly_chart(fig, width="stretch", use_container_width=True)
-    else:
-        st.info("No hay tareas válidas para mostrar en el gráfico.")
+        st.plotly_chart(fig_avance, width="stretch", use_container_width=True)
+
+    with st.expander("Valor ganado por proyecto y por tarea"):
+        formato_ev = {
+            c: st.column_config.NumberColumn(c, format="%.1f") for c in ("BAC", "PV", "EV", "AC", "SV", "CV")
+        } | {
+            c: st.column_config.NumberColumn(c, format="%.2f") for c in ("SPI", "CPI")
+        } | {
+            c: st.column_config.ProgressColumn(c, min_value=0, max_value=1, format="percent") for c in ("% Plan", "% Avance")
+        }
+        st.dataframe(valor_ganado.projects, use_container_width=True, hide_index=True, column_config=formato_ev)
+        tareas_ev = valor_ganado.tasks[visibles_plan.to_numpy()] if filtra_plan else valor_ganado.tasks
+        st.dataframe(tareas_ev, use_container_width=True, hide_index=True, column_config=formato_ev)
 
     st.write("---")
     
     st.write("### 📋 Reporte Final Descargable")
     with st.expander("Haz clic aquí para ver y descargar el reporte completo", expanded=True):
-        
-        table_data = []
-        for t_id, data in calculated_data.items():
-            o_start = data["Original_Start"]
-            disp_finish = data["Original_Finish"] - pd.Timedelta(days=1)
-            
-            if data["Original_Finish"].date() <= hoy:
-                status = "Completado ✅"
-            elif o_start.date() > hoy:
-                status = "Pendiente ⏳"
-            else:
-                status = "En Proceso 🔵"
-                
-            table_data.append({
-                "ID": t_id,
-                "Parent Task ID": data["Parent Task ID"] if data["Parent Task ID"] else "-",
-                "Proyecto": data["Project Name"],
-                "Tarea": data["Task Name"],
-                "Responsable(s)": data["Responsable(s)"],
-                "Horas": data["Horas Invertidas"],
-                "Inicio": o_start.strftime("%d/%m/%Y"),
-                "Fin": disp_finish.strftime("%d/%m/%Y"), 
-                "Duración": f"{data['Duration']} días",
-                "Estado": status,
-                "Dependencia": data["Dependency Info"].replace("🔗", "").replace("🟢", "").replace("📂", "").strip(),
-                "Notas Extra": data["Notas Extra"]
-            })
-        
-        df_table = pd.DataFrame(table_data)
-        
-        st.dataframe(df_table, use_container_width=True, hide_index=True)
-        
-        csv = df_table.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Descargar Reporte Completo (Excel / CSV)",
-            data=csv,
+
+        with perfil.stage("reporte", filas=len(sched_df)):
+            df_table = memo.get_or_build(("reporte", huella), lambda: build_report(sched_df, fecha_hoy_segura))
+        
+        tabla_vista = df_table[visibles_plan.to_numpy()] if filtra_plan else df_table
+        with perfil.stage("tabla_reporte", filas=len(tabla_vista)):
+            st.dataframe(tabla_vista, use_container_width=True, hide_index=True)
+        if filtra_plan:
+            st.caption(f"La tabla muestra {len(tabla_vista)} de {len(df_table)} tareas; las descargas incluyen el portafolio completo.")
+        
+        # Los archivos se arman por bloques sólo cuando se pide la descarga
+        col_excel, col_csv = st.columns(2)
+        col_excel.download_button(
+            label="📥 Descargar Reporte Completo (Excel)",
+            data=lambda: to_tempfile(write_xlsx, sched_df, fecha_hoy_segura, carga, HORAS_POR_DIA),
+            file_name='reporte_cronograma.xlsx',
+            mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+        col_csv.download_button(
+            label="📥 Descargar Reporte Completo (CSV)",
+            data=lambda: to_tempfile(write_csv, sched_df, fecha_hoy_segura),
             file_name='reporte_cronograma.csv',
             mime='text/csv',
         )
@@ -635,3 +695,13 @@ except KeyError as e:
     st.error(f"**Error de Dependencia:** Revisa que el ID de la tarea a la que estás apuntando exista. Detalles: {e}")
 except Exception as e:
     st.error(f"Hubo un problema procesando los datos. Detalles técnicos: {e}")
+
+# === DEPURACIÓN: TIEMPOS POR ETAPA ===
+total_rerun = perfil.finish()
+if modo_depuracion:
+    with st.expander("🐞 Tiempos por etapa de este rerun", expanded=True):
+        memo = get_memo_salidas()
+        st.caption(f"Total: {total_rerun:.3f} s · Caché de salidas: {memo.hits} aciertos, {memo.misses} fallos, {len(memo)} entradas")
+        st.dataframe(perfil.to_frame(), use_container_width=True, hide_index=True)
+if PERFIL_LOG:
+    perfil.append_jsonl(PERFIL_LOG, tareas=len(store))
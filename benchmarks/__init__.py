@@ -0,0 +1 @@
+"""Benchmarks del pipeline de cronograma (sin Streamlit ni Google Sheets)."""
@@ -0,0 +1,166 @@
+"""Mide cada etapa del pipeline de ``app.py`` sin Streamlit ni Google Sheets.
+
+Uso::
+
+    python -m benchmarks.pipeline --tareas 1000 10000 50000 --salida bench.json
+
+Cada tamaño genera un portafolio sintético (``benchmarks.synthetic``) y
+corre las mismas etapas que la app: normalización, ``schedule``
+(antes ``compute_dates``), ``assign_roots`` (antes ``get_root_task``),
+frame del Gantt, figura y exportación CSV (y Excel con ``--excel``). Se
+guarda el mejor tiempo de ``--repeticiones`` corridas por etapa; el JSON
+sirve para comparar versiones.
+"""
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly
+
+from benchmarks.synthetic import generate_portfolio
+from cronograma.colors import COLOR_MAP_ESP, color_bars
+from cronograma.export import write_csv, write_xlsx
+from cronograma.gantt import build_gantt_frame
+from cronograma.large_timeline import build_large_figure
+from cronograma.normalize import normalize_tasks, prepare_editor_frame
+from cronograma.report import build_report
+from cronograma.scheduling import assign_roots, schedule
+from cronograma.store import TaskStore
+from cronograma.summary import portfolio_aggregates
+from cronograma.timeline import build_timeline_figure
+from cronograma.workdays import WorkCalendar
+
+UMBRAL_MODO_GRANDE = 300  # Igual que en app.py
+HOY = pd.Timestamp("2026-06-15")
+
+
+def _git_commit():
+    try:
+        salida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def run_pipeline(raw_df, hoy=HOY, umbral=UMBRAL_MODO_GRANDE, figura=True, calendario=None, excel=False):
+    """Corre el pipeline una vez; devuelve {etapa: segundos} y conteos de filas."""
+    calendario = calendario or WorkCalendar()
+    tiempos = {}
+    opciones_color = list(COLOR_MAP_ESP)
+    fecha_hoy = pd.Timestamp(hoy).normalize()
+
+    def medir(etapa, fn):
+        t0 = time.perf_counter()
+        resultado = fn()
+        tiempos[etapa] = time.perf_counter() - t0
+        return resultado
+
+    editor_df = medir("normalizacion_editor", lambda: prepare_editor_frame(raw_df, opciones_color))
+    tasks, rechazadas = medir("normalizacion", lambda: normalize_tasks(editor_df, opciones_color))
+    store = medir("store", lambda: TaskStore.from_frame(tasks))
+    resultado = medir("schedule", lambda: schedule(store, fecha_hoy, calendario))
+    medir("assign_roots", lambda: assign_roots(store))
+    sched_df = medir("to_frame", store.to_frame)
+    final_df = medir("gantt_frame", lambda: build_gantt_frame(sched_df, fecha_hoy, resultado.padres_ids))
+    final_df = medir("colores", lambda: color_bars(final_df, "tarea", COLOR_MAP_ESP, fecha_hoy))
+    agregados = medir("resumen", lambda: portfolio_aggregates(sched_df, fecha_hoy, resultado.padres_ids, calendario))
+
+    modo = "grande" if len(store) > umbral else "estandar"
+    if figura:
+        if modo == "grande":
+            medir("figura", lambda: build_large_figure(final_df, hoy, agregados))
+        else:
+            medir("figura", lambda: build_timeline_figure(final_df, hoy, agregados))
+
+    medir("reporte", lambda: build_report(sched_df, fecha_hoy))
+    medir("csv", lambda: write_csv(io.BytesIO(), sched_df, fecha_hoy))
+    if excel:
+        medir("xlsx", lambda: write_xlsx(io.BytesIO(), sched_df, fecha_hoy))
+
+    filas = {
+        "entrada": len(raw_df),
+        "tareas": len(store),
+        "rechazadas": len(rechazadas),
+        "ciclos": len(resultado.cycles),
+        "barras": len(final_df),
+        "modo_figura": modo if figura else None,
+    }
+    return tiempos, filas
+
+
+def benchmark(tamanos, repeticiones=3, figura=True, calendario=None, excel=False, **generador):
+    """Mejor tiempo por etapa para cada tamaño de portafolio."""
+    corridas = []
+    for n in tamanos:
+        raw_df = generate_portfolio(n, **generador)
+        muestras = []
+        for _ in range(repeticiones):
+            tiempos, filas = run_pipeline(raw_df, figura=figura, calendario=calendario, excel=excel)
+            muestras.append(tiempos)
+        etapas = {
+            etapa: {
+                "mejor_s": round(min(m[etapa] for m in muestras), 6),
+                "mediana_s": round(float(np.median([m[etapa] for m in muestras])), 6),
+            }
+            for etapa in muestras[0]
+        }
+        total = min(sum(m.values()) for m in muestras)
+        corridas.append({"tareas": n, "filas": filas, "etapas": etapas, "total_s": round(total, 6)})
+        print(f"{n:>7} tareas  total {total:8.3f}s", file=sys.stderr)
+
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "entorno": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "plotly": plotly.__version__,
+            "plataforma": platform.platform(),
+        },
+        "parametros": dict(generador, repeticiones=repeticiones, figura=figura, excel=excel),
+        "corridas": corridas,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de cronograma.")
+    parser.add_argument("--tareas", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--proyectos", type=int, default=10)
+    parser.add_argument("--profundidad", type=int, default=2, help="Niveles máximos de Parent Task ID")
+    parser.add_argument("--cadena", type=int, default=5, help="Largo máximo de las cadenas de dependencias")
+    parser.add_argument("--ciclos", type=int, default=0, help="Ciclos de dependencias inyectados")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--feriados", help="CSV de feriados (Fecha[,Responsable]); sin él, sólo fines de semana")
+    parser.add_argument("--sin-figura", action="store_true", help="No construir la figura de Plotly")
+    parser.add_argument("--excel", action="store_true", help="Medir también la exportación a Excel")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    resultado = benchmark(
+        args.tareas, repeticiones=args.repeticiones, figura=not args.sin_figura, excel=args.excel,
+        calendario=WorkCalendar.from_file(args.feriados) if args.feriados else None,
+        projects=args.proyectos, parent_depth=args.profundidad, chain_length=args.cadena,
+        cycles=args.ciclos, seed=args.semilla,
+    )
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
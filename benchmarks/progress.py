@@ -0,0 +1,84 @@
+"""Mide el registro de avance y el valor ganado sobre un año de fotos diarias.
+
+Uso::
+
+    python -m benchmarks.progress --tareas 5000 --dias 365
+
+Genera un portafolio sintético (``benchmarks.synthetic``), registra una foto
+por día en un ``ProgressLog`` temporal (cada día avanza una parte de las
+tareas, con ``--cambios`` como fracción) y mide la escritura de las fotos, la
+lectura del historial y ``earned_value`` por día, semana y mes.
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_portfolio
+from cronograma.colors import COLOR_MAP_ESP
+from cronograma.normalize import normalize_tasks, prepare_editor_frame
+from cronograma.progress import FRECUENCIAS, ProgressLog, earned_value
+from cronograma.scheduling import schedule
+from cronograma.store import TaskStore
+from cronograma.workdays import WorkCalendar
+
+HOY = pd.Timestamp("2026-06-15")
+
+
+def run_progress(raw_df, dias, cambios=0.05, hoy=HOY, semilla=0):
+    """Registra ``dias`` fotos y calcula el valor ganado; devuelve {etapa: segundos}."""
+    calendario = WorkCalendar()
+    opciones_color = list(COLOR_MAP_ESP)
+    tasks, _ = normalize_tasks(prepare_editor_frame(raw_df, opciones_color), opciones_color)
+    store = TaskStore.from_frame(tasks)
+    resultado = schedule(store, hoy, calendario)
+    sched_df = store.to_frame()
+
+    rng = np.random.default_rng(semilla)
+    ids = sched_df["Task ID"].to_numpy()
+    horas = np.zeros(len(ids))
+    avance = np.zeros(len(ids))
+    tiempos = {}
+    with tempfile.TemporaryDirectory() as carpeta:
+        registro = ProgressLog(str(Path(carpeta) / "avance.sqlite"))
+        t0 = time.perf_counter()
+        for fecha in pd.date_range(end=hoy, periods=dias, freq="D"):
+            movidas = rng.random(len(ids)) < cambios
+            horas[movidas] += rng.integers(1, 8, movidas.sum())
+            avance[movidas] = np.minimum(100, avance[movidas] + rng.integers(5, 20, movidas.sum()))
+            registro.record(fecha, ids, horas, avance)
+        tiempos["fotos"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        historial = registro.history(hoy)
+        tiempos["historial"] = time.perf_counter() - t0
+        for freq in FRECUENCIAS:
+            t0 = time.perf_counter()
+            earned_value(sched_df, resultado.padres_ids, historial, hoy, freq, 8, calendario)
+            tiempos[f"valor_ganado_{freq}"] = time.perf_counter() - t0
+    return tiempos, len(historial)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tareas", type=int, default=5000)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--cambios", type=float, default=0.05, help="Fracción de tareas que avanza cada día")
+    parser.add_argument("--salida", help="Archivo JSON con los resultados")
+    args = parser.parse_args(argv)
+
+    tiempos, filas = run_progress(generate_portfolio(args.tareas), args.dias, args.cambios)
+    print(f"{args.tareas} tareas · {args.dias} días · {filas} cambios registrados")
+    for etapa, segundos in tiempos.items():
+        print(f"  {etapa:<18} {segundos:8.3f} s")
+    if args.salida:
+        with open(args.salida, "w") as f:
+            json.dump({"tareas": args.tareas, "dias": args.dias, "cambios": filas, "tiempos": tiempos}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
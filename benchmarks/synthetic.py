@@ -0,0 +1,78 @@
+"""Generador de portafolios sintéticos con la forma de la hoja de tareas."""
+import random
+
+import pandas as pd
+
+from cronograma.colors import COLOR_MAP_ESP
+
+COLORES = list(COLOR_MAP_ESP) + [""]
+PERSONAS = [f"Persona {i}" for i in range(1, 41)]
+
+
+def generate_portfolio(n_tasks, projects=10, parent_depth=2, chain_length=5, cycles=0,
+                       start="2026-01-05", span_days=365, seed=0):
+    """DataFrame crudo como el que devuelve ``conn.read``.
+
+    - ``projects``: número de proyectos entre los que se reparten las tareas.
+    - ``parent_depth``: niveles máximos de Parent Task ID (0 = sin jerarquía).
+    - ``chain_length``: largo máximo de cada cadena de ``Depends On`` entre hermanas.
+    - ``cycles``: cantidad de ciclos de dependencia inyectados a propósito.
+    """
+    rng = random.Random(seed)
+    inicio = pd.Timestamp(start)
+    rows = []
+    por_proyecto = max(1, n_tasks // max(1, projects))
+
+    # Estado por proyecto: tareas que pueden ser padre y cadena abierta por padre
+    niveles = {}
+    cadenas = {}
+
+    for i in range(n_tasks):
+        proyecto = f"Proyecto {min(i // por_proyecto, projects - 1) + 1:03d}"
+        t_id = f"T{i + 1}"
+        candidatos = niveles.setdefault(proyecto, [])
+
+        padre, nivel = None, 0
+        if parent_depth and candidatos and rng.random() < 0.6:
+            padre, nivel_padre = candidatos[rng.randrange(max(0, len(candidatos) - 20), len(candidatos))]
+            nivel = nivel_padre + 1
+        if nivel < parent_depth:
+            candidatos.append((t_id, nivel))
+
+        grupo = (proyecto, padre)
+        cadena = cadenas.get(grupo)
+        depende = None
+        if cadena and len(cadena) < chain_length and rng.random() < 0.8:
+            depende = cadena[-1]
+            cadena.append(t_id)
+        else:
+            cadenas[grupo] = [t_id]
+
+        fecha = None if depende else (inicio + pd.Timedelta(days=rng.randrange(span_days))).strftime("%Y-%m-%d")
+        responsables = ", ".join(rng.sample(PERSONAS, rng.choice([0, 1, 1, 1, 2, 3])))
+
+        rows.append({
+            "Task ID": t_id,
+            "Parent Task ID": padre or "",
+            "Project Name": proyecto,
+            "Task Name": f"Tarea {i + 1}",
+            "Depends On": depende or "",
+            "Duration (Days)": rng.randint(1, 20),
+            "Start Date": fecha or "",
+            "Horas Invertidas": round(rng.uniform(0, 80), 1),
+            "Responsable(s)": responsables,
+            "Notas Extra": "",
+            "Color": rng.choice(COLORES),
+        })
+
+    # Ciclos: la primera tarea de una cadena pasa a depender de la última
+    # (sólo cadenas sin tareas padre: un padre ignora su Depends On)
+    padres = {row["Parent Task ID"] for row in rows}
+    largas = [c for c in cadenas.values() if len(c) > 1 and padres.isdisjoint(c)]
+    rng.shuffle(largas)
+    por_id = {row["Task ID"]: row for row in rows}
+    for cadena in largas[:cycles]:
+        por_id[cadena[0]]["Depends On"] = cadena[-1]
+        por_id[cadena[0]]["Start Date"] = ""
+
+    return pd.DataFrame(rows)
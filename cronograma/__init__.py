@@ -0,0 +1 @@
+"""Lógica de cronograma reutilizable por la app de Streamlit."""
@@ -0,0 +1,5 @@
+import sys
+
+from cronograma.headless import main
+
+sys.exit(main())
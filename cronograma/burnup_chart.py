@@ -0,0 +1,42 @@
+"""Curva de avance acumulado (burn-up) de valor ganado por proyecto."""
+import pandas as pd
+import plotly.graph_objects as go
+
+TRAZOS = (
+    ("PV", "Planeado (PV)", dict(color="#9E9E9E", dash="dash")),
+    ("EV", "Ganado (EV)", dict(color="#34A853", width=3)),
+    ("AC", "Horas reales (AC)", dict(color="#FB8C00")),
+)
+
+
+def build_burnup_figure(curvas, proyecto, hoy):
+    """PV, EV y AC acumulados de ``proyecto`` (una fila de ``EarnedValue.curves`` por cierre)."""
+    datos = curvas[curvas["Proyecto"] == proyecto]
+    fig = go.Figure()
+    for columna, nombre, linea in TRAZOS:
+        fig.add_trace(go.Scatter(
+            x=datos["Fecha"],
+            y=datos[columna].round(1),
+            mode="lines+markers",
+            name=nombre,
+            line=linea,
+            marker=dict(size=4),
+            hovertemplate="%{x|%d %b %Y}<br>%{y} hrs<extra>" + nombre + "</extra>",
+        ))
+    if not datos.empty:
+        fig.add_hline(
+            y=float(datos["BAC"].iloc[0]), line_width=1, line_dash="dot", line_color="#555555",
+            annotation_text="BAC", annotation_position="top left",
+        )
+    fig.update_xaxes(type="date", tickformat="%d %b %Y", showgrid=False)
+    fig.update_yaxes(title_text="Horas", rangemode="tozero")
+    fig.update_layout(
+        plot_bgcolor="white",
+        height=380,
+        margin=dict(l=60, r=50),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+    )
+
+    hoy_ms = int(pd.Timestamp(hoy).timestamp() * 1000)
+    fig.add_vline(x=hoy_ms, line_width=2, line_dash="dash", line_color="darkblue")
+    return fig
@@ -0,0 +1,138 @@
+"""Colores de las barras del Gantt.
+
+``bar_colors`` deja en ``Color_Key`` el color final de cada barra, así que
+el gráfico arma una traza por color y no por tarea: la cantidad de trazas
+queda acotada por la paleta. La paleta (colores del usuario, pasteles por
+proyecto y su versión apagada para los tramos "Completado") se resuelve
+una vez con ``palette`` y se cachea; las barras se colorean con ``map``.
+
+Modos (``MODOS_COLOR``): el color elegido en la tarea (o el pastel de su
+proyecto), proyecto, responsable, estado o ruta crítica.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from cronograma.report import task_status
+
+# Diccionario de colores
+COLOR_MAP_ESP = {
+    "Por defecto": "",
+    "Azul": "#4285F4",
+    "Rojo": "#EA4335",
+    "Verde": "#34A853",
+    "Amarillo": "#FBBC05",
+    "Naranja": "#FF6D01",
+    "Morado": "#8E24AA",
+    "Rosa": "#E91E63",
+    "Gris": "#9E9E9E",
+    "Cian": "#00BCD4"
+}
+
+MODOS_COLOR = {
+    "tarea": "Color de la tarea",
+    "proyecto": "Proyecto",
+    "responsable": "Responsable",
+    "estado": "Estado",
+    "critica": "Ruta crítica",
+}
+COLORES_ESTADO = {"Pendiente": "#FBBC05", "En Proceso": "#4285F4", "Completado": "#34A853"}
+COLOR_CRITICA = "#D30000"
+COLOR_NEUTRO = "#9E9E9E"  # Sin responsable / fuera de la ruta crítica
+COLOR_RESPALDO = "#3366cc"
+MUTED_RESPALDO = "rgba(211,211,211, 0.3)"
+
+
+def muted(color):
+    """Versión apagada (30 % de opacidad) de un color ``#rgb``, ``#rrggbb`` o ``rgb(r, g, b)``."""
+    c_str = str(color).strip().lower()
+    try:
+        if c_str.startswith("#"):
+            hex_c = c_str.lstrip("#")
+            if len(hex_c) == 3:
+                hex_c = "".join(c * 2 for c in hex_c)
+            r, g, b = (int(hex_c[i:i + 2], 16) for i in (0, 2, 4))
+        elif c_str.startswith("rgb(") and c_str.endswith(")"):
+            r, g, b = (int(float(v)) for v in c_str[4:-1].split(","))
+        else:
+            r, g, b = 150, 150, 150
+        return f"rgba({r},{g},{b}, 0.3)"
+    except ValueError:
+        return MUTED_RESPALDO
+
+
+class Palette:
+    """Colores de un ``COLOR_MAP_ESP`` y su tabla de versiones apagadas."""
+
+    def __init__(self, colores_usuario):
+        self.usuario = {nombre: c for nombre, c in colores_usuario if nombre != "Por defecto" and c}
+        self.proyectos = list(px.colors.qualitative.Pastel)
+        self.responsables = list(px.colors.qualitative.Set2) + list(px.colors.qualitative.Pastel1)
+        todos = [*self.usuario.values(), *self.proyectos, *self.responsables, *COLORES_ESTADO.values(),
+                 COLOR_CRITICA, COLOR_NEUTRO, COLOR_RESPALDO]
+        self.apagados = {c: muted(c) for c in todos}
+
+    def mute(self, colores):
+        """``colores`` (Series) en su versión apagada, por tabla; lo desconocido se calcula una vez."""
+        faltan = set(colores.unique()) - self.apagados.keys()
+        for c in faltan:
+            self.apagados[c] = muted(c)
+        return colores.map(self.apagados)
+
+
+@lru_cache(maxsize=8)
+def _palette(colores_usuario):
+    return Palette(colores_usuario)
+
+
+def palette(color_map_esp=COLOR_MAP_ESP):
+    """``Palette`` cacheada por contenido de ``color_map_esp``."""
+    return _palette(tuple(color_map_esp.items()))
+
+
+def _ciclica(valores, categorias, colores):
+    # Cada categoría toma un color de la lista (en el orden de ``categorias``), dando la vuelta
+    tabla = {c: colores[i % len(colores)] for i, c in enumerate(categorias)}
+    return valores.map(tabla)
+
+
+def _primer_responsable(responsables):
+    return responsables.fillna("").astype(str).str.split(",", n=1).str[0].str.strip()
+
+
+def bar_colors(final_df, modo="tarea", color_map_esp=COLOR_MAP_ESP, fecha_hoy=None, referencia=None):
+    """Color de cada barra de ``final_df`` según ``modo``; los tramos pasados, apagados.
+
+    Las categorías (proyectos, responsables) se numeran sobre ``referencia``
+    (por defecto ``final_df``), así un filtro no cambia el color de nadie.
+    ``fecha_hoy`` sólo hace falta en el modo "estado".
+    """
+    paleta = palette(color_map_esp)
+    referencia = final_df if referencia is None else referencia
+    proyecto = final_df["Project Name"].astype(str)
+
+    if modo in ("tarea", "proyecto"):
+        base = _ciclica(proyecto, referencia["Project Name"].astype(str).unique(), paleta.proyectos)
+        if modo == "tarea":
+            elegido = final_df["Color_Raw"].astype(str).str.strip().map(paleta.usuario)
+            base = elegido.where(elegido.notna(), base)
+    elif modo == "responsable":
+        persona = _primer_responsable(final_df["Responsable(s)"])
+        personas = sorted(set(_primer_responsable(referencia["Responsable(s)"])) - {""})
+        base = _ciclica(persona, personas, paleta.responsables).where(persona != "", COLOR_NEUTRO)
+    elif modo == "estado":
+        base = task_status(final_df, pd.Timestamp(fecha_hoy).normalize()).map(COLORES_ESTADO)
+    elif modo == "critica":
+        base = pd.Series(np.where(final_df["Critical"].astype(bool), COLOR_CRITICA, COLOR_NEUTRO), index=final_df.index)
+    else:
+        raise ValueError(f"Modo de color desconocido: {modo}")
+
+    base = base.fillna(COLOR_RESPALDO)
+    return base.where(final_df["Status"] != "Pasado", paleta.mute(base))
+
+
+def color_bars(final_df, modo="tarea", color_map_esp=COLOR_MAP_ESP, fecha_hoy=None, referencia=None):
+    """Copia de ``final_df`` con ``Color_Key`` = color final de cada barra."""
+    return final_df.assign(Color_Key=bar_colors(final_df, modo, color_map_esp, fecha_hoy, referencia))
@@ -0,0 +1,456 @@
+"""Capa de acceso a la hoja de tareas con caché en memoria.
+
+``CachedTable`` guarda la última lectura de una fuente durante ``ttl``
+segundos. Pasado ese tiempo sigue entregando la copia vieja y lanza una
+relectura en un hilo de fondo (stale-while-revalidate); la copia sólo se
+reemplaza si la versión de la fuente cambió. ``invalidate`` fuerza una
+lectura nueva; al guardar, lo guardado pasa a ser la copia vigente.
+
+Las fuentes implementan ``read()``, ``update(df)``, ``apply_delta(delta)``
+(escritura parcial por ``Task ID``) y ``version()``. Además
+de Google Sheets hay fuentes locales (CSV y SQLite) para probar la carga
+sin conexión.
+
+Con un ``SnapshotStore`` la tabla guarda en disco la última lectura buena
+(y lo último guardado). Al arrancar en frío se entrega esa copia al
+instante y la hoja se reconcilia en segundo plano; si la fuente no
+responde, la tabla queda ``offline`` y rechaza escrituras hasta que una
+lectura vuelva a funcionar.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from cronograma.delta import KEY, DeltaNotApplicable, apply_delta, compute_delta
+
+logger = logging.getLogger(__name__)
+
+
+def content_version(df):
+    """Huella del contenido, usada como ETag cuando la fuente no tiene uno."""
+    if df is None:
+        return None
+    h = hashlib.sha1("|".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _cell(value):
+    # Valor serializable para Sheets/SQLite: vacío para nulos, fechas ISO
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()[:10]
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def gspread_client(secrets):
+    """Cliente de gspread para las escrituras por filas; ``None`` sin cuenta de servicio.
+
+    ``secrets`` es la sección de la conexión en ``secrets.toml`` (la misma
+    que usa ``GSheetsConnection``).
+    """
+    if secrets.get("type") != "service_account":
+        return None
+    from gspread import service_account_from_dict
+
+    return service_account_from_dict({k: v for k, v in secrets.items() if k not in ("spreadsheet", "worksheet")})
+
+
+class GSheetsSource:
+    """Hoja de Google Sheets; con ``client`` (de gspread) guarda sólo las filas que cambiaron."""
+
+    def __init__(self, conn, spreadsheet, worksheet, client=None):
+        self.conn = conn
+        self.spreadsheet = spreadsheet
+        self.worksheet = worksheet
+        self.client = client
+
+    def read(self):
+        return self.conn.read(spreadsheet=self.spreadsheet, worksheet=self.worksheet, ttl=0)
+
+    def update(self, df):
+        self.conn.update(spreadsheet=self.spreadsheet, worksheet=self.worksheet, data=df)
+
+    def _open_worksheet(self):
+        # GSheetsConnection sólo ofrece reescribir la hoja completa; para
+        # escrituras parciales se abre la hoja con la API pública de gspread.
+        if self.client is None:
+            motivo = "no hay cliente de gspread (la conexión no usa cuenta de servicio)"
+        else:
+            try:
+                return self.client.open_by_url(self.spreadsheet).worksheet(self.worksheet)
+            except Exception as e:
+                motivo = f"no se pudo abrir la hoja: {e}"
+        logger.warning("%s / %s se reescribe completa: %s", self.spreadsheet, self.worksheet, motivo)
+        raise DeltaNotApplicable(motivo)
+
+    def apply_delta(self, delta):
+        from gspread.utils import rowcol_to_a1
+
+        ws = self._open_worksheet()
+        header = ws.row_values(1)
+        if set(header) != set(delta.columns):
+            raise DeltaNotApplicable("Las columnas de la hoja no coinciden")
+
+        # Posiciones actuales de cada Task ID (por si alguien movió filas)
+        keys = [str(k).strip() for k in ws.col_values(header.index(KEY) + 1)[1:]]
+        row_of = {k: i + 2 for i, k in enumerate(keys) if k}
+        next_row = len(keys) + 2
+        last_col = rowcol_to_a1(1, len(header)).rstrip("0123456789")
+
+        data = []
+        for frame in (delta.changed, delta.inserted):
+            values = frame.reindex(columns=header)
+            for key, row in zip(values.index, values.to_numpy(dtype=object)):
+                fila = row_of.get(key)
+                if fila is None:
+                    fila = next_row
+                    next_row += 1
+                data.append({"range": f"A{fila}:{last_col}{fila}", "values": [[_cell(v) for v in row]]})
+        if data:
+            ws.batch_update(data, value_input_option="USER_ENTERED")
+
+        borrar = sorted((row_of[k] for k in delta.deleted if k in row_of), reverse=True)
+        if borrar:
+            ws.spreadsheet.batch_update({"requests": [
+                {"deleteDimension": {"range": {
+                    "sheetId": ws.id, "dimension": "ROWS", "startIndex": fila - 1, "endIndex": fila,
+                }}}
+                for fila in borrar
+            ]})
+
+    def version(self):
+        # La API de Sheets no expone un ETag barato: se compara el contenido
+        return None
+
+
+class CsvSource:
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return pd.DataFrame()
+        return pd.read_csv(self.path)
+
+    def update(self, df):
+        df.to_csv(self.path, index=False)
+
+    def apply_delta(self, delta):
+        # Un CSV no admite escrituras parciales: se fusiona y se reescribe
+        self.update(apply_delta(self.read(), delta))
+
+    def version(self):
+        try:
+            info = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (info.st_mtime_ns, info.st_size)
+
+
+class SqliteSource:
+
+    def __init__(self, path, table="tasks"):
+        self.path = path
+        self.table = table
+
+    def _connect(self):
+        con = sqlite3.connect(self.path)
+        con.execute("CREATE TABLE IF NOT EXISTS _meta (key TEXT PRIMARY KEY, value INTEGER)")
+        return con
+
+    def read(self):
+        con = self._connect()
+        try:
+            existe = con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (self.table,)
+            ).fetchone()
+            if not existe:
+                return pd.DataFrame()
+            return pd.read_sql_query(f'SELECT * FROM "{self.table}"', con)
+        finally:
+            con.close()
+
+    def update(self, df):
+        con = self._connect()
+        try:
+            with con:
+                df.to_sql(self.table, con, if_exists="replace", index=False)
+                con.execute(
+                    "INSERT INTO _meta (key, value) VALUES ('version', 1) "
+                    "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+                )
+        finally:
+            con.close()
+
+    def apply_delta(self, delta):
+        cols = delta.columns
+        lista = ", ".join(f'"{c}"' for c in cols)
+        marcas = ", ".join("?" for _ in cols)
+        asignar = ", ".join(f'"{c}" = ?' for c in cols)
+
+        con = self._connect()
+        try:
+            columnas = [fila[1] for fila in con.execute(f'PRAGMA table_info("{self.table}")')]
+            if set(columnas) != set(cols):
+                raise DeltaNotApplicable("Las columnas de la tabla no coinciden")
+            with con:
+                con.executemany(
+                    f'DELETE FROM "{self.table}" WHERE "{KEY}" = ?', [(k,) for k in delta.deleted]
+                )
+                con.executemany(
+                    f'UPDATE "{self.table}" SET {asignar} WHERE "{KEY}" = ?',
+                    [[_cell(v) for v in row] + [key]
+                     for key, row in zip(delta.changed.index, delta.changed[cols].to_numpy(dtype=object))],
+                )
+                con.executemany(
+                    f'INSERT INTO "{self.table}" ({lista}) VALUES ({marcas})',
+                    [[_cell(v) for v in row] for row in delta.inserted[cols].to_numpy(dtype=object)],
+                )
+                con.execute(
+                    "INSERT INTO _meta (key, value) VALUES ('version', 1) "
+                    "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+                )
+        finally:
+            con.close()
+
+    def version(self):
+        con = self._connect()
+        try:
+            fila = con.execute("SELECT value FROM _meta WHERE key = 'version'").fetchone()
+            return fila[0] if fila else 0
+        finally:
+            con.close()
+
+
+class OfflineError(Exception):
+    """La fuente no respondió: sólo se puede leer la copia local."""
+
+
+def snapshot_frame(df):
+    """``df`` con los valores tal como quedan en el snapshot (vacíos, fechas ISO)."""
+    df = df.astype(object)
+    for col in df.columns:
+        df[col] = [_cell(v) for v in df[col]]
+    return df
+
+
+class SnapshotStore:
+    """Última copia buena de cada tabla en un archivo SQLite local."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS _snapshots "
+            "(name TEXT PRIMARY KEY, tabla TEXT, version TEXT, saved_at REAL)"
+        )
+        return con
+
+    @staticmethod
+    def _tabla(name):
+        return "snap_" + hashlib.sha1(name.encode()).hexdigest()[:12]
+
+    def save(self, name, df, version=None):
+        tabla = self._tabla(name)
+        con = self._connect()
+        try:
+            with con:
+                snapshot_frame(df).to_sql(tabla, con, if_exists="replace", index=False)
+                con.execute(
+                    "INSERT INTO _snapshots (name, tabla, version, saved_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET tabla = excluded.tabla, "
+                    "version = excluded.version, saved_at = excluded.saved_at",
+                    (name, tabla, None if version is None else str(version), time.time()),
+                )
+        finally:
+            con.close()
+
+    def load(self, name):
+        """``(df, guardado_en)`` o ``(None, None)`` si no hay snapshot."""
+        try:
+            con = self._connect()
+        except sqlite3.Error:
+            return None, None
+        try:
+            fila = con.execute("SELECT tabla, saved_at FROM _snapshots WHERE name = ?", (name,)).fetchone()
+            if not fila:
+                return None, None
+            df = pd.read_sql_query(f'SELECT * FROM "{fila[0]}"', con)
+            return df, pd.Timestamp(fila[1], unit="s", tz="UTC").tz_convert(None)
+        except (sqlite3.Error, pd.errors.DatabaseError):
+            # Un snapshot dañado equivale a no tener snapshot
+            return None, None
+        finally:
+            con.close()
+
+
+class CachedTable:
+    """Caché TTL con refresco en segundo plano sobre una fuente de tareas."""
+
+    def __init__(self, source, ttl=60, clock=time.monotonic, snapshot=None, name="tareas"):
+        self.source = source
+        self.ttl = ttl
+        self.clock = clock
+        self.snapshot = snapshot
+        self.name = name
+        self._lock = threading.Lock()
+        self._df = None
+        self._version = None
+        self._loaded_at = None
+        self._refreshing = None
+        self._generation = 0
+        self.last_error = None
+        # Fecha del snapshot que se está mostrando (None = datos de la fuente)
+        self.snapshot_at = None
+        self.offline = False
+
+    @property
+    def version(self):
+        return self._version
+
+    def get(self, block=False):
+        """Copia de la tabla; sólo bloquea en la primera carga o si ``block``."""
+        with self._lock:
+            df = self._df
+            vencida = self._loaded_at is None or self.clock() - self._loaded_at >= self.ttl
+
+        if df is None and not block and self._seed_from_snapshot():
+            self._refresh_in_background()
+            with self._lock:
+                return self._df.copy()
+
+        if df is None or block:
+            self._refresh()
+            with self._lock:
+                return self._df.copy()
+
+        if vencida:
+            self._refresh_in_background()
+        return df.copy()
+
+    def save(self, new_df, base_df):
+        """Guarda sólo lo que cambió respecto a ``base_df`` y devuelve el delta.
+
+        Si la diferencia no se puede expresar por filas (columnas nuevas,
+        llaves repetidas, hoja vacía) se reescribe la tabla completa y se
+        devuelve ``None``. Sin conexión lanza ``OfflineError``.
+        """
+        if self.offline:
+            raise OfflineError(f"Sin conexión con la fuente: {self.last_error}")
+        try:
+            if base_df is None or base_df.empty:
+                raise DeltaNotApplicable("No hay foto previa")
+            delta = compute_delta(base_df, new_df)
+            if not delta.empty:
+                self.source.apply_delta(delta)
+        except DeltaNotApplicable:
+            delta = None
+            self.source.update(new_df)
+        self._write_snapshot(new_df)
+        # Lo guardado ya es la copia vigente: no hace falta releer ni mostrar el snapshot
+        self.invalidate(data=new_df)
+        return delta
+
+    def invalidate(self, data=None):
+        """Descarta la copia; si se pasa ``data`` (lo recién guardado) se usa tal cual."""
+        with self._lock:
+            self._generation += 1
+            if data is None:
+                self._df = None
+                self._version = None
+                self._loaded_at = None
+            else:
+                self._df = data.copy()
+                # Con snapshot las lecturas se comparan ya convertidas (ver ``_refresh``)
+                forma = snapshot_frame(data) if self.snapshot is not None else data
+                self._version = self.source.version() or content_version(forma)
+                self._loaded_at = self.clock()
+                self.snapshot_at = None
+
+    def wait(self, timeout=None):
+        """Espera a que termine un refresco en curso (útil en pruebas)."""
+        hilo = self._refreshing
+        if hilo is not None:
+            hilo.join(timeout)
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing is not None and self._refreshing.is_alive():
+                return
+            self._refreshing = threading.Thread(target=self._refresh_quietly, daemon=True)
+            self._refreshing.start()
+
+    def _refresh_quietly(self):
+        try:
+            self._refresh()
+        except Exception as e:
+            # La copia vieja sigue sirviendo; el error queda para mostrarlo
+            self.last_error = e
+            self.offline = True
+
+    def _seed_from_snapshot(self):
+        """Arranque en frío: usa el snapshot local mientras se lee la fuente."""
+        if self.snapshot is None:
+            return False
+        df, guardado = self.snapshot.load(self.name)
+        if df is None:
+            return False
+        with self._lock:
+            if self._df is None:
+                self._df = df
+                self._version = content_version(df)
+                self._loaded_at = None
+                self.snapshot_at = guardado
+        return True
+
+    def _write_snapshot(self, df):
+        if self.snapshot is None:
+            return
+        try:
+            self.snapshot.save(self.name, df)
+        except (sqlite3.Error, OSError):
+            # El snapshot es sólo una ayuda: no debe tumbar la lectura ni el guardado
+            pass
+
+    def _refresh(self):
+        with self._lock:
+            generacion = self._generation
+        version_fuente = self.source.version()
+        with self._lock:
+            if version_fuente is not None and self._df is not None and version_fuente == self._version:
+                self._loaded_at = self.clock()
+                self.offline = False
+                return
+
+        df = self.source.read()
+        if self.snapshot is not None:
+            # Misma forma que el snapshot: si la hoja no cambió, la huella coincide
+            df = snapshot_frame(df)
+        version = version_fuente if version_fuente is not None else content_version(df)
+
+        with self._lock:
+            if generacion != self._generation and self._df is not None:
+                # Se invalidó mientras leíamos: esta lectura puede ser anterior al guardado
+                return
+            cambio = self._df is None or version != self._version or self.snapshot_at is not None
+            if self._df is None or version != self._version:
+                self._df = df
+                self._version = version
+            self._loaded_at = self.clock()
+            self.last_error = None
+            self.offline = False
+            self.snapshot_at = None
+        if cambio:
+            self._write_snapshot(df)
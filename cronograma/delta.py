@@ -0,0 +1,156 @@
+"""Diferencias por fila entre dos versiones de la tabla de tareas.
+
+El guardado compara lo editado contra la última foto cargada, usando
+``Task ID`` como llave, y sólo envía las filas modificadas, nuevas y
+borradas. ``merge_edits`` fusiona celda por celda lo editado con lo que
+otra persona guardó mientras tanto.
+"""
+import numpy as np
+import pandas as pd
+
+KEY = "Task ID"
+
+
+class TableDelta:
+    """Filas ``changed`` e ``inserted`` (indexadas por llave) y llaves ``deleted``."""
+
+    def __init__(self, columns, changed, inserted, deleted):
+        self.columns = columns
+        self.changed = changed
+        self.inserted = inserted
+        self.deleted = deleted
+
+    @property
+    def empty(self):
+        return self.changed.empty and self.inserted.empty and not self.deleted
+
+    def __len__(self):
+        return len(self.changed) + len(self.inserted) + len(self.deleted)
+
+
+class DeltaNotApplicable(Exception):
+    """La diferencia no se puede expresar por filas (columnas o llaves repetidas)."""
+
+
+def _keys(df, key):
+    keys = df[key].astype(str).str.strip()
+    return keys, df[key].notna() & ~keys.isin(["", "None", "nan", "NaN"])
+
+
+def _keyed(df, key):
+    keys, valid = _keys(df, key)
+    out = df[valid].copy()
+    out.index = pd.Index(keys[valid], name=None)
+    if out.index.has_duplicates:
+        dup = out.index[out.index.duplicated()].unique().tolist()
+        raise DeltaNotApplicable(f"Task ID repetido: {', '.join(dup)}")
+    return out
+
+
+def _same(a, b):
+    # Igualdad celda a celda tratando NaN/None/NaT como iguales entre sí
+    a = a.astype(object).where(a.notna(), None)
+    b = b.astype(object).where(b.notna(), None)
+    eq = (a == b) | (a.isna() & b.isna())
+    # Fechas guardadas como texto vs. date: se comparan por su texto
+    eq |= a.astype(str) == b.astype(str)
+    return eq
+
+
+def compute_delta(base_df, new_df, key=KEY):
+    """Calcula el ``TableDelta`` que lleva ``base_df`` a ``new_df``."""
+    if set(base_df.columns) != set(new_df.columns):
+        raise DeltaNotApplicable("Las columnas cambiaron")
+
+    columns = list(base_df.columns)
+    base = _keyed(base_df, key)[columns]
+    new = _keyed(new_df, key)[columns]
+
+    common = base.index.intersection(new.index, sort=False)
+    iguales = _same(base.loc[common], new.loc[common]).all(axis=1)
+    changed = new.loc[common[~iguales.to_numpy()]]
+    inserted = new.loc[new.index.difference(base.index, sort=False)]
+    deleted = base.index.difference(new.index, sort=False).tolist()
+    return TableDelta(columns, changed, inserted, deleted)
+
+
+def apply_delta(base_df, delta, key=KEY):
+    """Aplica ``delta`` sobre ``base_df`` conservando el orden de las filas.
+
+    Filas modificadas que ya no existen en ``base_df`` (p. ej. borradas por
+    otra persona) se agregan al final junto con las nuevas.
+    """
+    base = _keyed(base_df, key).reindex(columns=delta.columns).astype(object)
+    base = base.drop(index=[k for k in delta.deleted if k in base.index])
+    existentes = delta.changed.index.isin(base.index)
+    if existentes.any():
+        base.loc[delta.changed.index[existentes]] = delta.changed[existentes].astype(object)
+    nuevas = [base, delta.changed[~existentes], delta.inserted]
+    return pd.concat([f for f in nuevas if not f.empty] or [base]).reset_index(drop=True)
+
+
+def _set_cell(df, pos, col, value):
+    try:
+        df.iloc[pos, df.columns.get_loc(col)] = value
+    except (TypeError, ValueError):
+        # Tipo incompatible con la columna (p. ej. texto en una numérica)
+        df[col] = df[col].astype(object)
+        df.iloc[pos, df.columns.get_loc(col)] = value
+
+
+def merge_edits(base_df, mine_df, current_df, touched, key=KEY):
+    """Fusión a tres vías de lo editado sobre la versión actual de la tabla.
+
+    ``mine_df`` es ``base_df`` con los cambios de una persona y
+    ``current_df`` lo que hay ahora; ``touched`` son las llaves que otros
+    cambiaron o borraron desde ``base_df``. Cada celda editada se aplica
+    salvo que otra persona haya puesto otro valor en la misma celda: eso
+    es un conflicto y queda el valor actual. Devuelve ``(df, conflictos)``;
+    ``df`` conserva el orden y los tipos de ``current_df`` (las filas
+    nuevas van al final) y cada conflicto es un dict con ``Task ID``,
+    ``Columna``, ``Tuyo`` y ``Actual``.
+    """
+    mio = compute_delta(base_df, mine_df, key)
+    if set(current_df.columns) != set(mio.columns):
+        raise DeltaNotApplicable("Las columnas cambiaron")
+    base = _keyed(base_df, key)[mio.columns]
+    actual = _keyed(current_df, key)[mio.columns]
+    keys, valid = _keys(current_df, key)
+    posicion = pd.Series(np.arange(len(current_df))[valid.to_numpy()], index=keys[valid].to_numpy())
+
+    merged = current_df.copy()
+    conflictos = []
+    for k, fila in mio.changed.iterrows():
+        if k not in posicion.index:
+            conflictos.append({"Task ID": k, "Columna": "(fila)", "Tuyo": "modificada", "Actual": "borrada"})
+            continue
+        mias = ~_same(base.loc[k], fila)
+        if k in touched:
+            choque = mias & ~_same(base.loc[k], actual.loc[k]) & ~_same(actual.loc[k], fila)
+        else:
+            choque = pd.Series(False, index=mias.index)
+        for col in fila.index[choque.to_numpy()]:
+            conflictos.append({"Task ID": k, "Columna": col, "Tuyo": fila[col], "Actual": actual.at[k, col]})
+        for col in fila.index[(mias & ~choque).to_numpy()]:
+            _set_cell(merged, posicion[k], col, fila[col])
+
+    nuevas = []
+    for k, fila in mio.inserted.iterrows():
+        if k not in posicion.index:
+            nuevas.append(k)
+        elif not _same(actual.loc[k], fila).all():
+            conflictos.append({"Task ID": k, "Columna": "(fila)", "Tuyo": "nueva", "Actual": "ya existe"})
+
+    borrar = []
+    for k in mio.deleted:
+        if k in touched and k in posicion.index:
+            conflictos.append({"Task ID": k, "Columna": "(fila)", "Tuyo": "borrada", "Actual": "modificada"})
+        elif k in posicion.index:
+            borrar.append(posicion[k])
+
+    merged = merged.drop(index=merged.index[borrar])
+    if nuevas:
+        mine_keys, mine_valid = _keys(mine_df, key)
+        agregadas = mine_df[mine_valid & mine_keys.isin(nuevas)]
+        merged = pd.concat([merged, agregadas[current_df.columns]])
+    return merged.reset_index(drop=True), conflictos
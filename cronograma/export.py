@@ -0,0 +1,186 @@
+"""Exportación del reporte por bloques (CSV y Excel).
+
+El reporte se arma de a ``TAMANO_BLOQUE`` tareas con ``build_report`` y
+cada bloque se escribe y se descarta, así que la memoria extra no crece
+con el portafolio. El CSV sale de un generador de bytes; el Excel usa el
+modo ``constant_memory`` de XlsxWriter (cada fila se baja a disco apenas
+se escribe), con una hoja por proyecto, una de ruta crítica y, si se pasa
+la carga, las de carga y sobreasignación.
+"""
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from cronograma.report import build_report
+
+TAMANO_BLOQUE = 5000
+MAX_HOJAS_PROYECTO = 200  # El resto de los proyectos va a una sola hoja
+HOJA_OTROS = "Otros proyectos"
+HOJA_CRITICA = "Ruta Crítica"
+HOJA_CARGA = "Carga"
+HOJA_SOBREASIGNACION = "Sobreasignación"
+COLUMNAS_FECHA = ("Inicio", "Fin")
+_NO_VALIDO = re.compile(r"[\[\]:*?/\\]")
+
+
+def report_chunks(sched_df, fecha_hoy, tamano=TAMANO_BLOQUE, posiciones=None):
+    """Genera el reporte en bloques de ``tamano`` tareas.
+
+    Sin ``posiciones`` va en el orden de ``sched_df``; con ellas, sólo esas
+    filas y en ese orden, sin copiar el frame completo reordenado.
+    """
+    if posiciones is None:
+        for inicio in range(0, len(sched_df), tamano):
+            yield build_report(sched_df.iloc[inicio:inicio + tamano], fecha_hoy)
+        return
+    for inicio in range(0, len(posiciones), tamano):
+        yield build_report(sched_df.iloc[posiciones[inicio:inicio + tamano]], fecha_hoy)
+
+
+def iter_csv(sched_df, fecha_hoy, tamano=TAMANO_BLOQUE):
+    """Bytes UTF-8 del CSV del reporte, un bloque a la vez."""
+    encabezado = True
+    for bloque in report_chunks(sched_df, fecha_hoy, tamano):
+        yield bloque.to_csv(index=False, header=encabezado).encode("utf-8")
+        encabezado = False
+    if encabezado:
+        # Portafolio vacío: sólo el encabezado
+        yield build_report(sched_df.iloc[:0], fecha_hoy).to_csv(index=False).encode("utf-8")
+
+
+def write_csv(destino, sched_df, fecha_hoy, tamano=TAMANO_BLOQUE):
+    """Escribe el CSV en ``destino`` (ruta o archivo binario abierto)."""
+    if isinstance(destino, str):
+        with open(destino, "wb") as archivo:
+            return write_csv(archivo, sched_df, fecha_hoy, tamano)
+    for parte in iter_csv(sched_df, fecha_hoy, tamano):
+        destino.write(parte)
+
+
+def _nombre_hoja(nombre, usados):
+    # Excel: máximo 31 caracteres, sin []:*?/\ y sin repetir (sin importar mayúsculas)
+    base = _NO_VALIDO.sub(" ", str(nombre)).strip().strip("'")[:31] or "Proyecto"
+    candidato, n = base, 2
+    while candidato.lower() in usados:
+        sufijo = f" ({n})"
+        candidato, n = base[:31 - len(sufijo)] + sufijo, n + 1
+    usados.add(candidato.lower())
+    return candidato
+
+
+def _columnas(bloque):
+    # (posición, valores, tipo) con fechas reales y None en lugar de NaN/NA
+    for i, col in enumerate(bloque.columns):
+        serie = bloque[col]
+        if col in COLUMNAS_FECHA:
+            serie = pd.to_datetime(serie, format="%d/%m/%Y", errors="coerce")
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            tipo = "fecha"
+        elif pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            tipo = "numero"
+        else:
+            tipo = "texto"
+            serie = serie.astype(str).where(serie.notna())
+        yield i, serie.astype(object).where(serie.notna(), None).tolist(), tipo
+
+
+class _Hoja:
+    """Hoja que se llena de arriba hacia abajo (requisito de ``constant_memory``)."""
+
+    def __init__(self, libro, nombre, columnas, formato):
+        self.ws = libro.add_worksheet(nombre)
+        self.ws.write_row(0, 0, list(columnas), formato)
+        self.ws.freeze_panes(1, 0)
+        self.anchos = [len(str(c)) for c in columnas]
+        self.fila = 1
+
+    def escribir(self, bloque):
+        # Escritura por tipo de columna: evita que XlsxWriter adivine celda por celda
+        columnas = [
+            (i, valores, {"fecha": self.ws.write_datetime, "numero": self.ws.write_number}.get(tipo, self.ws.write_string))
+            for i, valores, tipo in _columnas(bloque)
+        ]
+        for k in range(len(bloque)):
+            for i, valores, escribir in columnas:
+                if valores[k] is not None:
+                    escribir(self.fila, i, valores[k])
+            self.fila += 1
+        for i, col in enumerate(bloque.columns):
+            largo = bloque[col].astype(str).str.len().max()
+            if pd.notna(largo):
+                self.anchos[i] = max(self.anchos[i], min(int(largo), 60))
+
+    def cerrar(self):
+        # En constant_memory los anchos se pueden fijar hasta el final
+        for i, ancho in enumerate(self.anchos):
+            self.ws.set_column(i, i, ancho + 2)
+        self.ws.autofilter(0, 0, max(self.fila - 1, 1), len(self.anchos) - 1)
+
+
+def write_xlsx(destino, sched_df, fecha_hoy, carga=None, capacidad=8, tamano=TAMANO_BLOQUE):
+    """Escribe el Excel del reporte en ``destino`` (ruta o archivo binario abierto)."""
+    import xlsxwriter
+
+    libro = xlsxwriter.Workbook(destino, {
+        "constant_memory": True,
+        "default_date_format": "dd/mm/yyyy",
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+    })
+    try:
+        encabezado = libro.add_format({"bold": True, "bg_color": "#E8EEF7", "bottom": 1})
+        columnas = build_report(sched_df.iloc[:0], fecha_hoy).columns
+        usados = {h.lower() for h in (HOJA_OTROS, HOJA_CRITICA, HOJA_CARGA, HOJA_SOBREASIGNACION)}
+
+        # Una hoja por proyecto: se ordenan las posiciones una vez por proyecto
+        # (estable) y cada hoja se escribe completa antes de pasar a la siguiente
+        proyectos = sched_df["Project Name"].astype(str).to_numpy()
+        orden = np.argsort(proyectos, kind="stable")
+        nombres, inicios = np.unique(proyectos[orden], return_index=True)
+        limites = np.append(inicios, len(orden))
+        otros = None
+        for k, proyecto in enumerate(nombres):
+            if k < MAX_HOJAS_PROYECTO:
+                hoja = _Hoja(libro, _nombre_hoja(proyecto, usados), columnas, encabezado)
+            else:
+                otros = otros or _Hoja(libro, HOJA_OTROS, columnas, encabezado)
+                hoja = otros
+            for bloque in report_chunks(sched_df, fecha_hoy, tamano, orden[limites[k]:limites[k + 1]]):
+                hoja.escribir(bloque)
+            if hoja is not otros:
+                hoja.cerrar()
+        if otros is not None:
+            otros.cerrar()
+
+        criticas = np.flatnonzero(sched_df["Critical"].astype(bool).to_numpy())
+        criticas = criticas[np.argsort(sched_df["Original_Start"].to_numpy()[criticas], kind="stable")]
+        hoja = _Hoja(libro, HOJA_CRITICA, columnas, encabezado)
+        for bloque in report_chunks(sched_df, fecha_hoy, tamano, criticas):
+            hoja.escribir(bloque)
+        hoja.cerrar()
+
+        if carga is not None and not carga.empty:
+            resumen = carga.summary(capacidad)
+            hoja = _Hoja(libro, HOJA_CARGA, resumen.columns, encabezado)
+            hoja.escribir(resumen)
+            hoja.cerrar()
+
+            exceso = carga.overallocated(capacidad)
+            hoja = _Hoja(libro, HOJA_SOBREASIGNACION, exceso.columns, encabezado)
+            hoja.escribir(exceso)
+            hoja.cerrar()
+    finally:
+        libro.close()
+
+
+def to_tempfile(escribir, *args, **kwargs):
+    """Corre ``escribir(archivo, ...)`` sobre un temporal y lo devuelve rebobinado.
+
+    Hasta 16 MB queda en memoria; más grande pasa a disco.
+    """
+    archivo = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    escribir(archivo, *args, **kwargs)
+    archivo.seek(0)
+    return archivo
@@ -0,0 +1,141 @@
+"""Filtros y paginación de lo que se muestra.
+
+El cronograma se calcula siempre completo, así que las dependencias entre
+proyectos siguen valiendo; ``TaskFilter`` sólo decide qué filas llegan al
+editor, al gráfico y a la tabla del reporte. Las páginas son grupos de
+proyectos (un proyecto nunca queda partido entre dos páginas).
+
+El editor se filtra antes del cálculo, por eso sólo usa proyecto,
+responsable y página; estado y ventana de fechas dependen de las fechas
+calculadas y se aplican al gráfico y al reporte.
+"""
+import numpy as np
+import pandas as pd
+
+from cronograma.hierarchy import Hierarchy
+from cronograma.report import task_status
+from cronograma.resources import assignee_index
+
+ESTADOS = ("Pendiente", "En Proceso", "Completado")
+
+
+class TaskFilter:
+
+    def __init__(self, proyectos=(), estados=(), responsables=(), desde=None, hasta=None, pagina=1, por_pagina=10):
+        self.proyectos = tuple(proyectos)
+        self.estados = tuple(estados)
+        self.responsables = tuple(responsables)
+        self.desde = None if desde is None else pd.Timestamp(desde).normalize()
+        self.hasta = None if hasta is None else pd.Timestamp(hasta).normalize()
+        self.pagina = max(1, int(pagina))
+        self.por_pagina = max(1, int(por_pagina))
+
+    def signature(self):
+        """Llave para el caché de salidas."""
+        return (self.proyectos, self.estados, self.responsables, self.desde, self.hasta, self.pagina, self.por_pagina)
+
+    def _por_fila(self, df):
+        # Proyecto y responsable: se pueden evaluar sobre el editor o el cronograma
+        mascara = pd.Series(True, index=df.index)
+        if self.proyectos:
+            mascara &= df["Project Name"].astype(str).isin(self.proyectos)
+        if self.responsables:
+            pos, codigos, personas = assignee_index(df["Responsable(s)"])
+            elegidas = np.flatnonzero(personas.isin(self.responsables))
+            filas = np.zeros(len(df), dtype=bool)
+            filas[pos[np.isin(codigos, elegidas)]] = True
+            mascara &= filas
+        return mascara
+
+    def pages(self, df):
+        """Proyectos de cada página, por nombre, entre los que pasan el filtro."""
+        proyectos = df.loc[self._por_fila(df), "Project Name"].dropna().astype(str).unique()
+        proyectos = sorted(proyectos)
+        return [proyectos[i:i + self.por_pagina] for i in range(0, len(proyectos), self.por_pagina)] or [[]]
+
+    def page_projects(self, df):
+        paginas = self.pages(df)
+        return paginas[min(self.pagina, len(paginas)) - 1]
+
+    def editor_mask(self, df):
+        """Filas del editor visibles: proyecto, responsable y página."""
+        return self._por_fila(df) & df["Project Name"].astype(str).isin(self.page_projects(df))
+
+    def schedule_mask(self, sched_df, fecha_hoy, proyectos_pagina):
+        """Filas del cronograma visibles, más los padres de cada una.
+
+        ``proyectos_pagina`` viene de ``page_projects`` sobre el editor, para
+        que gráfico y editor muestren la misma página.
+        """
+        mascara = self._por_fila(sched_df) & sched_df["Project Name"].astype(str).isin(proyectos_pagina)
+        if self.estados:
+            mascara &= task_status(sched_df, fecha_hoy).isin(self.estados)
+        if self.desde is not None:
+            mascara &= sched_df["Original_Finish"] > self.desde
+        if self.hasta is not None:
+            mascara &= sched_df["Original_Start"] < self.hasta + pd.Timedelta(days=1)
+        return mascara | _ancestors(sched_df, mascara)
+
+
+def _ancestors(sched_df, mascara):
+    # Un ancestro tiene en su subárbol alguna fila visible además de sí mismo
+    arbol = Hierarchy.from_ids(sched_df["Task ID"], sched_df["Parent Task ID"])
+    marcadas = mascara.to_numpy(dtype="int64")
+    return pd.Series(arbol.rollup(marcadas) - marcadas > 0, index=sched_df.index)
+
+
+def editor_slice(df, mascara):
+    """``(filas visibles con índice 0..n-1, etiquetas originales)``."""
+    return df[mascara].reset_index(drop=True), df.index[mascara]
+
+
+def apply_editor_state(df, cambios, fechas=("Start Date",)):
+    """Lo que devolvería ``st.data_editor`` para ``df`` con su estado ``cambios``.
+
+    ``cambios`` es lo que el editor deja en ``st.session_state`` (filas
+    editadas y borradas por posición, filas nuevas al final). Sirve para no
+    perder lo editado cuando el corte del editor cambia antes de que el
+    editor vuelva a dibujarse. Las fechas llegan como texto ISO.
+    """
+    editado = df.copy()
+
+    def valor(col, v):
+        return pd.to_datetime(v).date() if col in fechas and v else v
+
+    for fila, valores in (cambios.get("edited_rows") or {}).items():
+        for col, v in valores.items():
+            if col not in editado.columns:
+                continue
+            pos = editado.columns.get_loc(col)
+            try:
+                editado.iloc[int(fila), pos] = valor(col, v)
+            except (TypeError, ValueError):
+                editado[col] = editado[col].astype(object)
+                editado.iloc[int(fila), pos] = valor(col, v)
+
+    nuevas = cambios.get("added_rows") or []
+    if nuevas:
+        inicio = (editado.index.max() + 1) if len(editado) else 0
+        agregadas = pd.DataFrame(
+            [{col: valor(col, v) for col, v in fila.items()} for fila in nuevas],
+            columns=editado.columns, index=pd.RangeIndex(inicio, inicio + len(nuevas)),
+        )
+        editado = pd.concat([editado, agregadas])
+
+    borradas = [int(fila) for fila in cambios.get("deleted_rows") or [] if int(fila) < len(df)]
+    return editado.drop(index=df.index[borradas])
+
+
+def merge_slice(df, etiquetas, editado):
+    """Vuelve a armar la tabla completa con lo editado en el corte del editor.
+
+    Las filas del corte conservan su lugar; las borradas desaparecen y las
+    nuevas van al final.
+    """
+    existentes = editado.index < len(etiquetas)
+    editadas = editado[existentes].set_axis(etiquetas[editado.index[existentes]])
+    inicio_nuevas = (df.index.max() + 1) if len(df) else 0
+    nuevas = editado[~existentes]
+    nuevas = nuevas.set_axis(pd.RangeIndex(inicio_nuevas, inicio_nuevas + len(nuevas)))
+    partes = [df.drop(index=etiquetas), editadas, nuevas]
+    return pd.concat([p for p in partes if len(p)] or [df.iloc[:0]]).sort_index()
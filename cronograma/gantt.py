@@ -0,0 +1,179 @@
+"""Datos del diagrama de Gantt.
+
+``build_gantt_frame`` toma el cronograma en columnas (``TaskStore.to_frame``)
+y arma las barras del gráfico: partición en tramos pasado/activo respecto a
+hoy, fin visual, orden, eje Y, texto de la barra y hover (el color lo pone
+``colors.color_bars``).
+Todo con operaciones de columnas; no hay ``DataFrame.apply`` por fila.
+Con una línea base se agregan sus fechas (barras fantasma) y el desvío.
+"""
+import numpy as np
+import pandas as pd
+
+from cronograma.hierarchy import Hierarchy, inside
+from cronograma.scenarios import slip_columns
+from cronograma.scheduling import INFO_PADRE, format_link, parse_dependencies
+
+
+def split_at_today(sched_df, fecha_hoy):
+    """Una fila por barra: las tareas que cruzan hoy se parten en dos tramos."""
+    inicio_dia = sched_df["Original_Start"].dt.normalize()
+    fin_dia = sched_df["Original_Finish"].dt.normalize()
+    cruza_hoy = (inicio_dia < fecha_hoy) & (fin_dia > fecha_hoy)
+    terminada = fin_dia <= fecha_hoy
+
+    enteras = sched_df[~cruza_hoy]
+    tramos = [enteras.assign(
+        Start=enteras["Original_Start"], Finish=enteras["Original_Finish"],
+        Status=np.where(terminada[~cruza_hoy], "Pasado", "Activo"), Hide_Label=False, _tramo=0,
+    )]
+    if cruza_hoy.any():
+        partidas = sched_df[cruza_hoy]
+        tramos.append(partidas.assign(Start=partidas["Original_Start"], Finish=fecha_hoy, Status="Pasado", Hide_Label=True, _tramo=0))
+        tramos.append(partidas.assign(Start=fecha_hoy, Finish=partidas["Original_Finish"], Status="Activo", Hide_Label=False, _tramo=1))
+
+    # Mismo orden que las tareas de entrada, tramo pasado antes que el activo
+    final_df = pd.concat(tramos).rename_axis("_orden").sort_values(["_orden", "_tramo"])
+    return final_df.reset_index(drop=True).drop(columns="_tramo")
+
+
+def tree_columns(sched_df):
+    """Posición de cada tarea en el árbol, indexado por Task ID.
+
+    ``Tree_Pos``/``Tree_End`` son el intervalo de su subárbol en preorden,
+    ``Tree_Depth`` la profundidad y ``Subtareas`` cuántas tareas cuelgan de
+    ella. Los hermanos van por (inicio de su ruta, id de la ruta, inicio
+    propio), así las subtareas de una misma ruta quedan juntas.
+    """
+    ids = sched_df["Task ID"]
+    inicio = sched_df["Original_Start"]
+    inicio_por_id = pd.Series(inicio.to_numpy(), index=ids.to_numpy())
+    inicio_por_id = inicio_por_id[~inicio_por_id.index.duplicated()]
+
+    ruta = sched_df["Root_ID"].where(sched_df["Root_ID"].notna(), ids)
+    inicio_ruta = ruta.map(inicio_por_id).fillna(inicio)
+    rango_ruta = pd.factorize(ruta.astype(str), sort=True)[0]
+
+    arbol = Hierarchy.from_ids(ids, sched_df["Parent Task ID"], sibling_key=(
+        inicio.to_numpy(dtype="datetime64[ns]").astype("int64"),
+        rango_ruta,
+        inicio_ruta.to_numpy(dtype="datetime64[ns]").astype("int64"),
+    ))
+    return pd.DataFrame({
+        "Tree_Pos": arbol.tin,
+        "Tree_End": arbol.tout,
+        "Tree_Depth": arbol.depth,
+        "Subtareas": arbol.subtree_size() - 1,
+    }, index=pd.Index(ids.to_numpy(), name="Task ID"))
+
+
+def hide_subtrees(final_df, plegados):
+    """Quita las filas que cuelgan, a cualquier profundidad, de una tarea de ``plegados``."""
+    marcas = final_df.loc[final_df["Task ID"].isin(plegados), ["Tree_Pos", "Tree_End"]].drop_duplicates()
+    ocultas = inside(final_df["Tree_Pos"], marcas["Tree_Pos"], marcas["Tree_End"])
+    return final_df[~ocultas]
+
+
+def _dependency_names(sched_df, deps):
+    """Nombre de la(s) predecesora(s) de cada fila de ``deps`` (NaN si ninguna)."""
+    nombres_tareas = pd.Series(sched_df["Task Name"].to_numpy(), index=sched_df["Task ID"].to_numpy())
+    nombres_tareas = nombres_tareas[~nombres_tareas.index.duplicated()]
+    dep_text = deps.map(nombres_tareas)
+
+    # Varias predecesoras o vínculos con tipo/desfase: se arman sólo esas filas
+    compuestas = dep_text.isna() & deps.fillna("").str.contains(r"[,\s:+-]", regex=True)
+    textos = {}
+    for texto in deps[compuestas].unique():
+        partes = [
+            format_link(nombres_tareas[d], tipo, lag)
+            for d, tipo, lag in parse_dependencies(texto, nombres_tareas.index)
+            if d in nombres_tareas.index
+        ]
+        if partes:
+            textos[texto] = ", ".join(partes)
+    if textos:
+        dep_text = dep_text.where(~compuestas, deps.map(textos))
+    return dep_text
+
+
+def build_gantt_frame(sched_df, fecha_hoy, padres_ids, linea_base=None, calendar=None):
+    """DataFrame listo para ``px.timeline`` (vacío si no hay tareas).
+
+    ``linea_base`` (de ``baseline_frame``) agrega ``Baseline_Start``,
+    ``Baseline_Finish`` y el desvío en días hábiles de ``calendar``.
+    """
+    final_df = split_at_today(sched_df, fecha_hoy)
+    if final_df.empty:
+        return final_df
+
+    # Generar espacio visual restando unas horitas al grafico (solo visual)
+    final_df["Plot_Finish"] = final_df["Finish"].where(
+        final_df["Finish"] != final_df["Original_Finish"], final_df["Finish"] - pd.Timedelta(hours=3)
+    )
+
+    final_df = final_df.join(tree_columns(sched_df), on="Task ID")
+    if linea_base is not None:
+        final_df = final_df.join(slip_columns(sched_df, linea_base, calendar), on="Task ID")
+
+    # Orden Cronológico de Proyectos; dentro de cada uno, el árbol en preorden
+    final_df["Project_Min_Start"] = final_df.groupby("Project Name", observed=True)["Original_Start"].transform("min")
+    final_df = final_df.sort_values(by=["Project_Min_Start", "Project Name", "Tree_Pos"], kind="stable")
+
+    # Padres (de cualquier nivel) en su propia fila; las hojas con padre van al
+    # carril de su ruta. Cada nivel suma una sangría.
+    nombre = final_df["Task Name"].astype(str)
+    es_padre = final_df["Task ID"].isin(padres_ids)
+    es_sub = (final_df["Tree_Depth"] > 0) & ~es_padre
+    sangria = pd.Series(" ", index=final_df.index).str.repeat(3 * final_df["Tree_Depth"])
+    eje_y = nombre.where(~es_padre, sangria + "📂 " + nombre)
+    carril = sangria.str.slice(3) + final_df["Track_Name"].fillna("   ↳ Subtareas")
+    eje_y = eje_y.where(~es_sub, carril)
+    final_df["Llave_Secreta"] = final_df["Project Name"].astype(str) + "|||" + eje_y
+
+    # === TEXTO VISUAL DENTRO DE LA BARRA ===
+    final_df["Orig_Start_str"] = final_df["Original_Start"].dt.strftime('%d %b')
+    final_df["Display_Finish_str"] = (final_df["Original_Finish"] - pd.Timedelta(days=1)).dt.strftime('%d %b')
+
+    proyecto = final_df["Project Name"].astype(str)
+    duracion = final_df["Duration"].astype(str)
+    horas = final_df["Horas Invertidas"].astype(str)
+    resp = final_df["Responsable(s)"].astype(str)
+
+    label = (
+        "<b>" + proyecto + " - " + nombre + "</b><br>"
+        + final_df["Orig_Start_str"] + " a " + final_df["Display_Finish_str"] + " - " + duracion + " días<br>"
+        + horas + " hrs<br>"
+        + resp
+    )
+    final_df["Label"] = label.where(~final_df["Hide_Label"].astype(bool), "")
+
+    # === TEXTO DEL HOVER (EL POPUP AL PASAR EL MOUSE) ===
+    dep_text = _dependency_names(sched_df, final_df["Depends_On_ID"])
+    dep_text = dep_text.where(dep_text.notna(), np.where(final_df["Dependency Info"] == INFO_PADRE, "N/A (Es tarea padre)", "Ninguna"))
+
+    final_df["Hover_Text"] = (
+        "<b>" + proyecto + "</b><br>"
+        + final_df["Orig_Start_str"] + " - " + final_df["Display_Finish_str"] + " - " + duracion + " días transcurridos<br>"
+        + "Responsable: " + resp + "<br>"
+        + "Horas transcurridas: " + horas + "<br>"
+        + "Depende de: " + dep_text.astype(str) + "<br>"
+        + "Holgura total: " + final_df["Total_Float"].astype("Int64").astype(str).replace("<NA>", "N/A") + " días"
+        + np.where(final_df["Critical"].astype(bool), " · <b>Ruta crítica</b>", "")
+        + np.where(es_padre, "<br>Subtareas: " + final_df["Subtareas"].astype(str), "")
+    )
+    if linea_base is not None:
+        con_base = final_df["Baseline_Start"].notna()
+        desvio = final_df["Desvio_Fin"].astype("Int64")
+        desvio_txt = desvio.map("{:+d}".format, na_action="ignore").fillna("")
+        final_df["Hover_Text"] += np.where(
+            con_base,
+            "<br>Línea base: " + final_df["Baseline_Start"].dt.strftime('%d %b').fillna("")
+            + " - " + (final_df["Baseline_Finish"] - pd.Timedelta(days=1)).dt.strftime('%d %b').fillna("")
+            + " · Desvío fin: " + desvio_txt + " días",
+            "",
+        )
+        # En la barra sólo se anota cuando hay desvío
+        con_desvio = desvio.fillna(0).ne(0).to_numpy() & ~final_df["Hide_Label"].astype(bool).to_numpy()
+        final_df["Label"] += np.where(con_desvio, "<br><b>Δ " + desvio_txt + " días</b>", "")
+
+    return final_df
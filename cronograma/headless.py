@@ -0,0 +1,235 @@
+"""Cronograma sin Streamlit: leer la tabla de tareas, calcular y escribir el reporte.
+
+Uso::
+
+    python -m cronograma tareas.csv --salida reporte.xlsx
+    python -m cronograma portafolios/*.parquet --salida reportes/ --procesos 8
+
+Los pasos son los mismos de la app (``prepare_editor_frame``,
+``normalize_tasks``, ``schedule``, ``assign_roots``, reporte), pero sin
+conexión ni interfaz. Con varios archivos cada uno es un trabajo aparte;
+``--procesos`` los reparte en un pool de procesos. Cada trabajo recibe
+rutas y devuelve un resumen chico, así que entre procesos no viajan
+DataFrames. Al final se imprime un JSON con el resumen de cada archivo.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import pandas as pd
+
+from cronograma.colors import COLOR_MAP_ESP
+from cronograma.datasource import CsvSource, SqliteSource
+from cronograma.export import write_csv, write_xlsx
+from cronograma.normalize import normalize_tasks, prepare_editor_frame
+from cronograma.report import build_report
+from cronograma.resources import resource_load
+from cronograma.scheduling import assign_roots, schedule
+from cronograma.store import TaskStore
+from cronograma.summary import portfolio_aggregates
+from cronograma.workdays import SEMANA_LABORAL, WorkCalendar
+
+FORMATOS = ("csv", "xlsx", "parquet")
+HORAS_POR_DIA = 8  # Igual que en app.py
+
+
+def read_tasks(path):
+    """Tabla de tareas cruda desde CSV, Parquet, Excel o SQLite (según la extensión)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        return CsvSource(path).read()
+    if ext in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    if ext in (".xlsx", ".xls"):
+        return pd.read_excel(path)
+    if ext in (".sqlite", ".db"):
+        return SqliteSource(path).read()
+    raise ValueError(f"Formato de entrada no soportado: {path}")
+
+
+class ScheduledPortfolio:
+    """Portafolio ya calculado; las vistas (frame, reporte, carga) se arman al pedirlas.
+
+    ``table`` es la tabla de entrada ya normalizada (lo que vería el editor).
+    """
+
+    def __init__(self, table, store, result, rejected, hoy, calendar):
+        self.table = table
+        self.store = store
+        self.result = result
+        self.rejected = rejected
+        self.hoy = hoy
+        self.calendar = calendar
+        self._sched_df = None
+
+    @property
+    def padres_ids(self):
+        return self.result.padres_ids
+
+    @property
+    def sched_df(self):
+        if self._sched_df is None:
+            self._sched_df = self.store.to_frame()
+        return self._sched_df
+
+    def report(self):
+        return build_report(self.sched_df, self.hoy)
+
+    def load(self):
+        return resource_load(self.sched_df, self.padres_ids, self.calendar)
+
+    def scheduled_table(self):
+        return apply_schedule(self.table, self.store, self.padres_ids)
+
+    def aggregates(self):
+        return portfolio_aggregates(self.sched_df, self.hoy, self.padres_ids, self.calendar)
+
+    def summary(self):
+        """Métricas del resumen de la app más conteos de control."""
+        resumen = {"tareas": len(self.store), "rechazadas": len(self.rejected), "ciclos": len(self.result.cycles)}
+        if len(self.store):
+            resumen.update(self.aggregates().totals)
+            resumen["fin"] = self.sched_df["Original_Finish"].max().date().isoformat()
+            resumen["criticas"] = int(self.sched_df["Critical"].sum())
+        return resumen
+
+
+def compute(raw_df, hoy=None, calendar=None, opciones_color=None):
+    """Calcula el cronograma de una tabla cruda (como la devuelve la hoja)."""
+    opciones_color = opciones_color or list(COLOR_MAP_ESP)
+    hoy = pd.Timestamp(hoy or date.today()).normalize()
+    calendar = calendar or WorkCalendar()
+    if "Task ID" not in raw_df.columns:
+        raise ValueError("Falta la columna 'Task ID'")
+
+    editor_df = prepare_editor_frame(raw_df.dropna(how="all"), opciones_color)
+    tasks, rejected = normalize_tasks(editor_df, opciones_color)
+    store = TaskStore.from_frame(tasks)
+    result = schedule(store, hoy, calendar)
+    assign_roots(store)
+    return ScheduledPortfolio(editor_df, store, result, rejected, hoy, calendar)
+
+
+def apply_schedule(df, store, padres_ids):
+    """Tabla de tareas con las fechas calculadas, lista para guardar.
+
+    Las tareas calculadas reciben su ``Start Date``; los padres además su
+    duración y horas acumuladas. Se quita ``End Date`` si quedó de antes.
+    """
+    df = df.copy()
+    ids = df["Task ID"].astype(str).str.strip()
+    calculadas = ids.isin(store.index)
+    df.loc[calculadas, "Start Date"] = ids[calculadas].map(
+        dict(zip(store.column("task_id"), [s.date() for s in store.column("start")]))
+    )
+    padres = ids.isin(padres_ids)
+    df.loc[padres, "Duration (Days)"] = ids[padres].map({t_id: store[t_id].duration for t_id in padres_ids})
+    df.loc[padres, "Horas Invertidas"] = ids[padres].map({t_id: store[t_id].horas for t_id in padres_ids})
+    if "End Date" in df.columns:
+        df = df.drop(columns=["End Date"])
+    return df
+
+
+def write_report(portafolio, destino, formato=None, capacidad=HORAS_POR_DIA):
+    """Escribe el reporte en ``destino``; el formato sale de la extensión si no se indica."""
+    formato = formato or os.path.splitext(destino)[1].lstrip(".").lower() or "csv"
+    if formato == "csv":
+        write_csv(destino, portafolio.sched_df, portafolio.hoy)
+    elif formato == "xlsx":
+        write_xlsx(destino, portafolio.sched_df, portafolio.hoy, portafolio.load(), capacidad)
+    elif formato == "parquet":
+        portafolio.report().to_parquet(destino, index=False)
+    else:
+        raise ValueError(f"Formato de salida no soportado: {formato}")
+
+
+def _destino(entrada, salida, formato, sufijo="_reporte"):
+    # Sin salida: junto a la entrada; con un directorio: adentro, con el nombre de la entrada
+    base = os.path.splitext(os.path.basename(entrada))[0] + sufijo + "." + formato
+    if salida is None:
+        return os.path.join(os.path.dirname(entrada), base)
+    if os.path.isdir(salida) or salida.endswith(os.sep):
+        return os.path.join(salida, base)
+    return salida
+
+
+def run(entrada, salida=None, formato=None, hoy=None, feriados=None, semana=SEMANA_LABORAL,
+        capacidad=HORAS_POR_DIA, tabla=False):
+    """Un trabajo completo: leer, calcular y escribir. Devuelve un resumen serializable.
+
+    Con ``tabla`` también escribe la tabla de tareas con las fechas
+    calculadas (``<entrada>_tareas.csv``) junto al reporte. Los errores se
+    devuelven en el resumen para que un archivo malo no detenga el lote.
+    """
+    t0 = time.perf_counter()
+    resumen = {"entrada": entrada}
+    try:
+        formato = formato or (os.path.splitext(salida)[1].lstrip(".").lower() if salida and not os.path.isdir(salida) else "") or "csv"
+        destino = _destino(entrada, salida, formato)
+        calendario = WorkCalendar.from_file(feriados, weekmask=semana) if feriados else WorkCalendar(weekmask=semana)
+
+        if os.path.dirname(destino):
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+        portafolio = compute(read_tasks(entrada), hoy, calendario)
+        write_report(portafolio, destino, formato, capacidad)
+        resumen["salida"] = destino
+
+        if tabla:
+            destino_tabla = _destino(entrada, os.path.dirname(destino) + os.sep, "csv", "_tareas")
+            portafolio.scheduled_table().to_csv(destino_tabla, index=False)
+            resumen["tabla"] = destino_tabla
+
+        resumen.update(portafolio.summary())
+        resumen["sobreasignaciones"] = len(portafolio.load().overallocated(capacidad))
+    except Exception as e:
+        resumen["error"] = f"{type(e).__name__}: {e}"
+    resumen["segundos"] = round(time.perf_counter() - t0, 3)
+    return resumen
+
+
+def _run_kwargs(kwargs):
+    return run(**kwargs)
+
+
+def run_many(trabajos, procesos=None):
+    """Corre ``run(**trabajo)`` para cada trabajo; con ``procesos`` > 1, en un pool de procesos."""
+    trabajos = list(trabajos)
+    if not procesos or procesos <= 1 or len(trabajos) <= 1:
+        return [run(**t) for t in trabajos]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(_run_kwargs, trabajos, chunksize=max(1, len(trabajos) // (procesos * 4))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cronograma", description="Calcula el cronograma y escribe el reporte sin la app.")
+    parser.add_argument("entradas", nargs="+", help="Archivos de tareas (.csv, .parquet, .xlsx, .sqlite)")
+    parser.add_argument("--salida", help="Archivo de reporte o, con varias entradas, directorio (por defecto junto a cada entrada)")
+    parser.add_argument("--formato", choices=FORMATOS, help="Por defecto, la extensión de --salida o csv")
+    parser.add_argument("--hoy", help="Fecha de referencia AAAA-MM-DD (por defecto hoy)")
+    parser.add_argument("--feriados", help="CSV de feriados (Fecha[,Responsable])")
+    parser.add_argument("--semana", default=SEMANA_LABORAL, help="Días hábiles lun..dom, p. ej. 1111100")
+    parser.add_argument("--capacidad", type=float, default=HORAS_POR_DIA, help="Horas por día para marcar sobreasignación")
+    parser.add_argument("--tablas", action="store_true", help="Escribir también la tabla de tareas con las fechas calculadas")
+    parser.add_argument("--procesos", type=int, default=1, help="Archivos que se procesan al mismo tiempo")
+    args = parser.parse_args(argv)
+
+    if len(args.entradas) > 1 and args.salida and not os.path.isdir(args.salida):
+        os.makedirs(args.salida, exist_ok=True)
+
+    trabajos = [
+        dict(entrada=entrada, salida=args.salida, formato=args.formato, hoy=args.hoy, feriados=args.feriados,
+             semana=args.semana, capacidad=args.capacidad, tabla=args.tablas)
+        for entrada in args.entradas
+    ]
+    resultados = run_many(trabajos, args.procesos)
+    print(json.dumps(resultados, indent=2, ensure_ascii=False, default=str))
+    fallidos = [r for r in resultados if "error" in r]
+    for r in fallidos:
+        print(f"{r['entrada']}: {r['error']}", file=sys.stderr)
+    return 1 if fallidos else 0
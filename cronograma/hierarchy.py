@@ -0,0 +1,106 @@
+"""Índice de la jerarquía de tareas (WBS) de cualquier profundidad.
+
+Un recorrido en preorden asigna a cada tarea un intervalo ``[tin, tout)``
+que contiene exactamente a su subárbol (intervalos anidados / *nested
+set*). Con eso, "¿``a`` es ancestro de ``b``?" es una comparación de
+enteros, los descendientes son un corte contiguo de ``order`` y los
+acumulados por subárbol salen de una suma prefija sobre el preorden. El
+índice se arma una vez por cronograma, en tiempo lineal.
+
+Si ``Parent Task ID`` forma un ciclo, el primer miembro del ciclo (por
+posición) se toma como raíz para que el árbol siga siendo un árbol.
+"""
+import numpy as np
+import pandas as pd
+
+
+class Hierarchy:
+    """Árbol sobre las posiciones ``0..n-1``; ``parent[i] == -1`` marca una raíz.
+
+    ``sibling_key`` (opcional) ordena a los hermanos en el preorden; si es
+    una tupla de arreglos se usa como en ``np.lexsort`` (la última llave
+    manda).
+    """
+
+    def __init__(self, parent, sibling_key=None):
+        parent = np.asarray(parent, dtype=np.int64).copy()
+        n = len(parent)
+        parent[(parent < 0) | (parent >= n)] = -1
+
+        # Hijos de cada nodo, contiguos en ``hijos`` y en el orden pedido
+        llaves = () if sibling_key is None else (sibling_key if isinstance(sibling_key, tuple) else (sibling_key,))
+        hijos = np.lexsort(tuple(np.asarray(k) for k in llaves) + (parent,)) if n else np.zeros(0, dtype=np.int64)
+        desde = np.searchsorted(parent[hijos], np.arange(-1, n), side="left")
+        hasta = np.searchsorted(parent[hijos], np.arange(-1, n), side="right")
+        hijos = hijos.tolist()
+
+        order = []
+        tin = np.full(n, -1, dtype=np.int64)
+        tout = np.zeros(n, dtype=np.int64)
+        depth = np.zeros(n, dtype=np.int64)
+
+        def recorrer(raiz, nivel):
+            # Preorden iterativo: (nodo, nivel, ya se abrieron sus hijos)
+            pila = [(raiz, nivel, False)]
+            while pila:
+                nodo, nivel, cerrar = pila.pop()
+                if cerrar:
+                    tout[nodo] = len(order)
+                    continue
+                if tin[nodo] >= 0:
+                    continue
+                tin[nodo] = len(order)
+                depth[nodo] = nivel
+                order.append(nodo)
+                pila.append((nodo, nivel, True))
+                for h in reversed(hijos[desde[nodo + 1]:hasta[nodo + 1]]):
+                    if tin[h] < 0:
+                        pila.append((h, nivel + 1, False))
+
+        for r in hijos[desde[0]:hasta[0]]:
+            recorrer(r, 0)
+        for i in range(n):
+            if tin[i] < 0:
+                # Sólo queda lo que cuelga de un ciclo de padres: se corta aquí
+                parent[i] = -1
+                recorrer(i, 0)
+
+        self.parent = parent
+        self.order = np.asarray(order, dtype=np.int64)
+        self.tin = tin
+        self.tout = tout
+        self.depth = depth
+
+    @classmethod
+    def from_ids(cls, ids, parent_ids, sibling_key=None):
+        """Árbol a partir de columnas de IDs; un padre que no está en ``ids`` no cuenta."""
+        ids = pd.Index(ids)
+        parent = ids.get_indexer(pd.Index(parent_ids)) if len(ids) else np.zeros(0, dtype=np.int64)
+        return cls(parent, sibling_key)
+
+    def subtree_size(self):
+        """Tareas de cada subárbol, contando la propia."""
+        return self.tout - self.tin
+
+    def rollup(self, values):
+        """Suma de ``values`` sobre el subárbol de cada nodo (incluido él), con una suma prefija en preorden."""
+        values = np.asarray(values)
+        prefija = np.concatenate([[0], np.cumsum(values[self.order])])
+        return prefija[self.tout] - prefija[self.tin]
+
+
+def inside(posiciones, inicios, fines):
+    """``posiciones`` que caen estrictamente dentro de algún intervalo ``(inicio, fin)``.
+
+    Un arreglo de diferencias sobre el preorden: lineal en posiciones + intervalos.
+    """
+    posiciones = np.asarray(posiciones, dtype=np.int64)
+    inicios = np.asarray(inicios, dtype=np.int64)
+    fines = np.asarray(fines, dtype=np.int64)
+    if not len(posiciones) or not len(inicios):
+        return np.zeros(len(posiciones), dtype=bool)
+    largo = int(max(posiciones.max(), fines.max())) + 2
+    marcas = np.zeros(largo, dtype=np.int64)
+    np.add.at(marcas, inicios + 1, 1)
+    np.add.at(marcas, fines, -1)
+    return np.cumsum(marcas)[posiciones] > 0
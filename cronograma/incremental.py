@@ -0,0 +1,125 @@
+"""Caché del grafo de tareas entre reruns de Streamlit.
+
+Guarda la última salida de ``st.data_editor`` y el cronograma calculado. En
+cada rerun compara el nuevo DataFrame contra esa foto: si sólo cambiaron
+valores (duración, fecha, horas, responsables, textos) se recalculan las
+tareas editadas, sus dependientes y los padres que las acumulan; si cambió
+la estructura (filas nuevas/borradas, IDs, padres o dependencias) se vuelve
+a calcular todo.
+"""
+import pandas as pd
+
+from cronograma.normalize import normalize_tasks
+from cronograma.scheduling import assign_roots, reschedule, schedule
+from cronograma.store import TaskStore
+
+# Campos que mueven fechas o acumulados; el resto sólo se copia
+CAMPOS_CALCULO = ("manual_start", "manual_duration", "horas", "responsables")
+CAMPOS_CALCULADOS = ("dependency_info", "start", "finish", "duration", "root_id", "track_name", "total_float", "critical")
+
+
+class ScheduleCache:
+
+    def __init__(self, opciones_color):
+        self.opciones_color = opciones_color
+        self.snapshot = None
+        self.default_start = None
+        self.calendar = None
+        self.store = TaskStore()
+        self.inputs = {}
+        self.result = None
+        self.row_ids = []
+        self.duplicados = set()
+        self.rejected = []
+        self.last_changed = None
+
+    def update(self, edited_df, default_start, calendar=None):
+        """Devuelve ``(TaskStore, ScheduleResult)`` para ``edited_df``.
+
+        Un calendario distinto (otro objeto) obliga a recalcular todo.
+        """
+        if self.snapshot is None or default_start != self.default_start or calendar is not self.calendar:
+            self.calendar = calendar
+            self._rebuild(edited_df, default_start)
+        else:
+            cambiadas = self._changed_rows(edited_df)
+            if cambiadas is None:
+                self._rebuild(edited_df, default_start)
+            elif len(cambiadas):
+                if not self._apply(edited_df, cambiadas):
+                    self._rebuild(edited_df, default_start)
+                else:
+                    self.snapshot = edited_df.copy()
+            else:
+                self.last_changed = set()
+        return self.store, self.result
+
+    def _rebuild(self, edited_df, default_start):
+        tasks, rejected = normalize_tasks(edited_df, self.opciones_color)
+        store = TaskStore.from_frame(tasks)
+
+        # Task ID vigente de cada posición del editor (None si se rechazó)
+        row_ids = pd.Series(None, index=edited_df.index, dtype=object)
+        row_ids.loc[tasks.index] = tasks["Task ID"]
+
+        self.inputs = {task.task_id: task.copy() for task in store}
+        self.result = schedule(store, default_start, self.calendar)
+        assign_roots(store)
+
+        self.store = store
+        self.row_ids = row_ids.tolist()
+        self.duplicados = {r["Task ID"] for r in rejected if r["Task ID"] is not None}
+        self.rejected = rejected
+        self.snapshot = edited_df.copy()
+        self.default_start = default_start
+        self.last_changed = None
+
+    def _changed_rows(self, edited_df):
+        prev = self.snapshot
+        if not (prev.index.equals(edited_df.index) and prev.columns.equals(edited_df.columns)):
+            return None
+        try:
+            distintos = prev.ne(edited_df) & ~(prev.isna() & edited_df.isna())
+        except (TypeError, ValueError):
+            return None
+        return [i for i, cambio in enumerate(distintos.any(axis=1).to_numpy()) if cambio]
+
+    def _apply(self, edited_df, cambiadas):
+        tasks, rejected = normalize_tasks(edited_df.iloc[cambiadas], self.opciones_color)
+        if rejected or len(tasks) != len(cambiadas):
+            return False
+
+        nuevos = {}
+        for old_id, task in zip([self.row_ids[pos] for pos in cambiadas], TaskStore.from_frame(tasks)):
+            if old_id is None or task.task_id != old_id or old_id in self.duplicados:
+                return False
+            old = self.inputs[old_id]
+            if task.parent_id != old.parent_id or task.depends_on != old.depends_on:
+                return False
+            nuevos[old_id] = task
+
+        dirty = set()
+        renombradas = set()
+        for tid, task in nuevos.items():
+            old = self.inputs[tid]
+            previo = self.store[tid]
+            if any(getattr(task, c) != getattr(old, c) for c in CAMPOS_CALCULO):
+                dirty.add(tid)
+            if task.name != old.name:
+                renombradas.add(tid)
+
+            self.inputs[tid] = task.copy()
+            for c in CAMPOS_CALCULADOS:
+                setattr(task, c, getattr(previo, c))
+            if tid in self.result.padres_ids:
+                # Los acumulados del padre se conservan hasta recalcularlo
+                task.horas = previo.horas
+                if not task.responsables:
+                    task.responsables = previo.responsables
+            self.store.replace(task)
+
+        afectadas = reschedule(self.store, self.result, dirty, self.default_start, self.inputs)
+        if renombradas:
+            assign_roots(self.store, [task for task in self.store if task.root_id in renombradas])
+        self.last_changed = {self.store.tasks[i].task_id for i in afectadas} | set(nuevos)
+        return True
@@ -0,0 +1,130 @@
+"""Modo de línea de tiempo para portafolios grandes.
+
+``px.timeline`` crea una barra SVG por fila. Aquí las barras se dibujan
+como segmentos gruesos en trazas ``Scattergl`` (WebGL), una por color, con
+el eje Y numérico. Las subtareas quedan plegadas dentro de la fila de su
+padre salvo que el padre esté en ``expandidos``.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from cronograma.gantt import hide_subtrees
+
+ALTO_FILA = 22
+ALTO_MAXIMO = 6000
+
+
+def collapse_subtasks(final_df, expandidos=()):
+    """Quita las filas cuyo padre (o algún ancestro) no está expandido."""
+    padres = set(final_df.loc[final_df["Subtareas"] > 0, "Task ID"])
+    return hide_subtrees(final_df, padres - set(expandidos))
+
+
+def _segmentos(inicio, fin, fila):
+    # x = [inicio, fin, None, ...] para dibujar todas las barras de un color en una traza
+    n = len(fila)
+    xs = np.empty(n * 3, dtype=object)
+    ys = np.empty(n * 3, dtype=object)
+    xs[0::3] = inicio
+    xs[1::3] = fin
+    xs[2::3] = None
+    ys[0::3] = fila
+    ys[1::3] = fila
+    ys[2::3] = None
+    return xs, ys
+
+
+def build_large_figure(final_df, hoy, agregados, expandidos=()):
+    """Figura WebGL agrupada por color a partir del frame de ``build_gantt_frame`` ya coloreado.
+
+    Los hitos salen de ``agregados`` (``portfolio_aggregates``).
+    """
+    visibles = collapse_subtasks(final_df, expandidos)
+    if visibles.empty:
+        # No debería pasar (un ciclo de padres se corta en el índice): se muestra sin plegar
+        visibles = final_df
+    llaves = pd.Index(visibles["Llave_Secreta"].unique())
+    fila = pd.Series(llaves.get_indexer(visibles["Llave_Secreta"]), index=visibles.index)
+    grosor = max(4, int(ALTO_FILA * 0.7))
+
+    fig = go.Figure()
+    colores = visibles["Color_Key"].fillna("#3366cc")
+    inicio = visibles["Start"].to_numpy()
+    fin = visibles["Plot_Finish"].to_numpy()
+    # Ruta crítica: un trazo rojo más grueso debajo de las barras sin holgura
+    criticas = np.flatnonzero(visibles["Critical"].astype(bool).to_numpy())
+    if len(criticas):
+        xs, ys = _segmentos(inicio[criticas], fin[criticas], fila.to_numpy()[criticas])
+        fig.add_trace(go.Scattergl(
+            x=xs, y=ys, mode="lines", line=dict(color="#D30000", width=grosor + 4),
+            hoverinfo="skip", showlegend=False,
+        ))
+    for color, idx in visibles.groupby(colores, sort=False).indices.items():
+        xs, ys = _segmentos(inicio[idx], fin[idx], fila.to_numpy()[idx])
+        fig.add_trace(go.Scattergl(
+            x=xs, y=ys, mode="lines", line=dict(color=color, width=grosor),
+            hoverinfo="skip", showlegend=False,
+        ))
+
+    # Línea base: trazo gris delgado al pie de cada fila
+    if "Baseline_Start" in visibles.columns:
+        fantasmas = visibles[visibles["Baseline_Start"].notna()].drop_duplicates("Task ID")
+        if len(fantasmas):
+            xs, ys = _segmentos(
+                fantasmas["Baseline_Start"].to_numpy(), fantasmas["Baseline_Finish"].to_numpy(),
+                fila.loc[fantasmas.index].to_numpy() + 0.38,
+            )
+            fig.add_trace(go.Scattergl(
+                x=xs, y=ys, mode="lines", line=dict(color="rgba(90, 90, 90, 0.5)", width=max(2, grosor // 4)),
+                hoverinfo="skip", showlegend=False,
+            ))
+
+    # Un solo trazo invisible con el hover en el centro de cada barra
+    centro = visibles["Start"] + (visibles["Plot_Finish"] - visibles["Start"]) / 2
+    fig.add_trace(go.Scattergl(
+        x=centro, y=fila, mode="markers", marker=dict(size=grosor, opacity=0),
+        customdata=visibles[["Hover_Text"]].to_numpy(),
+        hovertemplate="%{customdata[0]}<extra></extra>", showlegend=False,
+    ))
+
+    # Hitos: fin de cada proyecto y de cada tarea independiente visible
+    hitos = agregados.milestone_rows(visibles)
+    fig.add_trace(go.Scattergl(
+        x=hitos["Original_Finish"], y=fila.loc[hitos.index],
+        mode="markers", marker=dict(symbol="diamond", size=10, color="#D30000", line=dict(color="black", width=1)),
+        hoverinfo="skip", showlegend=False,
+    ))
+
+    # Separadores de proyecto en una sola traza en vez de un add_hline por proyecto
+    proyectos = pd.Series([llave.split("|||")[0] for llave in llaves])
+    cortes = np.flatnonzero(proyectos.ne(proyectos.shift()).to_numpy()[1:]) + 0.5
+    if len(cortes):
+        x0, x1 = visibles["Start"].min(), visibles["Original_Finish"].max()
+        xs, ys = _segmentos(np.full(len(cortes), x0), np.full(len(cortes), x1), cortes)
+        fig.add_trace(go.Scattergl(
+            x=xs, y=ys, mode="lines", line=dict(color="gray", width=1, dash="dot"),
+            hoverinfo="skip", showlegend=False,
+        ))
+
+    etiquetas = [f"{p} · {t.strip()}" for p, t in (llave.split("|||") for llave in llaves)]
+    fig.update_yaxes(
+        autorange="reversed", title_text="", tickmode="array",
+        tickvals=list(range(len(llaves))), ticktext=etiquetas, showgrid=False,
+    )
+    fig.update_xaxes(type="date", showgrid=True, gridcolor="lightgray", gridwidth=1, tickformat="%d %b %Y")
+    fig.update_layout(
+        plot_bgcolor="white",
+        height=min(ALTO_MAXIMO, max(450, len(llaves) * ALTO_FILA + 120)),
+        margin=dict(l=250, r=50),
+        showlegend=False,
+        hovermode="closest",
+    )
+
+    hoy_ms = int(pd.Timestamp(hoy).timestamp() * 1000)
+    fig.add_vline(
+        x=hoy_ms, line_width=2, line_dash="dash", line_color="darkblue",
+        annotation_text=f" HOY ({hoy.strftime('%d/%m/%Y')}) ", annotation_position="top right",
+        annotation_font_color="darkblue",
+    )
+    return fig
@@ -0,0 +1,39 @@
+"""Mapa de calor de carga por responsable (va debajo del Gantt)."""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+ALTO_PERSONA = 26
+
+
+def build_load_heatmap(carga, capacidad, hoy):
+    """Azul hasta la capacidad diaria; de ahí en adelante, naranja a rojo."""
+    tope = max(2 * capacidad, float(carga.hours.max(initial=0)))
+    corte = capacidad / tope
+    fig = go.Figure(go.Heatmap(
+        z=carga.hours.round(1),
+        x=carga.dates,
+        y=carga.people,
+        zmin=0,
+        zmax=tope,
+        colorscale=[
+            [0, "#FFFFFF"], [corte, "#4285F4"],
+            [min(1, corte + 1e-6), "#FBBC05"], [1, "#D30000"],
+        ],
+        colorbar=dict(title="Horas/día"),
+        customdata=np.where(carga.hours > capacidad + 1e-9, "⚠️ Sobreasignado", ""),
+        hovertemplate="<b>%{y}</b><br>%{x|%d %b %Y}<br>%{z} hrs %{customdata}<extra></extra>",
+        xgap=1,
+        ygap=1,
+    ))
+    fig.update_yaxes(autorange="reversed", title_text="")
+    fig.update_xaxes(type="date", tickformat="%d %b %Y", showgrid=False)
+    fig.update_layout(
+        plot_bgcolor="white",
+        height=max(250, len(carga.people) * ALTO_PERSONA + 120),
+        margin=dict(l=150, r=50),
+    )
+
+    hoy_ms = int(pd.Timestamp(hoy).timestamp() * 1000)
+    fig.add_vline(x=hoy_ms, line_width=2, line_dash="dash", line_color="darkblue")
+    return fig
@@ -0,0 +1,107 @@
+"""Caché por contenido para las etapas de salida (gráfico, resumen, reporte).
+
+La llave es una huella del cronograma calculado más ``hoy`` (y lo que cada
+etapa necesite, p. ej. el modo del gráfico). Si un rerun no cambió el
+cronograma se reutiliza el objeto ya construido en vez de rehacerlo.
+``ContentCache`` es un LRU con tope de entradas y de memoria aproximada;
+se comparte entre sesiones con ``st.cache_resource``.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def schedule_fingerprint(sched_df, *extra):
+    """Huella estable del cronograma (contenido + orden) y de ``extra``."""
+    h = hashlib.sha1()
+    h.update("|".join(map(str, sched_df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(sched_df.astype(str), index=False).to_numpy().tobytes())
+    for valor in extra:
+        h.update(b"\x00" + repr(valor).encode())
+    return h.hexdigest()
+
+
+def estimate_size(value):
+    """Bytes aproximados de un valor cacheado (DataFrames, bytes, figuras, tuplas)."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(getattr(value, "nbytes", None), int):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(estimate_size(v) for v in value.values()) + 64 * len(value)
+    data = getattr(value, "data", None)
+    if data is not None and hasattr(value, "layout"):
+        # Figura de Plotly: se cuentan los puntos de cada traza
+        total = 0
+        for trace in data:
+            for attr in ("x", "y", "text", "customdata"):
+                arr = getattr(trace, attr, None)
+                if arr is not None:
+                    total += 48 * len(arr)
+        return total + 4096
+    return 256
+
+
+class ContentCache:
+    """LRU con límite de entradas y de memoria estimada."""
+
+    def __init__(self, max_entries=64, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def get_or_build(self, key, builder):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+        value = builder()
+        self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._sizes.pop(key)
+                del self._items[key]
+            if size > self.max_bytes:
+                # Demasiado grande para guardarlo: se entrega sin cachear
+                return
+            self._items[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._items) > self.max_entries or self._bytes > self.max_bytes:
+                viejo, _ = self._items.popitem(last=False)
+                self._bytes -= self._sizes.pop(viejo)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self._bytes = 0
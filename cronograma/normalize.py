@@ -0,0 +1,109 @@
+"""Limpieza vectorizada de la tabla de tareas.
+
+``prepare_editor_frame`` deja lo leído de la hoja listo para
+``st.data_editor`` y ``normalize_tasks`` convierte la salida del editor en
+un frame tipado y validado para el cálculo. Ambas trabajan columna por
+columna; ninguna convierte valores fila por fila.
+"""
+import pandas as pd
+
+# Textos que la hoja/el editor usan para "vacío"
+NULL_TOKENS = ["", "None", "none", "nan", "NaN", "NaT", "null", "<NA>"]
+
+TEXT_COLUMNS = ["Task ID", "Parent Task ID", "Project Name", "Task Name", "Responsable(s)", "Notas Extra", "Depends On"]
+DEFAULT_PROJECT = "Sin Proyecto"
+DEFAULT_COLOR = "Por defecto"
+
+
+def clean_text(series):
+    """Texto sin espacios sobrantes; los nulos y tokens vacíos quedan como NA."""
+    s = series.astype("string").str.strip()
+    return s.mask(s.isin(NULL_TOKENS))
+
+
+def _column(df, col, default):
+    if col in df.columns:
+        return df[col]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def prepare_editor_frame(df, opciones_color):
+    """Columnas faltantes, colores válidos y tipos básicos para el editor."""
+    df = df.copy()
+    for col in ["Notas Extra", "Parent Task ID", "Responsable(s)"]:
+        if col not in df.columns: df[col] = ""
+
+    if "Horas Invertidas" not in df.columns: df["Horas Invertidas"] = 0
+    if "% Avance" not in df.columns: df["% Avance"] = 0
+    if "Duration (Days)" not in df.columns: df["Duration (Days)"] = 1
+
+    if "Color" not in df.columns:
+        df["Color"] = DEFAULT_COLOR
+    else:
+        df["Color"] = df["Color"].where(df["Color"].isin(opciones_color), DEFAULT_COLOR)
+
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            s = df[col].astype(str)
+            df[col] = s.astype(object).where(~s.isin(NULL_TOKENS), None)
+
+    df["Horas Invertidas"] = pd.to_numeric(df["Horas Invertidas"], errors='coerce').fillna(0)
+    df["Duration (Days)"] = pd.to_numeric(df["Duration (Days)"], errors='coerce').fillna(1).astype(int)
+    df["% Avance"] = pd.to_numeric(df["% Avance"], errors='coerce').fillna(0).clip(0, 100)
+
+    if "Start Date" in df.columns:
+        df["Start Date"] = pd.to_datetime(df["Start Date"], errors='coerce').dt.date
+
+    return df
+
+
+def normalize_tasks(df, opciones_color):
+    """Frame tipado de tareas válidas y lista de filas rechazadas.
+
+    Tipos: ``Project Name`` y ``Color`` categóricos, ``Start Date``
+    datetime64 (NaT si no hay fecha manual), ``Duration (Days)`` int32 (mín.
+    1), ``Horas Invertidas`` y ``% Avance`` (0 a 100) float64. El índice es el del frame de entrada.
+    Se rechazan filas sin ``Task ID`` y, si un ID se repite, todas salvo la
+    última (la que gana al calcular). Cada rechazo es un dict con ``fila``,
+    ``Task ID`` y ``motivo``.
+    """
+    ids = clean_text(_column(df, "Task ID", None))
+
+    sin_id = ids.isna()
+    repetido = ids.duplicated(keep="last") & ~sin_id
+    rechazadas = sin_id | repetido
+
+    rejected = [
+        {"fila": idx, "Task ID": None, "motivo": "Sin Task ID"} for idx in df.index[sin_id.to_numpy()]
+    ] + [
+        {"fila": idx, "Task ID": t_id, "motivo": "Task ID duplicado (se usa la última fila)"}
+        for idx, t_id in zip(df.index[repetido.to_numpy()], ids[repetido])
+    ]
+
+    validas = df.loc[~rechazadas.to_numpy()]
+    ids = ids[~rechazadas]
+
+    color = clean_text(_column(validas, "Color", DEFAULT_COLOR))
+    color = color.where(color.isin(opciones_color), DEFAULT_COLOR)
+
+    duracion = pd.to_numeric(_column(validas, "Duration (Days)", 1), errors="coerce")
+    horas = pd.to_numeric(_column(validas, "Horas Invertidas", 0), errors="coerce")
+    avance = pd.to_numeric(_column(validas, "% Avance", 0), errors="coerce")
+    inicio = pd.to_datetime(_column(validas, "Start Date", None), errors="coerce")
+
+    tasks = pd.DataFrame({
+        "Task ID": ids.astype(object),
+        "Parent Task ID": clean_text(_column(validas, "Parent Task ID", None)).astype(object),
+        "Project Name": clean_text(_column(validas, "Project Name", None)).fillna(DEFAULT_PROJECT).astype("category"),
+        "Task Name": clean_text(_column(validas, "Task Name", None)).fillna("").astype(object),
+        "Depends On": clean_text(_column(validas, "Depends On", None)).fillna("").astype(object),
+        "Duration (Days)": duracion.fillna(1).clip(lower=1).astype("int32"),
+        "Start Date": inicio.astype("datetime64[ns]"),
+        "Horas Invertidas": horas.fillna(0.0).astype("float64"),
+        "Responsable(s)": clean_text(_column(validas, "Responsable(s)", None)).fillna("").astype(object),
+        "Notas Extra": clean_text(_column(validas, "Notas Extra", None)).fillna("").astype(object),
+        "Color": pd.Categorical(color.astype(object), categories=list(opciones_color)),
+        "% Avance": avance.fillna(0.0).clip(0, 100).astype("float64"),
+    }, index=validas.index)
+    tasks["Parent Task ID"] = tasks["Parent Task ID"].where(tasks["Parent Task ID"].notna(), None)
+    return tasks, rejected
@@ -0,0 +1,215 @@
+"""Portafolio armado con varias hojas (una por unidad de negocio).
+
+``PortfolioTable`` tiene una ``CachedTable`` por hoja, así que cada fuente
+conserva su propio TTL y refresco en segundo plano. Las lecturas se hacen
+en paralelo en un pool de hilos: la primera carga tarda lo que la hoja más
+lenta y no la suma de todas.
+
+Con más de una hoja, las filas llevan la columna ``Fuente`` y los Task ID
+(y las referencias en ``Parent Task ID`` / ``Depends On``) se muestran como
+``"Fuente::ID"`` para que no choquen entre hojas. Una referencia que ya
+trae ``::`` apunta a otra hoja y se deja tal cual. Al guardar se quita el
+prefijo y cada hoja recibe sólo sus filas.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from cronograma.normalize import NULL_TOKENS
+from cronograma.shared import PartialWriteError
+
+SOURCE_COLUMN = "Fuente"
+SEPARADOR = "::"
+COLUMNAS_ID = ("Task ID", "Parent Task ID")
+_SIN_CAMBIOS = object()
+
+
+def _vacio(texto):
+    return texto.isna() | texto.isin(NULL_TOKENS)
+
+
+def _prefijar_lista(serie, prefijo):
+    # "T3, T5 SS+2" -> "A::T3, A::T5 SS+2" (sin tocar las que ya traen "::")
+    partes = serie.astype("string").str.split(",").explode().str.strip()
+    local = ~_vacio(partes) & ~partes.str.contains(SEPARADOR, regex=False).fillna(False)
+    partes = partes.where(~local, prefijo + partes)
+    partes = partes[~_vacio(partes)]
+    unidas = partes.groupby(level=0).agg(", ".join)
+    return unidas.reindex(serie.index).astype(object).where(lambda s: s.notna(), None)
+
+
+def _quitar_prefijo_lista(serie, prefijo):
+    partes = serie.astype("string").str.split(",").explode().str.strip()
+    partes = partes[~_vacio(partes)]
+    propias = partes.str.startswith(prefijo).fillna(False)
+    partes = partes.where(~propias, partes.str.slice(len(prefijo)))
+    unidas = partes.groupby(level=0).agg(", ".join)
+    return unidas.reindex(serie.index).astype(object).where(lambda s: s.notna(), None)
+
+
+def namespace_frame(df, fuente):
+    """Agrega la columna ``Fuente`` y antepone ``"fuente::"`` a los IDs locales."""
+    df = df.copy()
+    prefijo = fuente + SEPARADOR
+    for col in COLUMNAS_ID:
+        if col in df.columns:
+            texto = df[col].astype("string").str.strip()
+            local = ~_vacio(texto) & ~texto.str.contains(SEPARADOR, regex=False).fillna(False)
+            df[col] = df[col].astype(object).where(~local, prefijo + texto)
+    if "Depends On" in df.columns:
+        df["Depends On"] = _prefijar_lista(df["Depends On"], prefijo)
+    df.insert(0, SOURCE_COLUMN, fuente)
+    return df
+
+
+def strip_namespace(df, fuente):
+    """Inverso de ``namespace_frame`` para las filas de ``fuente``."""
+    df = df.drop(columns=[SOURCE_COLUMN], errors="ignore")
+    prefijo = fuente + SEPARADOR
+    for col in COLUMNAS_ID:
+        if col in df.columns:
+            texto = df[col].astype("string").str.strip()
+            propia = texto.str.startswith(prefijo).fillna(False)
+            df[col] = df[col].astype(object).where(~propia, texto.str.slice(len(prefijo)))
+    if "Depends On" in df.columns:
+        df["Depends On"] = _quitar_prefijo_lista(df["Depends On"], prefijo)
+    return df
+
+
+def _fuentes_de_filas(df, fuentes):
+    # Hoja de cada fila: su columna Fuente, el prefijo de su Task ID o la primera hoja
+    if len(fuentes) == 1:
+        return pd.Series(fuentes[0], index=df.index, dtype="string")
+    if SOURCE_COLUMN in df.columns:
+        fuente = df[SOURCE_COLUMN].astype("string")
+    else:
+        fuente = pd.Series(pd.NA, index=df.index, dtype="string")
+    por_id = df["Task ID"].astype("string").str.split(SEPARADOR, n=1).str[0]
+    fuente = fuente.where(fuente.isin(fuentes), por_id.where(por_id.isin(fuentes)))
+    return fuente.fillna(fuentes[0])
+
+
+def split_portfolio(df, fuentes):
+    """``{fuente: filas sin prefijo}``; las filas nuevas sin ``Fuente`` se asignan
+    por el prefijo de su Task ID o, si no tienen, a la primera hoja."""
+    if df is None:
+        return {}
+    if len(fuentes) == 1:
+        return {fuentes[0]: df.drop(columns=[SOURCE_COLUMN], errors="ignore")}
+
+    fuente = _fuentes_de_filas(df, fuentes)
+    return {
+        nombre: strip_namespace(df[fuente == nombre], nombre).reset_index(drop=True)
+        for nombre in fuentes
+    }
+
+
+class PortfolioTable:
+    """Une varias ``CachedTable`` en un solo portafolio."""
+
+    def __init__(self, tables, max_workers=8):
+        self.tables = dict(tables)
+        self.max_workers = max_workers
+        self.errors = {}
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def sources(self):
+        return list(self.tables)
+
+    @property
+    def offline_sources(self):
+        """Hojas que no respondieron y se muestran desde el snapshot local."""
+        return [nombre for nombre, table in self.tables.items() if table.offline]
+
+    @property
+    def version(self):
+        """Versión de cada hoja; cambia cuando cualquiera se vuelve a leer con otro contenido."""
+        return tuple(table.version for table in self.tables.values())
+
+    @property
+    def snapshot_at(self):
+        """Fecha del snapshot más viejo que se está mostrando, o ``None``."""
+        fechas = [table.snapshot_at for table in self.tables.values() if table.snapshot_at is not None]
+        return min(fechas) if fechas else None
+
+    def _map(self, fn, items):
+        if len(items) == 1:
+            return [fn(items[0])]
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hojas")
+        return list(self._pool.map(fn, items))
+
+    def get(self):
+        """Todas las hojas leídas en paralelo y unidas.
+
+        Una hoja que falla se omite y queda en ``errors``; si fallan todas se
+        propaga el primer error.
+        """
+        def leer(nombre):
+            try:
+                return nombre, self.tables[nombre].get(), None
+            except Exception as e:
+                return nombre, None, e
+
+        resultados = self._map(leer, self.sources)
+        self.errors = {nombre: e for nombre, _, e in resultados if e is not None}
+        frames = [(nombre, df) for nombre, df, e in resultados if e is None]
+        if not frames:
+            raise next(iter(self.errors.values()))
+        if len(self.tables) == 1:
+            return frames[0][1]
+        frames = [namespace_frame(df.dropna(how="all"), nombre) for nombre, df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def save(self, new_df, base_df):
+        """Guarda cada hoja con su parte del portafolio; devuelve ``{fuente: delta}``.
+
+        Las hojas sin cambios no se escriben ni se invalidan. Cada hoja se
+        guarda aunque otra falle: si alguna falla se lanza
+        ``PartialWriteError`` con los deltas de las que sí se guardaron y el
+        portafolio tal como quedó (lo nuevo de esas hojas y ``base_df`` en
+        las que fallaron, que se invalidan para releerlas).
+        """
+        nuevas = split_portfolio(new_df, self.sources)
+        bases = split_portfolio(base_df, self.sources)
+
+        def guardar(nombre):
+            base = bases.get(nombre)
+            try:
+                if base is not None and len(self.tables) > 1 and _iguales(nuevas[nombre], base):
+                    return nombre, _SIN_CAMBIOS, None
+                return nombre, self.tables[nombre].save(nuevas[nombre], base), None
+            except Exception as e:
+                return nombre, None, e
+
+        resultados = self._map(guardar, self.sources)
+        errores = {nombre: e for nombre, _, e in resultados if e is not None}
+        escritos = {nombre: delta for nombre, delta, e in resultados if e is None and delta is not _SIN_CAMBIOS}
+        if errores:
+            for nombre in errores:
+                self.tables[nombre].invalidate()
+            raise PartialWriteError(errores, escritos, self._como_quedo(new_df, base_df, errores))
+        return escritos
+
+    def _como_quedo(self, new_df, base_df, fallidas):
+        partes = [new_df[~_fuentes_de_filas(new_df, self.sources).isin(fallidas).to_numpy()]]
+        if base_df is not None:
+            fallaron = base_df[_fuentes_de_filas(base_df, self.sources).isin(fallidas).to_numpy()]
+            partes.append(fallaron.reindex(columns=new_df.columns))
+        return pd.concat(partes, ignore_index=True)
+
+    def invalidate(self):
+        for table in self.tables.values():
+            table.invalidate()
+
+
+def _iguales(a, b):
+    if not a.columns.equals(b.columns) or len(a) != len(b):
+        return False
+    return a.astype(str).reset_index(drop=True).equals(b.astype(str).reset_index(drop=True))
@@ -0,0 +1,96 @@
+"""Tiempos por etapa de cada rerun.
+
+``StageTimer`` mide con un ``with`` el tiempo de pared, las filas
+procesadas y, si se pide, el pico de memoria de cada etapa (``tracemalloc``,
+sólo en modo depuración porque hace más lento todo). Los registros se
+muestran en un expander y se pueden agregar a un JSONL local.
+Las etapas se miden una tras otra; no se anidan. Si el rerun se corta antes
+de ``finish`` (``st.rerun``, ``st.stop``), ``tracemalloc`` se apaga igual
+cuando el timer se descarta.
+
+``tracemalloc`` es uno solo por proceso y las sesiones de Streamlit corren
+en hilos del mismo proceso: los timers con memoria llevan una cuenta
+compartida (con candado) y el último en terminar lo apaga. Por lo mismo el
+pico de una etapa es el de todo el proceso mientras dura, incluidas las
+asignaciones de otras sesiones que estén corriendo a la vez.
+"""
+import json
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+
+_candado_trazado = threading.Lock()
+_timers_trazando = 0
+_trazado_propio = False
+
+
+def _tomar_trazado():
+    global _timers_trazando, _trazado_propio
+    with _candado_trazado:
+        if _timers_trazando == 0:
+            # Si ya estaba encendido desde afuera (``-X tracemalloc``) no se apaga al final
+            _trazado_propio = not tracemalloc.is_tracing()
+            if _trazado_propio:
+                tracemalloc.start()
+        _timers_trazando += 1
+
+
+def _soltar_trazado():
+    global _timers_trazando
+    with _candado_trazado:
+        _timers_trazando -= 1
+        if _timers_trazando == 0 and _trazado_propio:
+            tracemalloc.stop()
+
+
+class StageTimer:
+    def __init__(self, memoria=False, clock=time.perf_counter):
+        self.clock = clock
+        self.records = []
+        self.inicio = clock()
+        self.fecha = datetime.now().isoformat(timespec="seconds")
+        self.memoria = memoria
+        self._apagar = None
+        if memoria:
+            _tomar_trazado()
+            # Corre una sola vez: en ``finish`` o al descartar el timer
+            self._apagar = weakref.finalize(self, _soltar_trazado)
+
+    @contextmanager
+    def stage(self, nombre, filas=None):
+        """Mide el bloque; se puede fijar ``registro["filas"]`` adentro."""
+        registro = {"etapa": nombre, "filas": filas}
+        if self.memoria:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = self.clock()
+        try:
+            yield registro
+        finally:
+            registro["segundos"] = round(self.clock() - t0, 6)
+            if self.memoria:
+                registro["memoria_pico_mb"] = round((tracemalloc.get_traced_memory()[1] - base) / 2**20, 3)
+            self.records.append(registro)
+
+    def finish(self):
+        """Cierra la medición (suelta ``tracemalloc``) y devuelve el total."""
+        if self._apagar is not None:
+            self._apagar()
+        return round(self.clock() - self.inicio, 6)
+
+    def to_frame(self):
+        columnas = ["etapa", "segundos", "filas"] + (["memoria_pico_mb"] if self.memoria else [])
+        return pd.DataFrame(self.records, columns=columnas)
+
+    def append_jsonl(self, path, **extra):
+        """Agrega una línea con todas las etapas de este rerun."""
+        linea = {"fecha": self.fecha, "total_s": round(self.clock() - self.inicio, 6), **extra, "etapas": self.records}
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(linea, ensure_ascii=False, default=str) + "\n")
+
@@ -0,0 +1,301 @@
+"""Avance en el tiempo y valor ganado (EV/PV/AC).
+
+``ProgressLog`` guarda en un SQLite local fotos fechadas de las horas y del
+% de avance de cada tarea. Sólo se agregan fotos, y cada una guarda
+únicamente las tareas que cambiaron desde la anterior, en columnas binarias
+(un arreglo por campo): un año de fotos diarias ocupa lo que se movió y no
+días × tareas, y leerlo todo son unas cientos de filas. Al consultar, cada
+tarea conserva su último valor hasta que vuelve a cambiar.
+
+``earned_value`` lleva todo a periodos (día, semana o mes):
+
+- BAC (presupuesto, horas) = días hábiles del plan × capacidad diaria;
+- PV = BAC × fracción del plan transcurrida al cierre del periodo;
+- EV = BAC × % de avance registrado; AC = horas registradas;
+- SPI = EV / PV y CPI = EV / AC.
+
+Las curvas por proyecto salen de arreglos de diferencias (como la carga por
+responsable): el costo es tareas + cambios + proyectos × periodos, sin
+matrices tarea × periodo. Sólo las hojas tienen valores propios; padres y
+proyectos suman a sus hojas.
+"""
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from cronograma.hierarchy import Hierarchy
+from cronograma.workdays import WorkCalendar
+
+FRECUENCIAS = {"D": "Día", "W": "Semana", "M": "Mes"}
+PORTAFOLIO = "Portafolio"
+COLUMNA_AVANCE = "% Avance"
+_EPOCA = np.datetime64("1970-01-01", "D")
+
+
+def _dias(fechas):
+    # Días desde 1970 de cada fecha
+    return (pd.to_datetime(pd.Series(fechas)).to_numpy(dtype="datetime64[D]") - _EPOCA).astype("int64")
+
+
+def _cociente(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    return np.divide(a, b, out=np.full(np.broadcast(a, b).shape, np.nan), where=b != 0)
+
+
+class ProgressLog:
+    """Fotos de horas y % de avance por tarea en un archivo SQLite local, sólo de agregar."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.executescript(
+            "CREATE TABLE IF NOT EXISTS _avance_tareas (codigo INTEGER PRIMARY KEY, task_id TEXT UNIQUE);"
+            "CREATE TABLE IF NOT EXISTS _avance_fotos ("
+            "foto INTEGER PRIMARY KEY AUTOINCREMENT, dia INTEGER, registrada REAL, "
+            "tareas BLOB, horas BLOB, avance BLOB);"
+        )
+        return con
+
+    @staticmethod
+    def _leer(con, hasta=None):
+        # (dia, código, horas, avance) de cada cambio, en orden de fecha y de registro
+        consulta = "SELECT dia, tareas, horas, avance FROM _avance_fotos"
+        parametros = ()
+        if hasta is not None:
+            consulta += " WHERE dia <= ?"
+            parametros = (int(_dias([hasta])[0]),)
+        fotos = con.execute(consulta + " ORDER BY dia, foto", parametros).fetchall()
+        codigos = [np.frombuffer(t, dtype="int64") for _, t, _, _ in fotos]
+        dias = np.repeat(np.array([d for d, _, _, _ in fotos], dtype="int64"), [len(c) for c in codigos])
+        unir = lambda partes, tipo: np.concatenate(partes) if partes else np.zeros(0, dtype=tipo)
+        return (
+            dias, unir(codigos, "int64"),
+            unir([np.frombuffer(h, dtype="float64") for _, _, h, _ in fotos], "float64"),
+            unir([np.frombuffer(a, dtype="float64") for _, _, _, a in fotos], "float64"),
+        )
+
+    def record(self, fecha, task_ids, horas, avance):
+        """Agrega la foto de ``fecha``; devuelve cuántas tareas cambiaron.
+
+        Aunque nada cambie se guarda la foto (vacía), así ``last_day`` sabe
+        que ese día ya se registró.
+        """
+        ids = pd.Series(task_ids, dtype=object).astype(str).str.strip().to_numpy()
+        horas = np.asarray(horas, dtype="float64")
+        avance = np.asarray(avance, dtype="float64")
+        con = self._connect()
+        try:
+            with con:
+                codigo_de = dict(con.execute("SELECT task_id, codigo FROM _avance_tareas").fetchall())
+                nuevas = [(t,) for t in dict.fromkeys(ids) if t not in codigo_de]
+                if nuevas:
+                    con.executemany("INSERT INTO _avance_tareas (task_id) VALUES (?)", nuevas)
+                    codigo_de = dict(con.execute("SELECT task_id, codigo FROM _avance_tareas").fetchall())
+                codigos = np.array([codigo_de[t] for t in ids], dtype="int64")
+
+                # Último valor conocido de cada tarea, para guardar sólo lo que cambió
+                _, hist_cod, hist_horas, hist_avance = self._leer(con)
+                ultima_vez = len(hist_cod) - 1 - np.unique(hist_cod[::-1], return_index=True)[1]
+                ultimo = np.full((2, max(int(codigos.max(initial=0)), int(hist_cod.max(initial=0))) + 1), np.nan)
+                ultimo[0, hist_cod[ultima_vez]] = hist_horas[ultima_vez]
+                ultimo[1, hist_cod[ultima_vez]] = hist_avance[ultima_vez]
+                cambio = ~(np.isclose(ultimo[0, codigos], horas) & np.isclose(ultimo[1, codigos], avance))
+
+                con.execute(
+                    "INSERT INTO _avance_fotos (dia, registrada, tareas, horas, avance) VALUES (?, ?, ?, ?, ?)",
+                    (int(_dias([fecha])[0]), time.time(), codigos[cambio].tobytes(),
+                     horas[cambio].tobytes(), avance[cambio].tobytes()),
+                )
+        finally:
+            con.close()
+        return int(cambio.sum())
+
+    def record_table(self, fecha, df):
+        """Foto de las hojas de una tabla como la del editor (los padres sólo acumulan)."""
+        padres = set(df["Parent Task ID"].dropna().astype(str).str.strip())
+        ids = df["Task ID"].astype(str).str.strip()
+        hojas = df[df["Task ID"].notna() & ~ids.isin(padres)].drop_duplicates("Task ID", keep="last")
+        avance = hojas[COLUMNA_AVANCE] if COLUMNA_AVANCE in hojas.columns else pd.Series(0.0, index=hojas.index)
+        return self.record(
+            fecha, hojas["Task ID"],
+            pd.to_numeric(hojas["Horas Invertidas"], errors="coerce").fillna(0.0),
+            pd.to_numeric(avance, errors="coerce").fillna(0.0).clip(0, 100),
+        )
+
+    def history(self, hasta=None):
+        """Cambios registrados hasta ``hasta``: ``Fecha``, ``Task ID``, ``Horas`` y ``Avance``, en orden."""
+        con = self._connect()
+        try:
+            dias, codigos, horas, avance = self._leer(con, hasta)
+            nombres = con.execute("SELECT codigo, task_id FROM _avance_tareas").fetchall()
+        finally:
+            con.close()
+        task_id = np.empty(max((c for c, _ in nombres), default=0) + 1, dtype=object)
+        for codigo, nombre in nombres:
+            task_id[codigo] = nombre
+        return pd.DataFrame({
+            "Fecha": _EPOCA + dias,
+            "Task ID": task_id[codigos],
+            "Horas": horas,
+            "Avance": avance,
+        })
+
+    def last_day(self):
+        """Fecha de la última foto, o ``None`` si no hay."""
+        con = self._connect()
+        try:
+            dia = con.execute("SELECT MAX(dia) FROM _avance_fotos").fetchone()[0]
+        finally:
+            con.close()
+        return None if dia is None else pd.Timestamp(_EPOCA + np.int64(dia))
+
+    def revision(self):
+        """Número de la última foto (0 si no hay); cambia con cada registro."""
+        con = self._connect()
+        try:
+            return con.execute("SELECT COALESCE(MAX(foto), 0) FROM _avance_fotos").fetchone()[0]
+        finally:
+            con.close()
+
+
+class EarnedValue:
+    """Resultado de ``earned_value``.
+
+    ``tasks`` una fila por tarea (los padres suman a sus hojas) y
+    ``projects`` una por proyecto, ambas al día de hoy; ``curves`` el
+    acumulado de cada proyecto y del portafolio al cierre de cada periodo
+    (EV y AC vacíos después de hoy); ``totals`` las métricas del portafolio.
+    """
+
+    def __init__(self, tasks, projects, curves, totals):
+        self.tasks = tasks
+        self.projects = projects
+        self.curves = curves
+        self.totals = totals
+
+
+def _indices(frame):
+    frame["SV"] = frame["EV"] - frame["PV"]
+    frame["CV"] = frame["EV"] - frame["AC"]
+    frame["SPI"] = _cociente(frame["EV"], frame["PV"])
+    frame["CPI"] = _cociente(frame["EV"], frame["AC"])
+    frame["% Plan"] = _cociente(frame["PV"], frame["BAC"])
+    frame["% Avance"] = _cociente(frame["EV"], frame["BAC"])
+    return frame
+
+
+def earned_value(sched_df, padres_ids, historial, hoy, freq="W", capacidad=8, calendar=None, linea_base=None):
+    """Valor ganado de ``sched_df`` (``TaskStore.to_frame``) por periodo hasta hoy.
+
+    ``historial`` es ``ProgressLog.history``. Con ``linea_base`` (de
+    ``baseline_frame``) el PV y el BAC salen de sus fechas en vez de las
+    del plan actual.
+    """
+    calendar = calendar or WorkCalendar.calendar_days()
+    hoy = pd.Timestamp(hoy).normalize()
+    ids = sched_df["Task ID"].astype(object)
+    hoja = ~ids.isin(padres_ids).to_numpy()
+    proyecto, proyectos = pd.factorize(sched_df["Project Name"].astype(str))
+
+    inicio, fin = sched_df["Original_Start"], sched_df["Original_Finish"]
+    if linea_base is not None:
+        base = linea_base.drop_duplicates("Task ID").set_index("Task ID")
+        inicio = ids.map(base["Baseline_Start"]).fillna(inicio)
+        fin = ids.map(base["Baseline_Finish"]).fillna(fin)
+    o_inicio = calendar.ordinals(inicio)
+    o_fin = np.maximum(calendar.ordinals(fin), o_inicio)
+    plazo = o_fin - o_inicio
+    bac = np.where(hoja, plazo * float(capacidad), 0.0)
+
+    # Historial de las hojas de este cronograma
+    fila = pd.Index(ids).get_indexer(historial["Task ID"])
+    propia = fila >= 0
+    propia[propia] = hoja[fila[propia]]
+    cambios = historial[propia]
+    fila = fila[propia]
+
+    # Periodos desde el primer plan, registro u hoy hasta el último día del plan (o hoy)
+    desde = min(inicio.min(), hoy)
+    if len(cambios):
+        desde = min(desde, cambios["Fecha"].min())
+    hasta = max(fin.max() - pd.Timedelta(days=1), hoy)
+    periodos = pd.period_range(desde, hasta, freq=freq)
+    cierres = periodos.end_time.normalize()
+    # Días hábiles cumplidos al terminar el día de cada cierre
+    x = calendar.ordinals(cierres + pd.Timedelta(days=1))
+    actual = int(periodos.get_loc(hoy.to_period(freq)))
+
+    # PV: cada hoja planea BAC / plazo horas por día hábil entre su inicio y su fin
+    cero = int(min(o_inicio.min(), x.min()))
+    largo = int(max(o_fin.max(), x.max())) - cero + 1
+    tasa = _cociente(bac, plazo)
+    tasa[np.isnan(tasa)] = 0.0
+    pendiente = np.zeros((len(proyectos), largo + 1))
+    np.add.at(pendiente, (proyecto, o_inicio - cero), tasa)
+    np.add.at(pendiente, (proyecto, o_fin - cero), -tasa)
+    acumulado = np.concatenate([np.zeros((len(proyectos), 1)), np.cumsum(np.cumsum(pendiente, axis=1), axis=1)], axis=1)
+    pv = acumulado[:, x - cero]
+
+    # EV y AC: cada cambio suma su diferencia con el valor anterior de la tarea en su periodo
+    periodo = np.searchsorted(cierres.to_numpy(dtype="datetime64[ns]"), cambios["Fecha"].to_numpy(dtype="datetime64[ns]"), side="left")
+    valores = pd.DataFrame({
+        "fila": fila, "periodo": periodo,
+        "EV": bac[fila] * cambios["Avance"].to_numpy() / 100.0, "AC": cambios["Horas"].to_numpy(),
+    })
+    valores = valores[valores["periodo"] <= actual].drop_duplicates(["fila", "periodo"], keep="last").sort_values(["fila", "periodo"], kind="stable")
+    previos = valores.groupby("fila")[["EV", "AC"]].shift(fill_value=0.0)
+    curvas = {"PV": pv}
+    for campo in ("EV", "AC"):
+        suma = np.zeros((len(proyectos), len(periodos)))
+        np.add.at(
+            suma, (proyecto[valores["fila"].to_numpy()], valores["periodo"].to_numpy()),
+            (valores[campo] - previos[campo]).to_numpy(),
+        )
+        suma = np.cumsum(suma, axis=1)
+        suma[:, actual + 1:] = np.nan
+        curvas[campo] = suma
+
+    bac_proyecto = np.bincount(proyecto, weights=bac, minlength=len(proyectos))
+    curves = pd.concat([
+        pd.DataFrame({
+            "Proyecto": nombre, "Fecha": cierres,
+            "BAC": total_bac, "PV": curvas["PV"][i], "EV": curvas["EV"][i], "AC": curvas["AC"][i],
+        })
+        for i, (nombre, total_bac) in enumerate(zip(proyectos, bac_proyecto))
+    ] + [pd.DataFrame({
+        "Proyecto": PORTAFOLIO, "Fecha": cierres, "BAC": bac_proyecto.sum(),
+        "PV": curvas["PV"].sum(axis=0), "EV": curvas["EV"].sum(axis=0), "AC": curvas["AC"].sum(axis=0),
+    })], ignore_index=True)
+
+    # Estado de cada tarea hoy; los padres suman a sus hojas
+    ultimo = valores.drop_duplicates("fila", keep="last")
+    ev = np.zeros(len(ids))
+    ac = np.zeros(len(ids))
+    ev[ultimo["fila"].to_numpy()] = ultimo["EV"].to_numpy()
+    ac[ultimo["fila"].to_numpy()] = ultimo["AC"].to_numpy()
+    x_hoy = calendar.ordinals([hoy + pd.Timedelta(days=1)])[0]
+    pv_hoy = np.clip(x_hoy - o_inicio, 0, plazo) * tasa
+    arbol = Hierarchy.from_ids(ids, sched_df["Parent Task ID"])
+    tasks = _indices(pd.DataFrame({
+        "Task ID": ids.to_numpy(),
+        "Proyecto": sched_df["Project Name"].astype(str).to_numpy(),
+        "Tarea": sched_df["Task Name"].to_numpy(),
+        "Padre": ~hoja,
+        "BAC": arbol.rollup(bac), "PV": arbol.rollup(pv_hoy), "EV": arbol.rollup(ev), "AC": arbol.rollup(ac),
+    }))
+    por_proyecto = lambda valores: np.bincount(proyecto, weights=valores, minlength=len(proyectos))
+    projects = _indices(pd.DataFrame({
+        "Proyecto": proyectos,
+        "BAC": bac_proyecto,
+        "PV": por_proyecto(np.where(hoja, pv_hoy, 0.0)), "EV": por_proyecto(ev), "AC": por_proyecto(ac),
+    }))
+    suma = projects[["BAC", "PV", "EV", "AC"]].sum()
+    totals = {
+        "bac": float(suma["BAC"]), "pv": float(suma["PV"]), "ev": float(suma["EV"]), "ac": float(suma["AC"]),
+        "spi": float(_cociente(suma["EV"], suma["PV"])), "cpi": float(_cociente(suma["EV"], suma["AC"])),
+    }
+    return EarnedValue(tasks, projects, curves, totals)
@@ -0,0 +1,38 @@
+"""Reporte final descargable."""
+import pandas as pd
+
+
+ICONOS_ESTADO = {"En Proceso": "En Proceso 🔵", "Pendiente": "Pendiente ⏳", "Completado": "Completado ✅"}
+
+
+def task_status(sched_df, fecha_hoy):
+    """"Pendiente", "En Proceso" o "Completado" respecto a ``fecha_hoy``."""
+    estado = pd.Series("En Proceso", index=sched_df.index)
+    estado[sched_df["Original_Start"].dt.normalize() > fecha_hoy] = "Pendiente"
+    estado[sched_df["Original_Finish"].dt.normalize() <= fecha_hoy] = "Completado"
+    return estado
+
+
+def build_report(sched_df, fecha_hoy_segura):
+    """Una fila por tarea con fechas, duración, estado y dependencia legibles."""
+    estado = task_status(sched_df, fecha_hoy_segura).map(ICONOS_ESTADO)
+
+    table_data = {
+        "ID": sched_df["Task ID"],
+        "Parent Task ID": sched_df["Parent Task ID"].fillna("-").replace("", "-"),
+        "Proyecto": sched_df["Project Name"],
+        "Tarea": sched_df["Task Name"],
+        "Responsable(s)": sched_df["Responsable(s)"],
+        "Horas": sched_df["Horas Invertidas"],
+        "Inicio": sched_df["Original_Start"].dt.strftime("%d/%m/%Y"),
+        "Fin": (sched_df["Original_Finish"] - pd.Timedelta(days=1)).dt.strftime("%d/%m/%Y"),
+        "Duración": sched_df["Duration"].astype(str) + " días",
+        "Estado": estado,
+        "Dependencia": sched_df["Dependency Info"].astype(str).str.replace("🔗", "").str.replace("🟢", "").str.replace("📂", "").str.strip(),
+        "Holgura (días)": sched_df["Total_Float"].astype("Int64"),
+        "Ruta Crítica": sched_df["Critical"].map({True: "Sí 🔴", False: "No"}),
+        "Notas Extra": sched_df["Notas Extra"],
+    }
+
+    df_table = pd.DataFrame(table_data)
+    return df_table
@@ -0,0 +1,101 @@
+"""Carga de trabajo por responsable.
+
+``Responsable(s)`` se separa una sola vez en un índice de asignaciones
+(fila de tarea, persona). Las horas de cada tarea se reparten en partes
+iguales entre sus responsables y entre sus días hábiles; la matriz persona
+× día se arma con un arreglo de diferencias (``np.add.at`` en el inicio y
+el fin de cada asignación y una suma acumulada), así que el costo es
+asignaciones + personas × días, sin recorrer los días de cada tarea.
+Con días libres por persona hay una matriz por calendario de tarea
+(``WorkCalendar.key``) y en los días libres de ese calendario no hay carga.
+Los padres no cuentan: sus horas son la suma de las de sus hijas.
+"""
+import numpy as np
+import pandas as pd
+
+from cronograma.workdays import WorkCalendar
+
+
+def assignee_index(responsables):
+    """``(posiciones, códigos, personas)``: una entrada por tarea y responsable."""
+    nombres = pd.Series(responsables).fillna("").astype(str).reset_index(drop=True)
+    nombres = nombres.str.split(",").explode().str.strip()
+    nombres = nombres[nombres != ""]
+    codigos, personas = pd.factorize(nombres, sort=True)
+    return nombres.index.to_numpy(dtype="int64"), codigos.astype("int64"), pd.Index(personas, name="Responsable")
+
+
+class ResourceLoad:
+    """Horas por persona (filas) y día hábil (columnas)."""
+
+    def __init__(self, people, dates, hours):
+        self.people = people
+        self.dates = dates
+        self.hours = hours
+
+    @property
+    def nbytes(self):
+        return self.hours.nbytes
+
+    @property
+    def empty(self):
+        return self.hours.size == 0
+
+    def to_frame(self):
+        return pd.DataFrame(self.hours, index=self.people, columns=self.dates)
+
+    def overallocated(self, capacidad):
+        """Días en que alguien supera ``capacidad`` horas, de mayor a menor exceso."""
+        fila, col = np.nonzero(self.hours > capacidad + 1e-9)
+        horas = self.hours[fila, col]
+        return pd.DataFrame({
+            "Responsable": self.people[fila],
+            "Fecha": self.dates[col],
+            "Horas": horas.round(1),
+            "Exceso": (horas - capacidad).round(1),
+        }).sort_values(["Exceso", "Fecha"], ascending=[False, True], ignore_index=True)
+
+    def summary(self, capacidad):
+        """Total, pico diario y días sobreasignados de cada persona."""
+        return pd.DataFrame({
+            "Horas Totales": self.hours.sum(axis=1).round(1),
+            "Pico Diario": self.hours.max(axis=1, initial=0).round(1),
+            "Días Sobreasignados": (self.hours > capacidad + 1e-9).sum(axis=1),
+        }, index=self.people).reset_index()
+
+
+def resource_load(sched_df, padres_ids=(), calendar=None):
+    """Matriz de carga a partir del cronograma calculado (``TaskStore.to_frame``)."""
+    calendar = calendar or WorkCalendar.calendar_days()
+    hojas = sched_df[~sched_df["Task ID"].isin(padres_ids)]
+    pos, codigos, personas = assignee_index(hojas["Responsable(s)"])
+    if not len(pos):
+        return ResourceLoad(personas, pd.DatetimeIndex([]), np.zeros((len(personas), 0)))
+
+    # Cada tarea se trabaja en los días hábiles de su calendario (sin los días libres de sus responsables)
+    keys = pd.Series([calendar.key(r) for r in hojas["Responsable(s)"]], dtype=object)
+    grupo, llaves = pd.factorize(keys)
+    inicio = calendar.ordinals(hojas["Original_Start"])
+    lapso = np.maximum(calendar.ordinals(hojas["Original_Finish"]) - inicio, 1)
+    dias = np.maximum(calendar.workdays_array(hojas["Original_Start"], hojas["Original_Finish"], keys), 1)
+    por_tarea = np.bincount(pos, minlength=len(hojas))
+    tasa = hojas["Horas Invertidas"].to_numpy(dtype="float64") / (np.maximum(por_tarea, 1) * dias)
+
+    ini = inicio[pos]
+    fin = ini + lapso[pos]
+    origen = ini.min()
+    ancho = int(fin.max() - origen)
+    fechas = pd.DatetimeIndex(calendar.from_ordinals(np.arange(origen, origen + ancho)), name="Fecha")
+
+    # Una matriz de diferencias por calendario; en los días libres del calendario la carga es cero
+    horas = np.zeros((len(personas), ancho))
+    for g, llave in enumerate(llaves):
+        sel = grupo[pos] == g
+        diferencias = np.zeros((len(personas), ancho + 1))
+        np.add.at(diferencias, (codigos[sel], ini[sel] - origen), tasa[pos][sel])
+        np.add.at(diferencias, (codigos[sel], fin[sel] - origen), -tasa[pos][sel])
+        carga = np.cumsum(diferencias, axis=1)[:, :ancho]
+        if llave:
+            carga *= np.is_busday(fechas.to_numpy().astype("datetime64[D]"), busdaycal=calendar.busdaycal(llave))
+        horas += carga
+    return ResourceLoad(personas, fechas, horas)
@@ -0,0 +1,443 @@
+"""Escenarios "¿qué pasa si…?" y líneas base.
+
+Un ``Scenario`` es una lista corta de cambios (duración, retraso, inicio o
+dependencias de algunas tareas) sobre el cronograma ya calculado. Para
+evaluarlo no se copia la tabla: ``apply_scenario`` parte de un
+``TaskStore.overlay`` que comparte los registros de la base y
+``reschedule`` copia sólo lo que recalcula (las tareas cambiadas, lo que
+depende de ellas y las que cambian de holgura). Varios escenarios pueden
+vivir a la vez y cada uno ocupa lo que cambió, no el portafolio entero.
+
+Una línea base es una foto de inicio/fin por tarea guardada con nombre;
+``slip_columns`` compara cualquier cronograma contra ella (desvío en días
+hábiles) y el Gantt la dibuja como barras fantasma. ``ScenarioLibrary``
+guarda líneas base y escenarios en un SQLite local.
+"""
+import copy
+import json
+import sqlite3
+import time
+
+import pandas as pd
+
+from cronograma.scheduling import assign_roots, find_root, reschedule, schedule, task_links
+from cronograma.store import TaskStore
+
+# Campo del escenario -> columna de la tabla de cambios
+CAMPOS = {
+    "duracion": "Duración (Días hábiles)",
+    "retraso": "Retraso (días hábiles)",
+    "inicio": "Start Date",
+    "depende": "Depends On",
+}
+SIN_DEPENDENCIAS = "-"  # En "Depends On" de un escenario: quitar las dependencias
+
+
+class Scenario:
+    """Cambios de un escenario: ``Task ID -> {campo: valor}``.
+
+    ``duracion`` reemplaza la duración, ``retraso`` le suma días hábiles
+    (la tarea termina más tarde), ``inicio`` cambia la fecha manual y
+    ``depende`` el texto de ``Depends On``.
+    """
+
+    def __init__(self, nombre, cambios=None):
+        self.nombre = nombre
+        self.cambios = {tid: dict(c) for tid, c in (cambios or {}).items() if c}
+
+    def __len__(self):
+        return len(self.cambios)
+
+    def signature(self):
+        """Llave para el caché de salidas."""
+        return (self.nombre, tuple(sorted((tid, tuple(sorted(c.items()))) for tid, c in self.cambios.items())))
+
+    @classmethod
+    def from_frame(cls, nombre, df):
+        """Escenario a partir de la tabla de cambios (celdas vacías = sin cambio)."""
+        cambios = {}
+        for fila in df.to_dict("records"):
+            tid = fila.get("Task ID")
+            if tid is None or pd.isna(tid) or not str(tid).strip():
+                continue
+            cambio = {}
+            for campo, columna in CAMPOS.items():
+                valor = fila.get(columna)
+                if valor is None or (not isinstance(valor, str) and pd.isna(valor)) or str(valor).strip() == "":
+                    continue
+                if campo == "duracion":
+                    cambio[campo] = max(1, int(valor))
+                elif campo == "retraso":
+                    cambio[campo] = int(valor)
+                elif campo == "inicio":
+                    cambio[campo] = pd.Timestamp(valor).normalize()
+                else:
+                    cambio[campo] = str(valor).strip()
+            if cambio:
+                cambios.setdefault(str(tid).strip(), {}).update(cambio)
+        return cls(nombre, cambios)
+
+    def to_frame(self):
+        filas = [
+            {"Task ID": tid, **{CAMPOS[campo]: valor for campo, valor in cambio.items()}}
+            for tid, cambio in self.cambios.items()
+        ]
+        return pd.DataFrame(filas, columns=["Task ID", *CAMPOS.values()])
+
+
+class ScenarioSchedule:
+    """Cronograma de un escenario sobre ``base``.
+
+    ``store`` comparte con ``base`` todos los registros que el escenario no
+    tocó; ``recalculadas`` son los índices que se volvieron a fechar e
+    ``ignoradas`` los Task ID del escenario que no existen o son padres (un
+    padre se mueve a través de sus subtareas).
+    """
+
+    def __init__(self, escenario, base, store, result, recalculadas, ignoradas):
+        self.escenario = escenario
+        self.base = base
+        self.store = store
+        self.result = result
+        self.recalculadas = recalculadas
+        self.ignoradas = ignoradas
+
+    @property
+    def nombre(self):
+        return self.escenario.nombre
+
+    def moved(self):
+        """Índices de las tareas cuyo inicio o fin difiere de la base."""
+        return [
+            i for i, (t, b) in enumerate(zip(self.store.tasks, self.base.tasks))
+            if t is not b and (t.start != b.start or t.finish != b.finish)
+        ]
+
+    def to_frame(self):
+        return self.store.to_frame()
+
+
+def _aplicar(task, cambio, store):
+    # Cambia los datos de entrada de ``task`` (ya copiada); devuelve sus vínculos si cambiaron
+    if "duracion" in cambio:
+        task.manual_duration = int(cambio["duracion"])
+    if "retraso" in cambio:
+        task.manual_duration = max(1, task.manual_duration + int(cambio["retraso"]))
+    if "inicio" in cambio:
+        task.manual_start = pd.Timestamp(cambio["inicio"])
+    if "depende" in cambio:
+        task.depends_on = "" if cambio["depende"] == SIN_DEPENDENCIAS else cambio["depende"]
+        return task_links(task.depends_on, store)
+    return None
+
+
+def _reordenar(result, links, successors, position, order, p, i):
+    """Ajusta el orden topológico para un vínculo nuevo ``p -> i`` con ``p`` después de ``i``.
+
+    Sólo se reordena la franja entre las dos (Pearce-Kelly): lo que sigue a
+    ``i`` sin pasar de ``p`` y lo que precede a ``p`` sin bajar de ``i``.
+    Devuelve False si el vínculo cierra un ciclo.
+    """
+    tope, piso = position[p], position[i]
+    adelante, pila = set(), [i]
+    while pila:
+        n = pila.pop()
+        if n == p:
+            return False
+        if n not in adelante:
+            adelante.add(n)
+            pila.extend(s for s in successors[n] if position[s] <= tope)
+    atras, pila = set(), [p]
+    while pila:
+        n = pila.pop()
+        if n not in atras:
+            atras.add(n)
+            previas = result.children[n] if n in result.children else [q for q, _, _ in links[n]]
+            pila.extend(q for q in previas if position[q] >= piso)
+    nodos = sorted(atras, key=position.__getitem__) + sorted(adelante, key=position.__getitem__)
+    for n, lugar in zip(nodos, sorted(position[n] for n in nodos)):
+        position[n] = lugar
+        order[lugar] = n
+    return True
+
+
+def _relink(result, vinculos):
+    """``result`` con los vínculos nuevos de algunas tareas, o None si cierran un ciclo.
+
+    Las listas por tarea se comparten con ``result`` salvo las que cambian.
+    Un vínculo que apunta "hacia atrás" en el orden topológico reordena sólo
+    la franja afectada; uno que cierra (o toca) un ciclo obliga a recalcular
+    desde cero.
+    """
+    links = list(result.links)
+    successors = list(result.successors)
+    position = list(result.position)
+    order = list(result.order)
+    for i, nuevos in vinculos.items():
+        if i in result.cycle_members:
+            return None
+        for p in {p for p, _, _ in links[i]}:
+            successors[p] = [s for s in successors[p] if s != i]
+        links[i] = nuevos
+        for p, _, _ in nuevos:
+            if p in result.cycle_members or p == i:
+                return None
+            if position[p] > position[i] and not _reordenar(result, links, successors, position, order, p, i):
+                return None
+            successors[p] = successors[p] + [i]
+    nuevo = copy.copy(result)
+    nuevo.links = links
+    nuevo.successors = successors
+    nuevo.position = position
+    nuevo.order = order
+    return nuevo
+
+
+def apply_scenario(store, result, escenario, default_start):
+    """Calcula ``escenario`` sobre el cronograma ``(store, result)`` sin modificarlo.
+
+    Sólo se recalcula desde las tareas cambiadas hacia adelante. Si un
+    cambio de dependencias cierra un ciclo se recalcula todo sobre una copia
+    completa (el único caso que duplica la tabla).
+    """
+    overlay = store.overlay()
+    sucias, vinculos, ignoradas = set(), {}, []
+    for tid, cambio in escenario.cambios.items():
+        i = store.index.get(tid)
+        if i is None or i in result.children:
+            ignoradas.append(tid)
+            continue
+        task = overlay.tasks[i] = store.tasks[i].copy()
+        propios = _aplicar(task, cambio, store)
+        if propios is not None:
+            vinculos[i] = propios
+        sucias.add(tid)
+
+    resultado = _relink(result, vinculos) if vinculos else result
+    if resultado is None:
+        return _recalcular_todo(store, result, escenario, default_start, ignoradas)
+
+    recalculadas = reschedule(overlay, resultado, sucias, default_start, base=store)
+    if vinculos:
+        _reasignar_rutas(overlay, store, resultado, vinculos)
+    return ScenarioSchedule(escenario, store, overlay, resultado, recalculadas, ignoradas)
+
+
+def _reasignar_rutas(overlay, base, result, vinculos):
+    # Las rutas del Gantt siguen las dependencias entre hermanas (también las de
+    # un padre, que no cuentan para las fechas): sólo pueden cambiar en los grupos
+    # de hermanas con vínculos nuevos, aunque las fechas no se muevan. Se copia
+    # sólo lo que cambia.
+    indices = set()
+    for pid in {overlay.tasks[i].parent_id for i in vinculos if overlay.tasks[i].parent_id}:
+        p = overlay.index.get(pid)
+        indices.update(result.children[p] if p is not None else (t.idx for t in overlay if t.parent_id == pid))
+    raices = {}
+    cambiadas = []
+    for i in sorted(indices):
+        task = overlay.tasks[i]
+        if task.parent_id and find_root(task.task_id, overlay, raices) != task.root_id:
+            if task is base.tasks[i]:
+                overlay.tasks[i] = task.copy()
+            cambiadas.append(overlay.tasks[i])
+    assign_roots(overlay, cambiadas)
+
+
+def _recalcular_todo(store, result, escenario, default_start, ignoradas):
+    copia = TaskStore(task.copy() for task in store)
+    for tid, cambio in escenario.cambios.items():
+        if tid not in ignoradas:
+            _aplicar(copia[tid], cambio, copia)
+    resultado = schedule(copia, default_start, result.calendar)
+    assign_roots(copia)
+    return ScenarioSchedule(escenario, store, copia, resultado, set(range(len(copia))), ignoradas)
+
+
+def _desvio(calendar, fechas, referencia):
+    # Días hábiles (calendario general) de ``referencia`` a ``fechas``; NA sin referencia
+    fechas = pd.Series(fechas)
+    referencia = pd.Series(referencia, index=fechas.index)
+    salida = pd.Series(pd.NA, index=fechas.index, dtype="Int64")
+    ok = (fechas.notna() & referencia.notna()).to_numpy()
+    if ok.any():
+        salida[ok] = calendar.ordinals(fechas[ok]) - calendar.ordinals(referencia[ok])
+    return salida
+
+
+def _fin_por_proyecto(store):
+    fines = {}
+    for task in store:
+        if task.finish is not None and (task.project not in fines or task.finish > fines[task.project]):
+            fines[task.project] = task.finish
+    return fines
+
+
+def compare_projects(store, calculados, calendar):
+    """Fin de cada proyecto en la base y en cada escenario, con el desvío en días hábiles."""
+    base = pd.Series(_fin_por_proyecto(store), dtype="datetime64[ns]")
+    tabla = pd.DataFrame({"Proyecto": base.index.astype(str), "Fin base": base.to_numpy()})
+    for calculado in calculados:
+        fin = base.index.map(pd.Series(_fin_por_proyecto(calculado.store), dtype="datetime64[ns]"))
+        tabla[f"Fin {calculado.nombre}"] = fin
+        tabla[f"Δ {calculado.nombre}"] = _desvio(calendar, fin, tabla["Fin base"]).to_numpy()
+    return tabla.sort_values("Fin base", kind="stable").reset_index(drop=True)
+
+
+def compare_tasks(store, calculados, calendar):
+    """Tareas que se mueven en algún escenario: fin en la base y en cada uno.
+
+    Sólo se leen los registros que cada escenario copió; el resto es igual
+    a la base por construcción.
+    """
+    movidas = sorted(set().union(*(c.moved() for c in calculados))) if calculados else []
+    tareas = [store.tasks[i] for i in movidas]
+    tabla = pd.DataFrame({
+        "Task ID": [t.task_id for t in tareas],
+        "Proyecto": [t.project for t in tareas],
+        "Tarea": [t.name for t in tareas],
+        "Fin base": pd.to_datetime([t.finish for t in tareas]),
+    })
+    for calculado in calculados:
+        fin = pd.to_datetime([calculado.store.tasks[i].finish for i in movidas])
+        tabla[f"Fin {calculado.nombre}"] = fin
+        tabla[f"Δ {calculado.nombre}"] = _desvio(calendar, fin, tabla["Fin base"]).to_numpy()
+    return tabla
+
+
+def baseline_frame(store):
+    """Foto de la línea base: ``Task ID``, ``Baseline_Start`` y ``Baseline_Finish``."""
+    return pd.DataFrame({
+        "Task ID": store.column("task_id"),
+        "Baseline_Start": pd.to_datetime(store.column("start")),
+        "Baseline_Finish": pd.to_datetime(store.column("finish")),
+    })
+
+
+def slip_columns(sched_df, linea_base, calendar):
+    """Línea base y desvío (días hábiles) de cada tarea de ``sched_df``, indexado por Task ID.
+
+    Las tareas que no estaban en la línea base quedan con NaT/NA.
+    """
+    linea_base = linea_base.drop_duplicates("Task ID").set_index("Task ID")
+    ids = sched_df["Task ID"]
+    inicio_base = ids.map(linea_base["Baseline_Start"])
+    fin_base = ids.map(linea_base["Baseline_Finish"])
+    return pd.DataFrame({
+        "Baseline_Start": inicio_base.to_numpy(),
+        "Baseline_Finish": fin_base.to_numpy(),
+        "Desvio_Inicio": _desvio(calendar, sched_df["Original_Start"], inicio_base).to_numpy(),
+        "Desvio_Fin": _desvio(calendar, sched_df["Original_Finish"], fin_base).to_numpy(),
+    }, index=pd.Index(ids.to_numpy(), name="Task ID"))
+
+
+class ScenarioLibrary:
+    """Líneas base y escenarios guardados con nombre en un archivo SQLite local."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.executescript(
+            "CREATE TABLE IF NOT EXISTS _lineas_base (nombre TEXT PRIMARY KEY, guardada REAL, tareas INTEGER);"
+            "CREATE TABLE IF NOT EXISTS _lineas_base_tareas (nombre TEXT, task_id TEXT, inicio TEXT, fin TEXT);"
+            "CREATE INDEX IF NOT EXISTS _lineas_base_tareas_nombre ON _lineas_base_tareas (nombre);"
+            "CREATE TABLE IF NOT EXISTS _escenarios (nombre TEXT PRIMARY KEY, cambios TEXT, guardado REAL);"
+        )
+        return con
+
+    # === Líneas base ===
+
+    def save_baseline(self, nombre, store):
+        filas = baseline_frame(store)
+        con = self._connect()
+        try:
+            with con:
+                con.execute("DELETE FROM _lineas_base_tareas WHERE nombre = ?", (nombre,))
+                con.executemany(
+                    "INSERT INTO _lineas_base_tareas (nombre, task_id, inicio, fin) VALUES (?, ?, ?, ?)",
+                    zip(
+                        [nombre] * len(filas), filas["Task ID"].astype(str),
+                        filas["Baseline_Start"].dt.strftime("%Y-%m-%d"), filas["Baseline_Finish"].dt.strftime("%Y-%m-%d"),
+                    ),
+                )
+                con.execute(
+                    "INSERT INTO _lineas_base (nombre, guardada, tareas) VALUES (?, ?, ?) "
+                    "ON CONFLICT(nombre) DO UPDATE SET guardada = excluded.guardada, tareas = excluded.tareas",
+                    (nombre, time.time(), len(filas)),
+                )
+        finally:
+            con.close()
+
+    def baselines(self):
+        """``{nombre: guardada}`` (fecha UTC), de la más nueva a la más vieja."""
+        con = self._connect()
+        try:
+            filas = con.execute("SELECT nombre, guardada FROM _lineas_base ORDER BY guardada DESC").fetchall()
+        finally:
+            con.close()
+        return {nombre: pd.Timestamp(guardada, unit="s") for nombre, guardada in filas}
+
+    def load_baseline(self, nombre):
+        con = self._connect()
+        try:
+            df = pd.read_sql_query(
+                "SELECT task_id AS \"Task ID\", inicio AS Baseline_Start, fin AS Baseline_Finish "
+                "FROM _lineas_base_tareas WHERE nombre = ?", con, params=(nombre,),
+            )
+        finally:
+            con.close()
+        df["Baseline_Start"] = pd.to_datetime(df["Baseline_Start"])
+        df["Baseline_Finish"] = pd.to_datetime(df["Baseline_Finish"])
+        return df
+
+    def delete_baseline(self, nombre):
+        con = self._connect()
+        try:
+            with con:
+                con.execute("DELETE FROM _lineas_base_tareas WHERE nombre = ?", (nombre,))
+                con.execute("DELETE FROM _lineas_base WHERE nombre = ?", (nombre,))
+        finally:
+            con.close()
+
+    # === Escenarios ===
+
+    def save_scenario(self, escenario):
+        cambios = {
+            tid: {campo: (valor.strftime("%Y-%m-%d") if campo == "inicio" else valor) for campo, valor in cambio.items()}
+            for tid, cambio in escenario.cambios.items()
+        }
+        con = self._connect()
+        try:
+            with con:
+                con.execute(
+                    "INSERT INTO _escenarios (nombre, cambios, guardado) VALUES (?, ?, ?) "
+                    "ON CONFLICT(nombre) DO UPDATE SET cambios = excluded.cambios, guardado = excluded.guardado",
+                    (escenario.nombre, json.dumps(cambios, ensure_ascii=False), time.time()),
+                )
+        finally:
+            con.close()
+
+    def scenarios(self):
+        """Escenarios guardados, por nombre."""
+        con = self._connect()
+        try:
+            filas = con.execute("SELECT nombre, cambios FROM _escenarios ORDER BY nombre").fetchall()
+        finally:
+            con.close()
+        salida = []
+        for nombre, texto in filas:
+            cambios = json.loads(texto)
+            for cambio in cambios.values():
+                if "inicio" in cambio:
+                    cambio["inicio"] = pd.Timestamp(cambio["inicio"])
+            salida.append(Scenario(nombre, cambios))
+        return salida
+
+    def delete_scenario(self, nombre):
+        con = self._connect()
+        try:
+            with con:
+                con.execute("DELETE FROM _escenarios WHERE nombre = ?", (nombre,))
+        finally:
+            con.close()
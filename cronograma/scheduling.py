@@ -0,0 +1,497 @@
+"""Motor de cálculo de fechas del cronograma.
+
+Reemplaza la resolución recursiva de ``compute_dates`` por un recorrido
+topológico iterativo (Kahn) sobre un índice padre → hijos construido una
+sola vez, así que el costo es lineal en tareas + relaciones y no depende
+del límite de recursión de Python. Trabaja sobre un ``TaskStore`` y usa
+los índices enteros de las tareas para el grafo.
+
+``Depends On`` acepta varias predecesoras separadas por comas, cada una con
+tipo de vínculo (FS por defecto, SS, FF, SF) y desfase en días, p. ej.
+``T3, T5 SS+2, T7:FF-1``. Después del cálculo hacia adelante,
+``critical_path`` hace el paso hacia atrás (CPM) y deja la holgura total y
+la ruta crítica en cada tarea.
+
+Duraciones y desfases se cuentan en días hábiles de un ``WorkCalendar``
+(sin calendario, días corridos). Las tareas independientes, que son la
+mayoría, se fechan todas juntas con ``schedule_array``.
+"""
+import re
+from collections import deque
+
+import pandas as pd
+
+from cronograma.workdays import WorkCalendar
+
+INFO_PADRE = "Tarea Padre 📂"
+INFO_INDEPENDIENTE = "Independiente 🟢"
+INFO_CICLO = "Ciclo de dependencias ⚠️"
+
+_VINCULO_RE = re.compile(r"^(?P<id>.+?)(?:\s*[:\s]\s*(?P<tipo>FS|SS|FF|SF))?\s*(?:(?P<lag>[+-]\s*\d+)\s*d?)?$", re.IGNORECASE)
+_UN_DIA = pd.Timedelta(days=1)
+
+
+def info_dependencia(dep_id):
+    return f"Depende de: {dep_id} 🔗"
+
+
+def parse_dependencies(texto, known=()):
+    """``"T3, T5 SS+2"`` -> ``[("T3", "FS", 0), ("T5", "SS", 2)]``.
+
+    Un elemento que coincide completo con un Task ID de ``known`` se toma
+    tal cual (así un ID como ``"A-1"`` no se lee como desfase).
+    """
+    vinculos = []
+    for parte in str(texto or "").split(","):
+        parte = parte.strip()
+        if not parte:
+            continue
+        m = None if parte in known else _VINCULO_RE.match(parte)
+        if m is None:
+            vinculos.append((parte, "FS", 0))
+            continue
+        lag = m.group("lag")
+        vinculos.append((
+            m.group("id").strip(),
+            (m.group("tipo") or "FS").upper(),
+            int(lag.replace(" ", "")) if lag else 0,
+        ))
+    return vinculos
+
+
+def format_link(dep_id, tipo, lag):
+    if tipo == "FS" and not lag:
+        return dep_id
+    return f"{dep_id} {tipo}{lag:+d}" if lag else f"{dep_id} {tipo}"
+
+
+def task_links(depends_on, store):
+    """Vínculos válidos de un texto de ``Depends On``: ``[(índice predecesora, tipo, lag), ...]``."""
+    propios = []
+    if depends_on:
+        for dep_id, tipo, lag in parse_dependencies(depends_on, store.index):
+            p = store.index.get(dep_id)
+            if p is not None:
+                propios.append((p, tipo, lag))
+    return propios
+
+
+def build_links(store):
+    """Vínculos válidos de cada tarea."""
+    return [task_links(task.depends_on, store) for task in store]
+
+
+class ScheduleResult:
+    """Resultado de ``schedule``: orden topológico, índices del grafo y ciclos.
+
+    ``children``, ``links``, ``successors`` y ``order`` usan índices del
+    store; ``cycles`` se reporta con Task IDs. ``calendar`` es el
+    calendario con el que se calculó (lo reutiliza ``reschedule``).
+    """
+
+    def __init__(self, store, order, children, links, successors, cycles, calendar):
+        self.order = order
+        self.calendar = calendar
+        self.children = children
+        self.links = links
+        self.successors = successors
+        self.cycles = cycles
+        self.position = [0] * len(order)
+        for pos, i in enumerate(order):
+            self.position[i] = pos
+        self.cycle_members = {store.index[tid] for comp in cycles for tid in comp}
+        self.padres_ids = {store.tasks[i].task_id for i in children}
+
+
+def build_children_index(store):
+    children = {}
+    for task in store:
+        p = store.index.get(task.parent_id) if task.parent_id else None
+        if p is not None:
+            children.setdefault(p, []).append(task.idx)
+    return children
+
+
+def _predecessors(i, children, links):
+    # Un padre depende de sus hijos; una hoja depende de sus predecesoras
+    if i in children:
+        return children[i]
+    return [p for p, _, _ in links[i]]
+
+
+def _find_cycles(nodes, preds):
+    """Componentes fuertemente conexas con ciclo (Tarjan iterativo sobre índices)."""
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    cycles = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(preds[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, it = work[-1]
+            advanced = False
+            for nxt in it:
+                if nxt not in preds:
+                    continue
+                if nxt not in index:
+                    index[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, iter(preds[nxt])))
+                    advanced = True
+                    break
+                elif nxt in on_stack:
+                    low[node] = min(low[node], index[nxt])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                comp = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    comp.append(w)
+                    if w == node:
+                        break
+                if len(comp) > 1 or node in preds[node]:
+                    cycles.append(comp[::-1])
+    return cycles
+
+
+def _earliest_start(pred, tipo, lag, dias, calendar, key):
+    # Inicio más temprano que permite un vínculo (fin exclusivo, como en todo el motor)
+    if tipo == "SS":
+        return calendar.shift(pred.start, lag, key)
+    if tipo == "FF":
+        ultimo = calendar.shift(pred.finish - _UN_DIA, lag, key)
+        return calendar.start_for_last(ultimo, dias, key)
+    if tipo == "SF":
+        ultimo = calendar.shift(calendar.shift(pred.start, lag, key), -1, key)
+        return calendar.start_for_last(ultimo, dias, key)
+    return calendar.shift(pred.finish, lag, key)
+
+
+def _resolve(i, store, children, links, default_start, calendar):
+    tasks = store.tasks
+    task = tasks[i]
+
+    if i in children:
+        # === TAREA PADRE ===
+        min_s, max_f = None, None
+        horas_totales = 0
+        resps = set()
+
+        for h in children[i]:
+            hijo = tasks[h]
+            if min_s is None or hijo.start < min_s: min_s = hijo.start
+            if max_f is None or hijo.finish > max_f: max_f = hijo.finish
+
+            horas_totales += hijo.horas
+            if hijo.responsables:
+                for r in str(hijo.responsables).split(","):
+                    if r.strip(): resps.add(r.strip())
+
+        s = min_s if min_s else default_start
+        f = max_f if max_f else (s + pd.Timedelta(days=1))
+
+        task.start = s
+        task.finish = f
+        task.duration = max(1, calendar.workdays(s, f))
+        task.horas = horas_totales
+        if not task.responsables:
+            task.responsables = ", ".join(list(resps))
+        task.dependency_info = INFO_PADRE
+    else:
+        # === TAREA HIJA / INDEPENDIENTE ===
+        propios = links[i]
+        key = calendar.key(task.responsables)
+
+        if propios:
+            # INICIA CUANDO LO PERMITE LA MÁS RESTRICTIVA DE SUS DEPENDENCIAS
+            dias = task.manual_duration
+            s = max(_earliest_start(tasks[p], tipo, lag, dias, calendar, key) for p, tipo, lag in propios)
+            task.dependency_info = info_dependencia(
+                ", ".join(format_link(tasks[p].task_id, tipo, lag) for p, tipo, lag in propios)
+            )
+        else:
+            s = task.manual_start if task.manual_start else default_start
+            task.dependency_info = INFO_INDEPENDIENTE
+
+        s = calendar.shift(s, 0, key)
+        task.start = s
+        task.finish = calendar.finish(s, task.manual_duration, key)
+        task.duration = task.manual_duration
+
+
+def _resolve_independent(indices, store, default_start, calendar):
+    # Hojas sin dependencias: se fechan todas en una operación por calendario
+    tasks = [store.tasks[i] for i in indices]
+    if not tasks:
+        return
+    inicios, fines = calendar.schedule_array(
+        [t.manual_start if t.manual_start else default_start for t in tasks],
+        [t.manual_duration for t in tasks],
+        [calendar.key(t.responsables) for t in tasks],
+    )
+    inicios = pd.DatetimeIndex(inicios.astype("datetime64[ns]"))
+    fines = pd.DatetimeIndex(fines.astype("datetime64[ns]"))
+    for task, s, f in zip(tasks, inicios, fines):
+        task.start = s
+        task.finish = f
+        task.duration = task.manual_duration
+        task.dependency_info = INFO_INDEPENDIENTE
+
+
+def _resolve_cycle_member(i, store, default_start, calendar):
+    # Misma salida de emergencia que la versión recursiva, pero reportada
+    task = store.tasks[i]
+    key = calendar.key(task.responsables)
+    s = calendar.shift(task.manual_start if task.manual_start else default_start, 0, key)
+    task.start = s
+    task.finish = calendar.finish(s, task.manual_duration, key)
+    task.duration = task.manual_duration
+    task.dependency_info = INFO_CICLO
+
+
+def schedule(store, default_start, calendar=None):
+    """Calcula start/finish/duration y los acumulados de padres in situ.
+
+    Devuelve un ``ScheduleResult``; ``cycles`` lista los grupos de Task IDs
+    que forman ciclos (por dependencia o por jerarquía). Esas tareas usan su
+    fecha manual (o ``default_start``) y el resto del cronograma sigue
+    calculándose a partir de ellas. Al final se calcula la ruta crítica.
+    """
+    calendar = calendar or WorkCalendar.calendar_days()
+    n = len(store)
+    children = build_children_index(store)
+    links = build_links(store)
+    preds = [_predecessors(i, children, links) for i in range(n)]
+
+    independientes = [i for i in range(n) if not preds[i]]
+    _resolve_independent(independientes, store, default_start, calendar)
+    resuelta = [False] * n
+    for i in independientes:
+        resuelta[i] = True
+
+    successors = [[] for _ in range(n)]
+    pending = [0] * n
+    for i, ps in enumerate(preds):
+        pending[i] = len(ps)
+        for p in ps:
+            successors[p].append(i)
+
+    order = []
+    queue = deque(i for i in range(n) if pending[i] == 0)
+    cycles = []
+
+    def release(i):
+        order.append(i)
+        for nxt in successors[i]:
+            pending[nxt] -= 1
+            if pending[nxt] == 0:
+                queue.append(nxt)
+
+    while True:
+        while queue:
+            i = queue.popleft()
+            if not resuelta[i]:
+                _resolve(i, store, children, links, default_start, calendar)
+            release(i)
+
+        if len(order) == n:
+            break
+
+        # Lo que queda está en un ciclo o aguas abajo de uno
+        remaining = [i for i in range(n) if pending[i] > 0]
+        sub_preds = {i: [p for p in preds[i] if pending[p] > 0] for i in remaining}
+        found = _find_cycles(remaining, sub_preds)
+        cycles.extend([store.tasks[i].task_id for i in comp] for comp in found)
+        for comp in found:
+            for i in comp:
+                _resolve_cycle_member(i, store, default_start, calendar)
+                pending[i] = -1
+        for comp in found:
+            for i in comp:
+                release(i)
+
+    result = ScheduleResult(store, order, children, links, successors, cycles, calendar)
+    critical_path(store, result)
+    return result
+
+
+def critical_path(store, result, base=None):
+    """Paso hacia atrás del CPM sobre el orden topológico de ``result``.
+
+    El fin tardío de cada tarea parte del fin de su proyecto y se ajusta con
+    sus sucesoras (según tipo de vínculo y desfase) y con su padre. Deja
+    ``total_float`` (días hábiles) y ``critical`` en cada tarea; un padre
+    toma la menor holgura de sus hijas. Las tareas en ciclo quedan sin
+    holgura. Trabaja con el número de día hábil de cada fecha (calendario
+    general, sin los días libres por persona) para que sea lineal y barato.
+
+    Con ``base`` (ver ``reschedule``) sólo se escriben las tareas cuya
+    holgura cambió, copiando antes las que todavía se comparten con ``base``.
+    """
+    tasks = store.tasks
+    calendar = result.calendar
+    inicio = calendar.ordinals([t.start for t in tasks]).tolist()
+    fin = calendar.ordinals([t.finish for t in tasks]).tolist()
+
+    fin_proyecto = {}
+    for t, f in zip(tasks, fin):
+        if f > fin_proyecto.get(t.project, f - 1):
+            fin_proyecto[t.project] = f
+    limite = [fin_proyecto[t.project] for t in tasks]
+
+    ciclo = result.cycle_members
+    holgura = [None] * len(tasks)
+    for i in reversed(result.order):
+        if i in ciclo:
+            continue
+        lf = limite[i]
+        ls = lf - (fin[i] - inicio[i])
+        holgura[i] = ls - inicio[i]
+
+        if i in result.children:
+            for c in result.children[i]:
+                if lf < limite[c]:
+                    limite[c] = lf
+            continue
+        for p, tipo, lag in result.links[i]:
+            if p in ciclo:
+                continue
+            # Un padre como predecesora se trata como un bloque rígido
+            if tipo == "FS":
+                tope = ls - lag
+            elif tipo == "SS":
+                tope = ls - lag + (fin[p] - inicio[p])
+            elif tipo == "FF":
+                tope = lf - lag
+            else:
+                tope = lf - lag + (fin[p] - inicio[p])
+            if tope < limite[p]:
+                limite[p] = tope
+
+    for i in result.order:
+        if i in result.children and holgura[i] is not None:
+            hijas = [holgura[c] for c in result.children[i] if holgura[c] is not None]
+            if hijas:
+                holgura[i] = min(holgura[i], min(hijas))
+        task = tasks[i]
+        critica = holgura[i] is not None and holgura[i] <= 0
+        if base is not None:
+            if task.total_float == holgura[i] and task.critical == critica:
+                continue
+            if task is base.tasks[i]:
+                task = tasks[i] = task.copy()
+        task.total_float = holgura[i]
+        task.critical = critica
+
+
+def find_root(task_id, store, cache=None):
+    """Inicio de la cadena de dependencias dentro del mismo padre (iterativo).
+
+    Con ``cache`` (dict) cada tarea del camino guarda su raíz, así que
+    recorrer todas las tareas cuesta lo mismo que recorrer cada cadena una vez.
+    """
+    visited_nodes = set()
+    camino = []
+    current = task_id
+    while True:
+        if cache is not None and current in cache:
+            raiz = cache[current]
+            break
+        if current in visited_nodes: return current  # Ciclo: no se guarda
+        visited_nodes.add(current)
+        camino.append(current)
+        task = store.get(current)
+        if task is None:
+            raiz = current
+            break
+        # Con varias predecesoras, la ruta sigue a la primera del mismo padre
+        pred = None
+        for dep_id, _, _ in parse_dependencies(task.depends_on, store.index):
+            candidata = store.get(dep_id)
+            if candidata is not None and candidata.parent_id == task.parent_id:
+                pred = candidata
+                break
+        if pred is None:
+            raiz = current
+            break
+        current = pred.task_id
+    if cache is not None:
+        for t_id in camino:
+            cache[t_id] = raiz
+    return raiz
+
+
+def assign_roots(store, tasks=None):
+    """Asigna root_id y track_name (carril del Gantt) a las subtareas."""
+    raices = {}
+    for task in (store if tasks is None else tasks):
+        if task.parent_id:
+            root_id = find_root(task.task_id, store, raices)
+            task.root_id = root_id
+            if root_id in store:
+                task.track_name = f"   ↳ Ruta: {store[root_id].name}"
+            else:
+                task.track_name = "   ↳ Subtareas"
+
+
+def downstream(result, indices):
+    """``indices`` más todo lo que depende de ellos (sucesoras y padres, a cualquier distancia)."""
+    affected = set()
+    stack = list(indices)
+    while stack:
+        i = stack.pop()
+        if i in affected:
+            continue
+        affected.add(i)
+        stack.extend(result.successors[i])
+    return affected
+
+
+def reschedule(store, result, dirty, default_start, inputs=None, base=None):
+    """Recalcula sólo las tareas ``dirty`` (Task IDs) y lo que depende de ellas.
+
+    Requiere que la estructura (padres y dependencias) no haya cambiado desde
+    que se obtuvo ``result``. Los nodos afectados se resuelven en el orden
+    topológico ya conocido; ``inputs`` (Task ID -> ``Task`` de entrada)
+    permite restaurar las horas y responsables propios de los padres antes
+    de volver a acumularlos. La ruta crítica se recalcula completa (es un
+    solo paso lineal). Devuelve el conjunto de índices recalculados.
+
+    ``base`` es el store del que ``store`` es un ``overlay``: las tareas que
+    todavía comparten registro con ``base`` se copian antes de tocarlas, así
+    ``base`` no cambia (copia al escribir).
+    """
+    affected = downstream(result, [store.index[tid] for tid in dirty if tid in store])
+
+    for i in sorted(affected, key=result.position.__getitem__):
+        if base is not None and store.tasks[i] is base.tasks[i]:
+            store.tasks[i] = store.tasks[i].copy()
+        task = store.tasks[i]
+        if inputs is not None and i in result.children:
+            task.horas = inputs[task.task_id].horas
+            task.responsables = inputs[task.task_id].responsables
+        if i in result.cycle_members:
+            _resolve_cycle_member(i, store, default_start, result.calendar)
+        else:
+            _resolve(i, store, result.children, result.links, default_start, result.calendar)
+    critical_path(store, result, base)
+    return affected
@@ -0,0 +1,212 @@
+"""Tabla de tareas compartida entre sesiones, con versión por fila.
+
+Todas las sesiones de la app (una ``SharedTable`` por proceso, con
+``st.cache_resource``) editan la misma copia en memoria en vez de pisarse
+en la hoja. Cada cambio confirmado sube la revisión y cada fila recuerda
+la revisión en que cambió por última vez.
+
+Guardar es optimista: la sesión entrega lo que editó y la revisión de la
+que partió. Si otros guardaron mientras tanto, lo editado se fusiona
+celda por celda (``merge_edits``); la fusión y el recálculo corren sin
+candado y la confirmación es un compare-and-swap sobre la revisión: si se
+movió, se vuelve a fusionar (si sigue perdiendo, el último intento se hace
+con el candado tomado). Sólo la confirmación y la escritura en la hoja,
+para que lleguen en orden, toman el candado; las lecturas nunca esperan
+porque el estado es inmutable y se reemplaza de una vez.
+
+Cada sesión tiene una ``Subscription``: al confirmar, se le empujan las
+llaves que cambiaron para que recargue y recalcule sólo esas tareas.
+"""
+import threading
+import weakref
+from collections import deque
+
+from cronograma.delta import KEY, DeltaNotApplicable, compute_delta, merge_edits
+
+INTENTOS_GUARDADO = 3  # Intentos optimistas antes de fusionar con el candado tomado
+
+
+class ConflictError(Exception):
+    """No se pudo fusionar lo editado con lo que guardaron otros."""
+
+
+class PartialWriteError(Exception):
+    """El ``writer`` guardó sólo una parte.
+
+    ``frame`` es la tabla tal como quedó en la fuente (lo escrito más lo que
+    falló, sin cambios), ``written`` lo que devolvió por lo escrito y
+    ``errors`` el error de cada parte que falló. ``SharedTable`` publica
+    ``frame`` antes de propagarlo y deja en ``revision`` la revisión vigente.
+    """
+
+    def __init__(self, errors, written, frame):
+        super().__init__("; ".join(f"{nombre} ({e})" for nombre, e in errors.items()))
+        self.errors = errors
+        self.written = written
+        self.frame = frame
+        self.revision = None
+
+
+class TableState:
+    """Foto inmutable: ``revision``, ``frame`` y ``versions`` (llave -> revisión del último cambio)."""
+
+    __slots__ = ("revision", "frame", "versions")
+
+    def __init__(self, revision, frame, versions):
+        self.revision = revision
+        self.frame = frame
+        self.versions = versions
+
+    def touched_since(self, revision):
+        """Llaves cambiadas o borradas después de ``revision``."""
+        return {k for k, v in self.versions.items() if v > revision}
+
+
+class Subscription:
+    """Buzón de una sesión: llaves que cambiaron desde la última vez que lo vació."""
+
+    def __init__(self, table):
+        self.table = table
+        self._lock = threading.Lock()
+        self._llaves = set()
+        self._todo = False
+
+    def push(self, llaves):
+        with self._lock:
+            if llaves is None:
+                self._todo = True
+            else:
+                self._llaves.update(llaves)
+
+    def pending(self):
+        """Llaves pendientes (``None`` = cambió toda la tabla) sin vaciar el buzón."""
+        with self._lock:
+            return None if self._todo else set(self._llaves)
+
+    def drain(self):
+        with self._lock:
+            llaves = None if self._todo else self._llaves
+            self._llaves = set()
+            self._todo = False
+        return llaves
+
+
+class SharedTable:
+    """Copia compartida de la tabla; ``writer(nuevo_df, base_df)`` la persiste (p. ej. ``PortfolioTable.save``)."""
+
+    def __init__(self, writer, intentos=INTENTOS_GUARDADO):
+        self.writer = writer
+        self.intentos = intentos
+        self._estado = TableState(0, None, {})
+        self._lock = threading.Lock()
+        self._suscripciones = weakref.WeakSet()
+        # Versiones de la fuente ya vistas: una lectura vieja que llega tarde no pisa lo guardado
+        self._vistas = deque(maxlen=16)
+
+    @property
+    def current(self):
+        return self._estado
+
+    def subscribe(self):
+        suscripcion = Subscription(self)
+        with self._lock:
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def sync(self, version, read):
+        """Incorpora una lectura de la fuente (cambios hechos fuera de la app) y devuelve el estado.
+
+        ``read()`` entrega la tabla y sólo se llama si ``version`` es nueva.
+        """
+        if version is not None and version in self._vistas:
+            return self._estado
+        with self._lock:
+            estado = self._estado
+            if version is not None and version in self._vistas:
+                return estado
+            df = read()
+            self._vistas.append(version)
+            if estado.frame is None:
+                self._estado = TableState(estado.revision + 1, df, {})
+                return self._estado
+            llaves = self._changed_keys(estado.frame, df)
+            if llaves is None or llaves:
+                self._publish(estado, df, llaves)
+            return self._estado
+
+    def commit(self, base_revision, base_df, edited_df, finalize=None):
+        """Guarda ``edited_df`` (editado a partir de ``base_df`` en ``base_revision``).
+
+        ``finalize(df)`` arma lo que se escribe a partir de la tabla ya
+        fusionada (p. ej. con las fechas recalculadas); recibe ``edited_df``
+        tal cual si nadie más guardó. Devuelve ``(revision, escrito,
+        conflictos)``: lo que devolvió ``writer`` y las celdas que no se
+        aplicaron porque otra persona las cambió. Lanza ``ConflictError``
+        si la edición no se puede fusionar y ``PartialWriteError`` (ya
+        publicado lo que sí se escribió) si ``writer`` guardó sólo una parte.
+        """
+        for _ in range(self.intentos):
+            estado = self._estado
+            final, conflictos = self._merge(estado, base_revision, base_df, edited_df, finalize)
+            with self._lock:
+                if self._estado is estado:
+                    return self._confirm(estado, final, conflictos)
+            # Otra sesión confirmó mientras fusionábamos: se reintenta sobre lo nuevo
+
+        # Demasiada competencia: el último intento fusiona con el candado tomado y ya no puede perder
+        with self._lock:
+            estado = self._estado
+            final, conflictos = self._merge(estado, base_revision, base_df, edited_df, finalize)
+            return self._confirm(estado, final, conflictos)
+
+    @staticmethod
+    def _merge(estado, base_revision, base_df, edited_df, finalize):
+        if estado.revision == base_revision or estado.frame is None:
+            fusion, conflictos = edited_df, []
+        elif base_df is None or base_df.empty:
+            raise ConflictError("La tabla cambió mientras editabas: recarga la página y vuelve a intentar.")
+        else:
+            try:
+                fusion, conflictos = merge_edits(base_df, edited_df, estado.frame, estado.touched_since(base_revision))
+            except DeltaNotApplicable as e:
+                raise ConflictError(f"No se pudo fusionar con los cambios de otras personas: {e}") from e
+        return (finalize(fusion) if finalize is not None else fusion), conflictos
+
+    def _confirm(self, estado, final, conflictos):
+        # Con el candado tomado: la hoja recibe los cambios en el mismo orden que las revisiones
+        llaves = self._changed_keys(estado.frame, final)
+        try:
+            escrito = self.writer(final, estado.frame)
+        except PartialWriteError as e:
+            # Lo que sí se escribió se publica: la revisión compartida sigue a la fuente y
+            # el próximo guardado sólo envía lo que falló
+            llaves = self._changed_keys(estado.frame, e.frame)
+            if llaves is None or llaves:
+                self._publish(estado, e.frame, llaves)
+            e.revision = self._estado.revision
+            raise
+        self._publish(estado, final, llaves)
+        return self._estado.revision, escrito, conflictos
+
+    @staticmethod
+    def _changed_keys(antes, despues):
+        # None = no se puede expresar por filas: cuenta como si cambiara todo
+        if antes is None or antes.empty:
+            return None
+        try:
+            delta = compute_delta(antes, despues)
+        except DeltaNotApplicable:
+            return None
+        return set(delta.changed.index) | set(delta.inserted.index) | set(delta.deleted)
+
+    def _publish(self, estado, frame, llaves):
+        revision = estado.revision + 1
+        versiones = dict(estado.versions)
+        if llaves is None:
+            llaves_todas = set(frame[KEY].astype(str).str.strip()) if KEY in frame.columns else set()
+            versiones.update(dict.fromkeys(llaves_todas | set(versiones), revision))
+        else:
+            versiones.update(dict.fromkeys(llaves, revision))
+        self._estado = TableState(revision, frame, versiones)
+        for suscripcion in list(self._suscripciones):
+            suscripcion.push(llaves)
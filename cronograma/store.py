@@ -0,0 +1,146 @@
+"""Modelo compacto de tareas.
+
+Cada tarea es un registro ``Task`` con ``__slots__`` (sin ``__dict__`` por
+instancia) y un índice entero estable dentro de ``TaskStore``. El motor, el
+resumen, el gráfico y el reporte leen de aquí; ``to_frame`` arma las
+columnas de una sola vez cuando hace falta un DataFrame.
+"""
+from operator import attrgetter
+
+import pandas as pd
+
+# Atributo del registro -> nombre de columna en los DataFrames de la app
+COLUMNAS = {
+    "task_id": "Task ID",
+    "parent_id": "Parent Task ID",
+    "project": "Project Name",
+    "name": "Task Name",
+    "responsables": "Responsable(s)",
+    "horas": "Horas Invertidas",
+    "notas": "Notas Extra",
+    "color": "Color_Raw",
+    "manual_start": "Manual_Start",
+    "manual_duration": "Manual_Duration",
+    "depends_on": "Depends_On_ID",
+    "dependency_info": "Dependency Info",
+    "start": "Original_Start",
+    "finish": "Original_Finish",
+    "duration": "Duration",
+    "root_id": "Root_ID",
+    "track_name": "Track_Name",
+    "total_float": "Total_Float",
+    "critical": "Critical",
+    "avance": "% Avance",
+}
+FECHAS = ("manual_start", "start", "finish")
+
+
+class Task:
+    __slots__ = ("idx",) + tuple(COLUMNAS)
+
+    def __init__(self, task_id, parent_id=None, project="", name="", responsables="", horas=0.0,
+                 notas="", color="", manual_start=None, manual_duration=1, depends_on="", avance=0.0):
+        self.idx = -1
+        self.task_id = task_id
+        self.parent_id = parent_id
+        self.project = project
+        self.name = name
+        self.responsables = responsables
+        self.horas = horas
+        self.notas = notas
+        self.color = color
+        self.manual_start = manual_start
+        self.manual_duration = manual_duration
+        self.depends_on = depends_on
+        self.dependency_info = ""
+        self.start = None
+        self.finish = None
+        self.duration = 0
+        self.root_id = None
+        self.track_name = None
+        self.total_float = None
+        self.critical = False
+        self.avance = avance
+
+    def copy(self):
+        nuevo = Task.__new__(Task)
+        for attr in Task.__slots__:
+            setattr(nuevo, attr, getattr(self, attr))
+        return nuevo
+
+    def __repr__(self):
+        return f"Task({self.task_id!r}, start={self.start}, finish={self.finish})"
+
+
+class TaskStore:
+    """Tareas en orden de entrada, accesibles por Task ID o por índice."""
+
+    def __init__(self, tasks=()):
+        self.tasks = []
+        self.index = {}
+        for task in tasks:
+            self.add(task)
+
+    @classmethod
+    def from_frame(cls, tasks):
+        """Arma el store a partir del frame de ``normalize_tasks``."""
+        inicio = tasks["Start Date"].astype(object).where(tasks["Start Date"].notna(), None)
+        columnas = zip(
+            tasks["Task ID"], tasks["Parent Task ID"], tasks["Project Name"].astype(object),
+            tasks["Task Name"], tasks["Responsable(s)"], tasks["Horas Invertidas"].tolist(),
+            tasks["Notas Extra"], tasks["Color"].astype(object), inicio,
+            tasks["Duration (Days)"].tolist(), tasks["Depends On"], tasks["% Avance"].tolist(),
+        )
+        return cls(Task(*valores) for valores in columnas)
+
+    def add(self, task):
+        task.idx = len(self.tasks)
+        self.tasks.append(task)
+        self.index[task.task_id] = task.idx
+
+    def replace(self, task):
+        """Sustituye el registro con el mismo Task ID conservando su índice."""
+        task.idx = self.index[task.task_id]
+        self.tasks[task.idx] = task
+
+    def overlay(self):
+        """Store que comparte los registros (y el índice) de este.
+
+        Es la base de los escenarios: quien lo modifique debe reemplazar en
+        ``tasks`` una copia del registro en vez de tocar el compartido, y no
+        debe agregar tareas (el índice es el mismo objeto).
+        """
+        nuevo = TaskStore.__new__(TaskStore)
+        nuevo.tasks = list(self.tasks)
+        nuevo.index = self.index
+        return nuevo
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(self.tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self.index
+
+    def __getitem__(self, task_id):
+        return self.tasks[self.index[task_id]]
+
+    def get(self, task_id):
+        i = self.index.get(task_id)
+        return None if i is None else self.tasks[i]
+
+    def ids(self):
+        return list(self.index)
+
+    def column(self, attr):
+        return list(map(attrgetter(attr), self.tasks))
+
+    def to_frame(self, attrs=None):
+        """DataFrame con las columnas pedidas (todas por defecto), fechas en datetime64."""
+        datos = {}
+        for attr in (attrs or COLUMNAS):
+            valores = self.column(attr)
+            datos[COLUMNAS[attr]] = pd.to_datetime(valores) if attr in FECHAS else valores
+        return pd.DataFrame(datos)
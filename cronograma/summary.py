@@ -0,0 +1,127 @@
+"""Métricas del portafolio en una sola pasada por columnas.
+
+``portfolio_aggregates`` agrupa el cronograma por proyecto una vez y de ahí
+salen el bloque "Resumen del Portafolio", la tabla de detalle por proyecto
+y los hitos (rombos) del Gantt. Los días son hábiles según el calendario
+(corridos si no hay); las tareas padre sólo cuentan para las fechas, no
+para tareas ni horas (ya acumulan las de sus hijas).
+"""
+import numpy as np
+import pandas as pd
+
+from cronograma.scheduling import INFO_INDEPENDIENTE
+from cronograma.workdays import WorkCalendar
+
+COLUMNAS_PROYECTO = [
+    "Proyecto", "Inicio", "Fin", "Días Totales", "Días Restantes", "Tareas",
+    "Activas", "Completadas", "Horas", "Avance", "Activo",
+]
+
+
+class PortfolioAggregates:
+    """Resultado de ``portfolio_aggregates``.
+
+    ``totals`` son las métricas del resumen (mismas llaves de siempre más
+    ``avance``), ``projects`` una fila por proyecto (``Fin`` es el último día,
+    no el fin exclusivo) y ``milestones`` las tareas independientes
+    (``Project Name``, ``Task ID``, ``Fecha``).
+    """
+
+    def __init__(self, totals, projects, milestones, fin_proyecto):
+        self.totals = totals
+        self.projects = projects
+        self.milestones = milestones
+        self._fin_proyecto = fin_proyecto
+        self._independientes = set(milestones["Task ID"])
+
+    def milestone_rows(self, final_df):
+        """Filas de ``final_df`` que llevan rombo.
+
+        El fin de cada proyecto va en la primera fila (en el orden del
+        gráfico) que lo alcanza; si esa tarea no está a la vista, no hay
+        rombo. Además, el fin de cada tarea independiente visible.
+        """
+        fin = final_df["Project Name"].astype(str).map(self._fin_proyecto)
+        fin_proy = final_df[final_df["Original_Finish"].eq(fin)].drop_duplicates("Project Name")
+        independientes = final_df[final_df["Task ID"].astype(object).isin(self._independientes)]
+        return pd.concat([fin_proy, independientes]).drop_duplicates(["Llave_Secreta", "Original_Finish"])
+
+
+def portfolio_aggregates(sched_df, hoy, padres_ids, calendar=None):
+    """Agrega ``sched_df`` (``TaskStore.to_frame``) por proyecto y para todo el portafolio."""
+    calendar = calendar or WorkCalendar.calendar_days()
+    hoy = pd.Timestamp(hoy).normalize()
+    inicio = sched_df["Original_Start"]
+    fin = sched_df["Original_Finish"]
+    inicio_dia = inicio.dt.normalize()
+    fin_dia = fin.dt.normalize()
+    # isin sobre object: con muchos padres es bastante más rápido que sobre texto de Arrow
+    hoja = ~sched_df["Task ID"].astype(object).isin(padres_ids)
+
+    # Avance: días hábiles transcurridos sobre días hábiles de plazo, sólo hojas
+    if len(sched_df):
+        ord_inicio = calendar.ordinals(inicio)
+        ord_fin = calendar.ordinals(fin)
+        ord_hoy = calendar.ordinals([hoy])[0]
+        plazo = np.maximum(ord_fin - ord_inicio, 0)
+        hecho = np.clip(np.minimum(ord_fin, ord_hoy) - ord_inicio, 0, plazo)
+    else:
+        plazo = hecho = np.zeros(0, dtype="int64")
+
+    columnas = pd.DataFrame({
+        "Proyecto": sched_df["Project Name"].astype(str),
+        "Inicio": inicio,
+        "Fin": fin,
+        "Tareas": hoja,
+        "Activas": hoja & (inicio_dia <= hoy) & (hoy < fin_dia),
+        "Completadas": hoja & (fin_dia <= hoy),
+        "Horas": sched_df["Horas Invertidas"].astype(float).where(hoja, 0.0),
+        "_plazo": np.where(hoja, plazo, 0),
+        "_hecho": np.where(hoja, hecho, 0),
+    })
+    por_proyecto = columnas.groupby("Proyecto", sort=False).agg(
+        Inicio=("Inicio", "min"),
+        Fin=("Fin", "max"),
+        Tareas=("Tareas", "sum"),
+        Activas=("Activas", "sum"),
+        Completadas=("Completadas", "sum"),
+        Horas=("Horas", "sum"),
+        _plazo=("_plazo", "sum"),
+        _hecho=("_hecho", "sum"),
+    )
+    fin_proyecto = por_proyecto["Fin"]
+
+    proyectos = por_proyecto.reset_index()
+    proyectos["Días Totales"] = calendar.workdays_array(proyectos["Inicio"], proyectos["Fin"])
+    proyectos["Días Restantes"] = np.maximum(
+        calendar.workdays_array(np.full(len(proyectos), hoy), proyectos["Fin"].dt.normalize()), 0
+    )
+    proyectos["Avance"] = (proyectos["_hecho"] / proyectos["_plazo"].where(proyectos["_plazo"] > 0)).fillna(0.0)
+    proyectos["Activo"] = (proyectos["Inicio"].dt.normalize() <= hoy) & (hoy < proyectos["Fin"].dt.normalize())
+    proyectos["Fin"] = proyectos["Fin"] - pd.Timedelta(days=1)
+    proyectos = proyectos[COLUMNAS_PROYECTO].sort_values(["Inicio", "Proyecto"], kind="stable").reset_index(drop=True)
+
+    if len(sched_df):
+        inicio_global, fin_global = inicio.min(), fin.max()
+        dias_totales = calendar.workdays(inicio_global, fin_global)
+        dias_restantes = max(0, calendar.workdays(hoy, fin_global.normalize()))
+    else:
+        dias_totales = dias_restantes = 0
+    plazo_total = int(por_proyecto["_plazo"].sum())
+    totals = {
+        "dias_totales": dias_totales,
+        "dias_restantes": dias_restantes,
+        "tareas_unicas": int(por_proyecto["Tareas"].sum()),
+        "total_horas": round(float(columnas["Horas"].sum()), 2),
+        "tareas_activas": int(por_proyecto["Activas"].sum()),
+        "proyectos_activos": int(proyectos["Activo"].sum()),
+        "avance": int(por_proyecto["_hecho"].sum()) / plazo_total if plazo_total else 0.0,
+    }
+
+    independientes = hoja & (sched_df["Dependency Info"] == INFO_INDEPENDIENTE)
+    hitos = pd.DataFrame({
+        "Project Name": sched_df.loc[independientes, "Project Name"].astype(str),
+        "Task ID": sched_df.loc[independientes, "Task ID"],
+        "Fecha": fin[independientes],
+    }).reset_index(drop=True)
+    return PortfolioAggregates(totals, proyectos, hitos, fin_proyecto)
@@ -0,0 +1,131 @@
+"""Gantt estándar (``px.timeline``) para portafolios de tamaño normal."""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+def build_timeline_figure(final_df, hoy, agregados):
+    """``final_df`` ya coloreado (``color_bars``): una traza por color.
+
+    ``agregados`` (``portfolio_aggregates``) define los hitos.
+    """
+    fig = px.timeline(
+        final_df, 
+        x_start="Start", 
+        x_end="Plot_Finish", 
+        y="Llave_Secreta", 
+        color="Color_Key", 
+        color_discrete_map="identity",
+        text="Label",
+        custom_data=["Hover_Text", "Critical"] # Agregamos la columna que creamos para el tooltip
+    )
+
+    fig.update_traces(
+        textfont_size=12, 
+        textfont_color="black",
+        textposition='inside', 
+        insidetextanchor='middle',
+        hovertemplate="%{customdata[0]}<extra></extra>" # Inyecta el texto limpio sin la información default de Plotly
+    )
+
+    # Ruta crítica: borde rojo sólo en las barras de las tareas sin holgura (por barra, no por traza)
+    for trace in fig.data:
+        criticas = np.array([bool(c[1]) for c in trace.customdata], dtype=bool)
+        if criticas.any():
+            trace.marker.line.color = np.where(criticas, "#D30000", "rgba(0,0,0,0)")
+            trace.marker.line.width = np.where(criticas, 3, 0)
+
+    # Línea base: barra fantasma delgada al pie de cada fila (una por tarea)
+    if "Baseline_Start" in final_df.columns:
+        fantasmas = final_df[final_df["Baseline_Start"].notna()].drop_duplicates("Task ID")
+        if len(fantasmas):
+            fig.add_trace(go.Bar(
+                base=fantasmas["Baseline_Start"],
+                x=(fantasmas["Baseline_Finish"] - fantasmas["Baseline_Start"]).dt.total_seconds() * 1000,
+                y=fantasmas["Llave_Secreta"],
+                orientation="h",
+                width=0.18,
+                offset=0.3,
+                marker=dict(color="rgba(90, 90, 90, 0.35)", line=dict(color="rgba(60, 60, 60, 0.8)", width=1)),
+                name="Línea base",
+                hoverinfo="skip",
+                showlegend=False,
+            ))
+
+    for trace in fig.data:
+        if getattr(trace, "y", None) is not None:
+            proyectos = [str(val).split("|||")[0] for val in trace.y]
+            tareas = [str(val).split("|||")[1] for val in trace.y]
+            trace.y = [proyectos, tareas] 
+
+    # Hitos: fin de cada proyecto y de cada tarea independiente (de los agregados)
+    hitos = agregados.milestone_rows(final_df)
+    hitos_x = hitos["Original_Finish"].tolist()
+    hitos_y_proy = hitos["Project Name"].astype(str).tolist()
+    hitos_y_tarea = hitos["Llave_Secreta"].str.split("|||", n=1, regex=False).str[1].tolist()
+
+    fig.add_trace(go.Scatter(
+        x=hitos_x,
+        y=[hitos_y_proy, hitos_y_tarea],
+        mode='markers+text',
+        marker=dict(symbol='diamond', size=16, color='#D30000', line=dict(color='black', width=1.5)),
+        text=["Fin"] * len(hitos_x),
+        textposition="middle right",
+        textfont=dict(color="black", size=10, family="Arial"),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+
+    fig.update_yaxes(
+        autorange="reversed", 
+        title_text="",
+        type="multicategory",
+        dividercolor="gray",  
+        dividerwidth=1        
+    )
+    fig.layout.yaxis.categoryarray = None 
+
+    unique_llaves = final_df["Llave_Secreta"].unique()
+    proyectos_ordenados = [llave.split("|||")[0] for llave in unique_llaves]
+
+    for i in range(1, len(proyectos_ordenados)):
+        if proyectos_ordenados[i] != proyectos_ordenados[i-1]:
+            fig.add_hline(
+                y=i - 0.5, 
+                line_width=1.5, 
+                line_dash="dot", 
+                line_color="gray", 
+                opacity=0.6
+            )
+
+    fig.update_layout(
+        plot_bgcolor='white', 
+        height=max(450, len(final_df['Llave_Secreta'].unique()) * 100),
+        margin=dict(l=150, r=50),
+        showlegend=False 
+    ) 
+
+    fig.update_xaxes(
+        type='date',
+        showgrid=True, 
+        gridcolor='lightgray', 
+        gridwidth=1,
+        tickformat="%d %b %Y"
+    )
+
+    hoy_ms = int(pd.Timestamp(hoy).timestamp() * 1000)
+    fecha_texto = hoy.strftime("%d/%m/%Y") 
+
+    fig.add_vline(
+        x=hoy_ms, 
+        line_width=3, 
+        line_dash="dash", 
+        line_color="darkblue", 
+        annotation_text=f" HOY ({fecha_texto}) ", 
+        annotation_position="top right", 
+        annotation_font_color="darkblue",
+        annotation_font_size=14
+    )
+
+    return fig
@@ -0,0 +1,156 @@
+"""Calendario laboral: fines de semana, feriados y días libres por responsable.
+
+Las duraciones del cronograma son días hábiles. ``WorkCalendar`` arma un
+``np.busdaycalendar`` por combinación de responsables (feriados generales
+más los días libres de cada persona) y hace las cuentas con
+``np.busday_offset`` / ``np.busday_count``; ``schedule_array`` y
+``workdays_array`` resuelven muchas tareas en una operación por calendario.
+El fin de una tarea es exclusivo: el día siguiente a su último día hábil.
+
+Con ``WorkCalendar.calendar_days()`` (todos los días hábiles, sin feriados) las
+cuentas son las de días corridos de siempre.
+
+El archivo de feriados es un CSV con columnas ``Fecha`` y, opcional,
+``Responsable``: las filas sin responsable son feriados para todos; las
+demás, días libres de esa persona.
+"""
+import numpy as np
+import pandas as pd
+
+SEMANA_LABORAL = "1111100"
+SEMANA_NATURAL = "1111111"
+_UN_DIA = pd.Timedelta(days=1)
+
+
+def _dia(fecha):
+    return np.datetime64(pd.Timestamp(fecha).normalize().to_datetime64(), "D")
+
+
+def _dias(fechas):
+    return pd.to_datetime(pd.Series(fechas)).dt.normalize().to_numpy().astype("datetime64[D]")
+
+
+class WorkCalendar:
+
+    def __init__(self, weekmask=SEMANA_LABORAL, holidays=(), personal=None):
+        self.weekmask = weekmask
+        self.holidays = np.unique(_dias(list(holidays))) if len(holidays) else np.array([], dtype="datetime64[D]")
+        self.personal = {
+            nombre: np.unique(_dias(list(fechas))) for nombre, fechas in (personal or {}).items() if len(fechas)
+        }
+        self.natural = weekmask == SEMANA_NATURAL and not len(self.holidays) and not self.personal
+        self._cals = {}
+        self._keys = {}
+
+    @classmethod
+    def calendar_days(cls):
+        """Días corridos: el comportamiento sin calendario laboral."""
+        return cls(weekmask=SEMANA_NATURAL)
+
+    @classmethod
+    def from_file(cls, path, weekmask=SEMANA_LABORAL):
+        """Calendario desde el CSV de feriados (sin archivo: sólo fines de semana)."""
+        try:
+            df = pd.read_csv(path, dtype=str)
+        except FileNotFoundError:
+            return cls(weekmask=weekmask)
+        fechas = pd.to_datetime(df["Fecha"], errors="coerce")
+        quien = df["Responsable"].fillna("").str.strip() if "Responsable" in df.columns else pd.Series("", index=df.index)
+        validas = fechas.notna()
+        generales = fechas[validas & (quien == "")]
+        personal = fechas[validas & (quien != "")].groupby(quien[validas & (quien != "")]).agg(list).to_dict()
+        return cls(weekmask=weekmask, holidays=generales.tolist(), personal=personal)
+
+    def signature(self):
+        """Identifica el contenido del calendario (para las huellas de caché)."""
+        personal = tuple(sorted((nombre, fechas.tobytes()) for nombre, fechas in self.personal.items()))
+        return (self.weekmask, self.holidays.tobytes(), personal)
+
+    def key(self, responsables):
+        """Llave de calendario de una tarea: sus responsables con días libres."""
+        if not self.personal or not responsables:
+            return ()
+        llave = self._keys.get(responsables)
+        if llave is None:
+            nombres = {r.strip() for r in str(responsables).split(",")}
+            llave = self._keys[responsables] = tuple(sorted(nombres.intersection(self.personal)))
+        return llave
+
+    def busdaycal(self, key=()):
+        cal = self._cals.get(key)
+        if cal is None:
+            libres = [self.holidays] + [self.personal[nombre] for nombre in key]
+            cal = self._cals[key] = np.busdaycalendar(weekmask=self.weekmask, holidays=np.concatenate(libres))
+        return cal
+
+    # === Cuentas de una tarea (dentro del recorrido topológico) ===
+
+    def shift(self, fecha, dias, key=()):
+        """Primer día hábil desde ``fecha`` movido ``dias`` hábiles."""
+        if self.natural:
+            return fecha + pd.Timedelta(days=dias)
+        return pd.Timestamp(np.busday_offset(_dia(fecha), dias, roll="forward", busdaycal=self.busdaycal(key)))
+
+    def finish(self, inicio, dias, key=()):
+        """Fin exclusivo de una tarea de ``dias`` hábiles que empieza en ``inicio``."""
+        if self.natural:
+            return inicio + pd.Timedelta(days=dias)
+        return self.shift(inicio, dias - 1, key) + _UN_DIA
+
+    def start_for_last(self, ultimo, dias, key=()):
+        """Inicio para que una tarea de ``dias`` hábiles termine el día hábil ``ultimo``."""
+        if self.natural:
+            return ultimo - pd.Timedelta(days=dias - 1)
+        return self.shift(ultimo, -(dias - 1), key)
+
+    def workdays(self, inicio, fin, key=()):
+        """Días hábiles en ``[inicio, fin)``."""
+        if self.natural:
+            return (fin - inicio).days
+        return int(np.busday_count(_dia(inicio), _dia(fin), busdaycal=self.busdaycal(key)))
+
+    # === Versiones vectorizadas ===
+
+    def schedule_array(self, inicios, dias, keys=None):
+        """Inicio (primer día hábil) y fin exclusivo de muchas tareas a la vez."""
+        inicios = _dias(inicios)
+        dias = np.asarray(dias, dtype="int64")
+        if self.natural:
+            return inicios, inicios + dias
+        salida_ini = inicios.copy()
+        salida_fin = inicios.copy()
+        for key, idx in self._grupos(keys, len(inicios)):
+            cal = self.busdaycal(key)
+            ini = np.busday_offset(inicios[idx], 0, roll="forward", busdaycal=cal)
+            salida_ini[idx] = ini
+            salida_fin[idx] = np.busday_offset(ini, dias[idx] - 1, roll="forward", busdaycal=cal) + 1
+        return salida_ini, salida_fin
+
+    def workdays_array(self, inicios, fines, keys=None):
+        inicios, fines = _dias(inicios), _dias(fines)
+        if self.natural:
+            return (fines - inicios).astype("int64")
+        salida = np.zeros(len(inicios), dtype="int64")
+        for key, idx in self._grupos(keys, len(inicios)):
+            salida[idx] = np.busday_count(inicios[idx], fines[idx], busdaycal=self.busdaycal(key))
+        return salida
+
+    def ordinals(self, fechas):
+        """Número de día hábil (calendario general) de cada fecha, para el CPM."""
+        dias = _dias(fechas)
+        if self.natural:
+            return dias.astype("int64")
+        return np.busday_count(np.datetime64("1970-01-01", "D"), dias, busdaycal=self.busdaycal())
+
+    def from_ordinals(self, ordinales):
+        """Inverso de ``ordinals``: la fecha de cada número de día hábil."""
+        ordinales = np.asarray(ordinales, dtype="int64")
+        origen = np.datetime64("1970-01-01", "D")
+        if self.natural:
+            return origen + ordinales
+        return np.busday_offset(origen, ordinales, roll="forward", busdaycal=self.busdaycal())
+
+    def _grupos(self, keys, n):
+        if keys is None:
+            return [((), np.arange(n))]
+        return pd.Series(range(n)).groupby(pd.Series(list(keys), dtype=object), sort=False).indices.items()
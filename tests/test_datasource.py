@@ -0,0 +1,132 @@
+import pandas as pd
+import pytest
+
+from cronograma.datasource import CachedTable, GSheetsSource, SnapshotStore, SqliteSource
+from cronograma.delta import DeltaNotApplicable, compute_delta
+
+
+def test_columna_nueva_reescribe_la_tabla(tmp_path):
+    fuente = SqliteSource(str(tmp_path / "tareas.sqlite"))
+    base = pd.DataFrame({"Task ID": ["T1", "T2"], "Task Name": ["A", "B"]})
+    fuente.update(base)
+    tabla = CachedTable(fuente)
+    tabla.get(block=True)
+
+    nueva = base.assign(**{"% Avance": [0, 50]})
+    nueva.loc[0, "Task Name"] = "A2"
+    assert tabla.save(nueva, base) is None  # Sin delta: se reescribió completa
+    leida = fuente.read()
+    assert list(leida.columns) == list(nueva.columns)
+    assert leida["Task Name"].tolist() == ["A2", "B"]
+
+
+def test_delta_por_filas(tmp_path):
+    fuente = SqliteSource(str(tmp_path / "tareas.sqlite"))
+    base = pd.DataFrame({"Task ID": ["T1", "T2"], "Task Name": ["A", "B"]})
+    fuente.update(base)
+    tabla = CachedTable(fuente)
+    tabla.get(block=True)
+
+    nueva = pd.DataFrame({"Task ID": ["T2", "T3"], "Task Name": ["B2", "C"]})
+    delta = tabla.save(nueva, base)
+    assert delta.deleted == ["T1"] and list(delta.changed.index) == ["T2"]
+    assert sorted(fuente.read()["Task ID"]) == ["T2", "T3"]
+
+
+def test_guardar_no_vuelve_al_snapshot(tmp_path):
+    fuente = SqliteSource(str(tmp_path / "tareas.sqlite"))
+    base = pd.DataFrame({"Task ID": ["T1", "T2"], "Task Name": ["A", "B"]})
+    fuente.update(base)
+    tabla = CachedTable(fuente, snapshot=SnapshotStore(str(tmp_path / "snapshot.sqlite")))
+    tabla.get(block=True)
+
+    nueva = base.assign(**{"Task Name": ["A2", "B"]})
+    tabla.save(nueva, base)
+    assert tabla.snapshot_at is None and not tabla.offline
+    assert tabla.get()["Task Name"].tolist() == ["A2", "B"]
+    assert tabla.snapshot_at is None
+
+
+class HojaFalsa:
+    """Lo que usa ``GSheetsSource.apply_delta`` de una hoja de gspread."""
+
+    id = 7
+
+    def __init__(self, filas):
+        self.filas = filas
+        self.escrituras = []
+        self.spreadsheet = self
+        self.pedidos = []
+
+    def row_values(self, fila):
+        return list(self.filas[fila - 1])
+
+    def col_values(self, col):
+        return [fila[col - 1] for fila in self.filas]
+
+    def batch_update(self, datos, **kwargs):
+        if isinstance(datos, dict):
+            self.pedidos.extend(datos["requests"])
+        else:
+            self.escrituras.extend(datos)
+
+
+class ClienteFalso:
+    def __init__(self, hoja):
+        self.hoja = hoja
+        self.abiertas = []
+
+    def open_by_url(self, url):
+        cliente = self
+
+        class Libro:
+            def worksheet(self, nombre):
+                cliente.abiertas.append((url, nombre))
+                return cliente.hoja
+        return Libro()
+
+
+class ConexionFalsa:
+    def __init__(self):
+        self.reescrituras = []
+
+    def update(self, **kwargs):
+        self.reescrituras.append(kwargs["data"])
+
+
+def test_gsheets_delta_con_api_publica_de_gspread():
+    hoja = HojaFalsa([["Task ID", "Task Name"], ["T1", "A"], ["T2", "B"], ["T3", "C"]])
+    cliente = ClienteFalso(hoja)
+    fuente = GSheetsSource(ConexionFalsa(), "https://hoja", "Tareas", cliente)
+    base = pd.DataFrame({"Task ID": ["T1", "T2", "T3"], "Task Name": ["A", "B", "C"]})
+    nueva = pd.DataFrame({"Task ID": ["T1", "T3", "T4"], "Task Name": ["A", "C2", "D"]})
+
+    fuente.apply_delta(compute_delta(base, nueva))
+    assert cliente.abiertas == [("https://hoja", "Tareas")]
+    assert hoja.escrituras == [
+        {"range": "A4:B4", "values": [["T3", "C2"]]},
+        {"range": "A5:B5", "values": [["T4", "D"]]},
+    ]
+    assert [p["deleteDimension"]["range"]["startIndex"] for p in hoja.pedidos] == [2]
+    assert fuente.conn.reescrituras == []
+
+
+def test_gsheets_sin_cliente_reescribe_completa(caplog):
+    conexion = ConexionFalsa()
+    fuente = GSheetsSource(conexion, "https://hoja", "Tareas")
+    base = pd.DataFrame({"Task ID": ["T1"], "Task Name": ["A"]})
+    with pytest.raises(DeltaNotApplicable):
+        fuente.apply_delta(compute_delta(base, base.assign(**{"Task Name": ["A2"]})))
+    assert "se reescribe completa" in caplog.text
+
+    # Una hoja que no se puede abrir también cae a la reescritura completa al guardar
+    class ClienteRoto:
+        def open_by_url(self, url):
+            raise PermissionError("sin permiso")
+
+    fuente.client = ClienteRoto()
+    tabla = CachedTable(fuente)
+    nueva = base.assign(**{"Task Name": ["A2"]})
+    assert tabla.save(nueva, base) is None
+    assert len(conexion.reescrituras) == 1 and conexion.reescrituras[0].equals(nueva)
+    assert "sin permiso" in caplog.text
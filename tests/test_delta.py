@@ -0,0 +1,87 @@
+import random
+
+import pandas as pd
+
+from cronograma.delta import compute_delta, merge_edits
+from cronograma.shared import SharedTable
+
+COLUMNAS = ["Task ID", "Task Name", "Duration (Days)", "Responsable(s)"]
+
+
+def _base(n=30):
+    return pd.DataFrame({
+        "Task ID": [f"T{i}" for i in range(n)],
+        "Task Name": [f"Tarea {i}" for i in range(n)],
+        "Duration (Days)": [1 + i % 7 for i in range(n)],
+        "Responsable(s)": ["Ana"] * n,
+    })
+
+
+def _editar(df, rng, celdas, sufijo):
+    df = df.copy()
+    tocadas = set()
+    for _ in range(celdas):
+        fila, col = rng.randrange(len(df)), rng.choice(COLUMNAS[1:])
+        valor = rng.randint(1, 3) if col == "Duration (Days)" else f"{col[:4]} {rng.randint(1, 3)}{sufijo}"
+        df.iloc[fila, df.columns.get_loc(col)] = valor
+        tocadas.add(df.at[fila, "Task ID"])
+    return df, tocadas
+
+
+def test_fusion_celda_por_celda_contra_referencia():
+    rng = random.Random(11)
+    for _ in range(60):
+        base = _base()
+        otros, tocadas = _editar(base, rng, rng.randint(0, 10), "")
+        mio, _ = _editar(base, rng, rng.randint(0, 10), "")
+        fusion, conflictos = merge_edits(base, mio, otros, tocadas)
+
+        esperados = set()
+        for i in range(len(base)):
+            for col in COLUMNAS[1:]:
+                b, m, o = base.at[i, col], mio.at[i, col], otros.at[i, col]
+                if m == b:
+                    assert fusion.at[i, col] == o
+                elif o == b or o == m:
+                    assert fusion.at[i, col] == m
+                else:
+                    assert fusion.at[i, col] == o
+                    esperados.add((base.at[i, "Task ID"], col))
+        assert {(c["Task ID"], c["Columna"]) for c in conflictos} == esperados
+
+
+def test_filas_nuevas_y_borradas():
+    base = _base(4)
+    otros = base[base["Task ID"] != "T1"].reset_index(drop=True)
+    otros.loc[otros["Task ID"] == "T2", "Task Name"] = "Renombrada"
+    mio = base.copy()
+    mio.loc[mio["Task ID"] == "T1", "Task Name"] = "Editada"
+    mio = mio[mio["Task ID"] != "T2"]
+    mio = pd.concat([mio, pd.DataFrame([{"Task ID": "T9", "Task Name": "Nueva", "Duration (Days)": 2, "Responsable(s)": "Eva"}])])
+
+    fusion, conflictos = merge_edits(base, mio, otros, {"T1", "T2"})
+    assert fusion["Task ID"].tolist() == ["T0", "T2", "T3", "T9"]
+    assert {(c["Task ID"], c["Tuyo"], c["Actual"]) for c in conflictos} == {
+        ("T1", "modificada", "borrada"), ("T2", "borrada", "modificada"),
+    }
+
+
+def test_dos_sesiones_guardan_sin_pisarse():
+    guardado = []
+    tabla = SharedTable(lambda nuevo, base: guardado.append(nuevo) or compute_delta(base, nuevo))
+    tabla.sync(1, _base)
+    inicio = tabla.current
+
+    a = inicio.frame.copy()
+    a.loc[0, "Task Name"] = "De A"
+    b = inicio.frame.copy()
+    b.loc[1, "Duration (Days)"] = 20
+    b.loc[0, "Task Name"] = "De B"
+
+    tabla.commit(inicio.revision, inicio.frame, a)
+    revision, _, conflictos = tabla.commit(inicio.revision, inicio.frame, b)
+    final = tabla.current.frame
+    assert revision == tabla.current.revision == inicio.revision + 2
+    assert final.at[0, "Task Name"] == "De A" and final.at[1, "Duration (Days)"] == 20
+    assert [(c["Task ID"], c["Columna"]) for c in conflictos] == [("T0", "Task Name")]
+    assert tabla.current.touched_since(inicio.revision) == {"T0", "T1"}
@@ -0,0 +1,36 @@
+import datetime
+
+import pandas as pd
+
+from cronograma.filters import apply_editor_state, editor_slice, merge_slice
+
+
+def _tareas():
+    return pd.DataFrame({
+        "Task ID": ["A1", "A2", "B1", "B2"],
+        "Project Name": ["Alfa", "Alfa", "Beta", "Beta"],
+        "Duration (Days)": [1, 2, 3, 4],
+        "Start Date": [None] * 4,
+    })
+
+
+def test_ediciones_del_corte_vuelven_a_la_tabla():
+    tareas = _tareas()
+    corte, etiquetas = editor_slice(tareas, tareas["Project Name"] == "Beta")
+    cambios = {
+        "edited_rows": {0: {"Duration (Days)": 9, "Start Date": "2026-10-05"}},
+        "added_rows": [{"Task ID": "B3", "Project Name": "Beta", "Duration (Days)": 1}],
+        "deleted_rows": [1],
+    }
+    completa = merge_slice(tareas, etiquetas, apply_editor_state(corte, cambios))
+    assert completa["Task ID"].tolist() == ["A1", "A2", "B1", "B3"]
+    b1 = completa[completa["Task ID"] == "B1"].iloc[0]
+    assert b1["Duration (Days)"] == 9 and b1["Start Date"] == datetime.date(2026, 10, 5)
+    # Las filas fuera del corte no cambian
+    assert completa.iloc[:2]["Task ID"].tolist() == ["A1", "A2"]
+    assert completa.iloc[:2]["Duration (Days)"].tolist() == [1, 2]
+
+
+def test_sin_cambios_devuelve_lo_mismo():
+    tareas = _tareas()
+    assert apply_editor_state(tareas, {"edited_rows": {}, "added_rows": [], "deleted_rows": []}).equals(tareas)
@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from cronograma.hierarchy import Hierarchy, inside
+
+
+def _arbol_al_azar(rng, n):
+    # Cada nodo cuelga de uno anterior (o es raíz); los primeros forman una cadena de 4 niveles
+    padres = [-1, 0, 1, 2]
+    for i in range(4, n):
+        padres.append(rng.randrange(-1, i) if rng.random() > 0.15 else -1)
+    return padres
+
+
+def _ancestros(padres, i):
+    salida = []
+    while padres[i] >= 0:
+        i = padres[i]
+        salida.append(i)
+    return salida
+
+
+def test_intervalos_y_rollup_contra_recorrido():
+    rng = random.Random(7)
+    for _ in range(20):
+        n = rng.randint(4, 60)
+        padres = _arbol_al_azar(rng, n)
+        llave = np.array([rng.randrange(5) for _ in range(n)])
+        arbol = Hierarchy(padres, sibling_key=llave)
+        ancestros = [set(_ancestros(padres, i)) for i in range(n)]
+
+        assert sorted(arbol.order.tolist()) == list(range(n))
+        assert arbol.depth.tolist() == [len(a) for a in ancestros]
+        assert arbol.depth.max() >= 3
+        for a in range(n):
+            for b in range(n):
+                assert (arbol.tin[a] < arbol.tin[b] < arbol.tout[a]) == (a in ancestros[b])
+
+        valores = np.array([rng.randint(0, 9) for _ in range(n)])
+        esperado = [valores[i] + sum(valores[j] for j in range(n) if i in ancestros[j]) for i in range(n)]
+        assert arbol.rollup(valores).tolist() == esperado
+        assert arbol.subtree_size().tolist() == [1 + sum(i in a for a in ancestros) for i in range(n)]
+
+        # Dentro de un subárbol plegado: algún ancestro está plegado
+        plegados = [i for i in range(n) if rng.random() < 0.2]
+        ocultas = inside(arbol.tin, arbol.tin[plegados], arbol.tout[plegados])
+        assert ocultas.tolist() == [bool(ancestros[i] & set(plegados)) for i in range(n)]
+
+
+def test_hermanos_en_orden_de_llave():
+    #   R ─┬─ B (llave 2) ── B1
+    #      └─ A (llave 1) ─┬─ A2 (llave 5)
+    #                      └─ A1 (llave 3)
+    arbol = Hierarchy([-1, 0, 1, 0, 3, 3], sibling_key=np.array([0, 2, 0, 1, 5, 3]))
+    assert arbol.order.tolist() == [0, 3, 5, 4, 1, 2]
+    assert arbol.depth.tolist() == [0, 1, 2, 1, 2, 2]
+
+
+def test_from_ids_con_padre_desconocido_y_ciclo():
+    ids = pd.Series(["P", "H", "N", "X", "Y"])
+    padres = pd.Series([None, "P", "H", "Y", "X"])  # X e Y son padre una de la otra
+    arbol = Hierarchy.from_ids(ids, padres)
+    assert arbol.parent.tolist() == [-1, 0, 1, -1, 3]
+    assert arbol.depth.tolist() == [0, 1, 2, 0, 1]
+    assert arbol.rollup([1, 1, 1, 1, 1]).tolist() == [3, 2, 1, 2, 1]
+
+    huerfana = Hierarchy.from_ids(pd.Series(["A", "B"]), pd.Series(["Z", "A"]))
+    assert huerfana.parent.tolist() == [-1, 0]
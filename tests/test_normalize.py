@@ -0,0 +1,52 @@
+import pandas as pd
+
+from cronograma.colors import COLOR_MAP_ESP
+from cronograma.normalize import DEFAULT_COLOR, DEFAULT_PROJECT, normalize_tasks
+
+OPCIONES = list(COLOR_MAP_ESP)
+
+
+def test_normalize_tasks_tipa_y_rechaza_filas():
+    crudo = pd.DataFrame([
+        {"Task ID": " T1 ", "Parent Task ID": "None", "Project Name": "Alfa", "Task Name": "Diseño",
+         "Depends On": "nan", "Duration (Days)": "3", "Start Date": "2026-03-02",
+         "Horas Invertidas": "4.5", "Responsable(s)": " Ana ", "Color": "Azul", "% Avance": 120},
+        {"Task ID": "null", "Project Name": "Alfa", "Task Name": "Sin ID"},
+        {"Task ID": "T2", "Parent Task ID": "T1", "Project Name": "<NA>", "Task Name": None,
+         "Depends On": "T1", "Duration (Days)": "dos", "Start Date": "31/02/2026",
+         "Horas Invertidas": "muchas", "Responsable(s)": "NaN", "Color": "Fucsia", "% Avance": "x"},
+        {"Task ID": "T3", "Project Name": "Beta", "Task Name": "Primera versión", "Duration (Days)": 5},
+        {"Task ID": None, "Project Name": "Beta"},
+        {"Task ID": "T3", "Project Name": "Beta", "Task Name": "Segunda versión", "Duration (Days)": 0,
+         "Start Date": pd.NaT, "% Avance": -5},
+    ])
+    tasks, rejected = normalize_tasks(crudo, OPCIONES)
+
+    assert rejected == [
+        {"fila": 1, "Task ID": None, "motivo": "Sin Task ID"},
+        {"fila": 4, "Task ID": None, "motivo": "Sin Task ID"},
+        {"fila": 3, "Task ID": "T3", "motivo": "Task ID duplicado (se usa la última fila)"},
+    ]
+    assert tasks.index.tolist() == [0, 2, 5]
+    assert tasks["Task ID"].tolist() == ["T1", "T2", "T3"]
+
+    assert str(tasks["Duration (Days)"].dtype) == "int32"
+    assert tasks["Start Date"].dtype == "datetime64[ns]"
+    assert tasks["Horas Invertidas"].dtype == "float64"
+    assert tasks["% Avance"].dtype == "float64"
+    assert isinstance(tasks["Project Name"].dtype, pd.CategoricalDtype)
+    assert list(tasks["Color"].cat.categories) == OPCIONES
+
+    assert tasks["Parent Task ID"].tolist() == [None, "T1", None]
+    assert tasks["Project Name"].tolist() == ["Alfa", DEFAULT_PROJECT, "Beta"]
+    assert tasks["Task Name"].tolist() == ["Diseño", "", "Segunda versión"]
+    assert tasks["Depends On"].tolist() == ["", "T1", ""]
+    assert tasks["Responsable(s)"].tolist() == ["Ana", "", ""]
+    assert tasks["Color"].tolist() == ["Azul", DEFAULT_COLOR, DEFAULT_COLOR]
+
+    # Duración no numérica -> 1, menor que 1 -> 1; fechas inválidas -> NaT
+    assert tasks["Duration (Days)"].tolist() == [3, 1, 1]
+    assert tasks["Start Date"].iloc[0] == pd.Timestamp("2026-03-02")
+    assert tasks["Start Date"].iloc[1:].isna().all()
+    assert tasks["Horas Invertidas"].tolist() == [4.5, 0.0, 0.0]
+    assert tasks["% Avance"].tolist() == [100.0, 0.0, 0.0]
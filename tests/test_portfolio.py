@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from cronograma.datasource import CachedTable, SqliteSource
+from cronograma.portfolio import PortfolioTable
+from cronograma.shared import PartialWriteError, SharedTable
+
+
+class FuenteContada(SqliteSource):
+    """SQLite que cuenta las escrituras y puede fallar a pedido."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.falla = False
+        self.escrituras = 0
+
+    def _escribir(self):
+        if self.falla:
+            raise RuntimeError("hoja no disponible")
+        self.escrituras += 1
+
+    def update(self, df):
+        self._escribir()
+        super().update(df)
+
+    def apply_delta(self, delta):
+        self._escribir()
+        super().apply_delta(delta)
+
+
+@pytest.fixture
+def hojas(tmp_path):
+    fuentes = {}
+    for nombre in ("A", "B"):
+        fuente = FuenteContada(str(tmp_path / f"{nombre}.sqlite"))
+        SqliteSource.update(fuente, pd.DataFrame({"Task ID": ["T1", "T2"], "Task Name": [f"{nombre}1", f"{nombre}2"]}))
+        fuentes[nombre] = fuente
+    return fuentes
+
+
+def test_hoja_que_falla_no_deja_la_revision_atras(hojas):
+    portafolio = PortfolioTable({nombre: CachedTable(fuente) for nombre, fuente in hojas.items()})
+    compartida = SharedTable(portafolio.save)
+    inicio = compartida.sync(1, portafolio.get)
+
+    editado = inicio.frame.copy()
+    editado.loc[editado["Task ID"] == "A::T1", "Task Name"] = "A1 editada"
+    editado.loc[editado["Task ID"] == "B::T2", "Task Name"] = "B2 editada"
+
+    hojas["B"].falla = True
+    with pytest.raises(PartialWriteError) as info:
+        compartida.commit(inicio.revision, inicio.frame, editado)
+    error = info.value
+    assert list(error.errors) == ["B"] and list(error.written) == ["A"]
+    assert hojas["A"].read()["Task Name"].tolist() == ["A1 editada", "A2"]
+    assert hojas["B"].read()["Task Name"].tolist() == ["B1", "B2"]
+
+    # Lo publicado es lo que quedó en las hojas
+    actual = compartida.current
+    assert error.revision == actual.revision == inicio.revision + 1
+    nombres = dict(zip(actual.frame["Task ID"], actual.frame["Task Name"]))
+    assert nombres == {"A::T1": "A1 editada", "A::T2": "A2", "B::T1": "B1", "B::T2": "B2"}
+    assert actual.touched_since(inicio.revision) == {"A::T1"}
+
+    # Al reintentar desde la misma edición sólo se envía lo que faltaba
+    hojas["B"].falla = False
+    revision, escritos, conflictos = compartida.commit(inicio.revision, inicio.frame, editado)
+    assert conflictos == [] and list(escritos) == ["B"]
+    assert list(escritos["B"].changed.index) == ["T2"]
+    assert hojas["A"].escrituras == 1 and hojas["B"].escrituras == 1
+    assert hojas["B"].read()["Task Name"].tolist() == ["B1", "B2 editada"]
+    assert revision == inicio.revision + 2
@@ -0,0 +1,55 @@
+import gc
+import threading
+import tracemalloc
+
+from cronograma.profiling import StageTimer
+
+
+def test_finish_apaga_tracemalloc():
+    perfil = StageTimer(memoria=True)
+    with perfil.stage("etapa", filas=3):
+        [0] * 1000
+    assert tracemalloc.is_tracing()
+    perfil.finish()
+    assert not tracemalloc.is_tracing()
+    assert list(perfil.to_frame()["etapa"]) == ["etapa"]
+
+
+def test_rerun_cortado_apaga_tracemalloc():
+    # Un st.rerun() corta el script antes de finish(): descartar el timer basta
+    perfil = StageTimer(memoria=True)
+    assert tracemalloc.is_tracing()
+    del perfil
+    gc.collect()
+    assert not tracemalloc.is_tracing()
+    assert StageTimer(memoria=True)._apagar is not None
+    gc.collect()
+    assert not tracemalloc.is_tracing()
+
+
+def test_timers_simultaneos_comparten_tracemalloc():
+    # Dos sesiones a la vez: el primero en terminar no le apaga la medición al otro
+    uno, otro = StageTimer(memoria=True), StageTimer(memoria=True)
+    uno.finish()
+    assert tracemalloc.is_tracing()
+    with otro.stage("etapa"):
+        [0] * 1000
+    otro.finish()
+    uno.finish()  # Soltar dos veces no descuenta de más
+    assert not tracemalloc.is_tracing()
+    assert otro.to_frame()["memoria_pico_mb"].iloc[0] >= 0
+
+
+def test_timers_en_hilos():
+    def rerun():
+        perfil = StageTimer(memoria=True)
+        with perfil.stage("etapa"):
+            [0] * 10000
+        perfil.finish()
+
+    hilos = [threading.Thread(target=rerun) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert not tracemalloc.is_tracing()
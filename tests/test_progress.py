@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cronograma.headless import compute
+from cronograma.progress import PORTAFOLIO, ProgressLog, earned_value
+
+HOY = pd.Timestamp("2026-10-19")
+
+
+def _portafolio(inicio):
+    return compute(pd.DataFrame([
+        {"Task ID": "P1", "Project Name": "Alfa", "Task Name": "Fase", "Duration (Days)": 1, "Start Date": inicio},
+        {"Task ID": "A1", "Parent Task ID": "P1", "Project Name": "Alfa", "Task Name": "Diseño", "Duration (Days)": 5, "Start Date": inicio, "Horas Invertidas": 10},
+        {"Task ID": "A2", "Parent Task ID": "P1", "Project Name": "Alfa", "Task Name": "Build", "Depends On": "A1", "Duration (Days)": 10, "Horas Invertidas": 0},
+        {"Task ID": "B1", "Project Name": "Beta", "Task Name": "Solo", "Duration (Days)": 3, "Start Date": inicio, "Horas Invertidas": 4},
+    ]), HOY)
+
+
+def test_plan_futuro_sin_avance(tmp_path):
+    portafolio = _portafolio("2026-11-02")
+    historial = ProgressLog(str(tmp_path / "avance.sqlite")).history(HOY)
+    for freq in ("D", "W", "M"):
+        ev = earned_value(portafolio.sched_df, portafolio.padres_ids, historial, HOY, freq, calendar=portafolio.calendar)
+        assert ev.totals["pv"] == 0 and ev.totals["ev"] == 0
+        assert ev.totals["bac"] == (5 + 10 + 3) * 8
+        portafolio_curva = ev.curves[ev.curves["Proyecto"] == PORTAFOLIO]
+        assert portafolio_curva["PV"].iloc[-1] == pytest.approx(ev.totals["bac"])
+
+
+def test_valor_ganado_desde_historial(tmp_path):
+    portafolio = _portafolio("2026-10-05")
+    registro = ProgressLog(str(tmp_path / "avance.sqlite"))
+    tabla = portafolio.table.assign(**{"% Avance": 0.0})
+    assert registro.record_table("2026-10-05", tabla) == 3  # Sólo hojas
+    tabla.loc[tabla["Task ID"] == "A1", ["Horas Invertidas", "% Avance"]] = [30, 50]
+    assert registro.record_table("2026-10-09", tabla) == 1
+    assert registro.record_table("2026-10-12", tabla) == 0
+    assert registro.last_day() == pd.Timestamp("2026-10-12")
+
+    ev = earned_value(portafolio.sched_df, portafolio.padres_ids, registro.history(HOY), HOY, "W", calendar=portafolio.calendar)
+    tareas = ev.tasks.set_index("Task ID")
+    assert tareas.at["A1", "EV"] == pytest.approx(5 * 8 * 0.5)
+    assert tareas.at["A1", "AC"] == 30
+    # El padre suma a sus hojas y los proyectos al día de hoy coinciden con sus tareas
+    for campo in ("BAC", "PV", "EV", "AC"):
+        assert tareas.at["P1", campo] == pytest.approx(tareas.loc[["A1", "A2"], campo].sum())
+    proyectos = ev.projects.set_index("Proyecto")
+    assert proyectos.at["Alfa", "PV"] == pytest.approx(tareas.at["P1", "PV"])
+    assert ev.totals["ac"] == 34
+
+    # Las curvas terminan hoy para EV/AC y en el BAC para PV
+    curva = ev.curves[ev.curves["Proyecto"] == PORTAFOLIO]
+    pasadas = curva["Fecha"] <= HOY + pd.Timedelta(days=6)
+    assert curva.loc[pasadas, "EV"].notna().all() and curva.loc[~pasadas, "EV"].isna().all()
+    assert np.all(np.diff(curva["PV"].to_numpy()) >= 0)
+    assert curva["AC"].dropna().iloc[-1] == 34
+
+
+def test_curvas_contra_calculo_por_tarea(tmp_path):
+    from benchmarks.synthetic import generate_portfolio
+
+    hoy = pd.Timestamp("2026-05-20")
+    portafolio = compute(generate_portfolio(120, projects=3, seed=5), hoy)
+    sched_df, calendario = portafolio.sched_df, portafolio.calendar
+    registro = ProgressLog(str(tmp_path / "avance.sqlite"))
+    rng = np.random.default_rng(1)
+    tabla = portafolio.table.assign(**{"% Avance": 0.0})
+    for fecha in pd.date_range("2026-03-01", hoy + pd.Timedelta(days=10), freq="3D"):
+        movidas = rng.random(len(tabla)) < 0.2
+        tabla.loc[movidas, "Horas Invertidas"] += rng.integers(1, 9, movidas.sum())
+        tabla.loc[movidas, "% Avance"] = np.minimum(100, tabla.loc[movidas, "% Avance"] + 10)
+        registro.record_table(fecha, tabla)
+    historial = registro.history(hoy)
+    ev = earned_value(sched_df, portafolio.padres_ids, historial, hoy, "W", 8, calendario)
+    assert ev.totals["ev"] > 0 and ev.totals["ac"] > 0
+
+    # Referencia: cada hoja por separado, sin arreglos de diferencias
+    hojas = sched_df[~sched_df["Task ID"].isin(portafolio.padres_ids)]
+    curvas = ev.curves[ev.curves["Proyecto"] != PORTAFOLIO]
+    for proyecto, grupo in hojas.groupby("Project Name", observed=True):
+        curva = curvas[curvas["Proyecto"] == proyecto]
+        pv = np.zeros(len(curva))
+        ev_ref = np.zeros(len(curva))
+        ac_ref = np.zeros(len(curva))
+        cumplidos = calendario.ordinals(curva["Fecha"] + pd.Timedelta(days=1))
+        for _, tarea in grupo.iterrows():
+            o_inicio = calendario.ordinals([tarea["Original_Start"]])[0]
+            plazo = max(calendario.ordinals([tarea["Original_Finish"]])[0] - o_inicio, 0)
+            propios = historial[historial["Task ID"] == tarea["Task ID"]]
+            for k, (cierre, x) in enumerate(zip(curva["Fecha"], cumplidos)):
+                pv[k] += np.clip(x - o_inicio, 0, plazo) * 8
+                hasta = propios[propios["Fecha"] <= cierre]
+                if len(hasta):
+                    ev_ref[k] += plazo * 8 * hasta["Avance"].iloc[-1] / 100
+                    ac_ref[k] += hasta["Horas"].iloc[-1]
+        assert curva["PV"].to_numpy() == pytest.approx(pv)
+        pasadas = curva["EV"].notna().to_numpy()
+        assert curva["EV"].to_numpy()[pasadas] == pytest.approx(ev_ref[pasadas])
+        assert curva["AC"].to_numpy()[pasadas] == pytest.approx(ac_ref[pasadas])
+        assert pasadas.sum() == (curva["Fecha"] < hoy.to_period("W").end_time.normalize() + pd.Timedelta(days=1)).sum()
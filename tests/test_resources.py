@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from cronograma.headless import compute
+from cronograma.load_chart import build_load_heatmap
+from cronograma.workdays import WorkCalendar
+
+HOY = "2026-03-02"  # Lunes
+
+
+def _tarea(tid, responsables, dias, inicio, horas):
+    return {"Task ID": tid, "Project Name": "Alfa", "Task Name": tid, "Responsable(s)": responsables,
+            "Duration (Days)": dias, "Start Date": inicio, "Horas Invertidas": horas}
+
+
+def test_carga_respeta_los_dias_libres_de_cada_persona():
+    # Ana libre el jueves 5: sus tareas (y las que comparte) no se trabajan ese día
+    calendario = WorkCalendar(personal={"Ana": ["2026-03-05"]})
+    portafolio = compute(pd.DataFrame([
+        _tarea("T1", "Ana", 4, "2026-03-02", 8),
+        _tarea("T2", "Beto", 4, "2026-03-02", 4),
+        _tarea("T3", "Ana, Beto", 2, "2026-03-04", 8),
+    ]), HOY, calendario)
+    carga = portafolio.load()
+
+    assert carga.dates.strftime("%d").tolist() == ["02", "03", "04", "05", "06"]
+    assert carga.people.tolist() == ["Ana", "Beto"]
+    np.testing.assert_allclose(carga.hours, [
+        [2, 2, 4, 0, 4],
+        [1, 1, 3, 1, 2],
+    ])
+    assert carga.hours.sum(axis=1).tolist() == [12, 8]
+
+
+def test_dos_personas_dos_tareas_y_sobreasignacion():
+    portafolio = compute(pd.DataFrame([
+        _tarea("T1", "Ana", 3, "2026-03-02", 30),
+        _tarea("T2", "Ana, Beto", 3, "2026-03-03", 24),
+    ]), HOY, WorkCalendar())
+    carga = portafolio.load()
+
+    assert carga.people.tolist() == ["Ana", "Beto"]
+    assert carga.dates.strftime("%d").tolist() == ["02", "03", "04", "05"]
+    np.testing.assert_allclose(carga.hours, [
+        [10, 14, 14, 4],
+        [0, 4, 4, 4],
+    ])
+
+    sobre = carga.overallocated(8)
+    assert sobre["Responsable"].tolist() == ["Ana", "Ana", "Ana"]
+    assert sobre["Fecha"].dt.strftime("%d").tolist() == ["03", "04", "02"]
+    assert sobre["Exceso"].tolist() == [6.0, 6.0, 2.0]
+
+    resumen = carga.summary(8).set_index("Responsable")
+    assert resumen["Horas Totales"].tolist() == [42.0, 12.0]
+    assert resumen["Pico Diario"].tolist() == [14.0, 4.0]
+    assert resumen["Días Sobreasignados"].tolist() == [3, 0]
+
+    marcas = build_load_heatmap(carga, 8, HOY).data[0].customdata
+    assert (marcas != "").tolist() == [[True, True, True, False], [False, False, False, False]]
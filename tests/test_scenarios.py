@@ -0,0 +1,55 @@
+import random
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_portfolio
+from cronograma.headless import compute
+from cronograma.scenarios import SIN_DEPENDENCIAS, Scenario, _recalcular_todo, apply_scenario
+
+HOY = "2026-06-15"
+
+
+@pytest.fixture(scope="module")
+def portafolio():
+    return compute(generate_portfolio(400, projects=6, seed=3), HOY)
+
+
+def _escenario_al_azar(rng, ids, n):
+    cambios = {}
+    for tid in rng.sample(ids, n):
+        campo = rng.choice(["duracion", "retraso", "inicio", "depende", "depende"])
+        if campo == "duracion":
+            cambios[tid] = {"duracion": rng.randint(1, 30)}
+        elif campo == "retraso":
+            cambios[tid] = {"retraso": rng.randint(-5, 15)}
+        elif campo == "inicio":
+            cambios[tid] = {"inicio": pd.Timestamp(HOY) + pd.Timedelta(days=rng.randint(-60, 120))}
+        elif rng.random() < 0.2:
+            cambios[tid] = {"depende": SIN_DEPENDENCIAS}
+        else:
+            # Vínculos nuevos hacia cualquier tarea: algunos cierran ciclos
+            cambios[tid] = {"depende": ", ".join(rng.sample(ids, rng.randint(1, 2)))}
+    return Scenario("azar", cambios)
+
+
+def test_incremental_igual_a_recalcular_todo(portafolio):
+    store, result = portafolio.store, portafolio.result
+    hojas = [t.task_id for t in store if t.idx not in result.children]
+    antes = store.to_frame()
+    rng = random.Random(7)
+    for _ in range(60):
+        escenario = _escenario_al_azar(rng, hojas, rng.randint(1, 6))
+        incremental = apply_scenario(store, result, escenario, pd.Timestamp(HOY))
+        completo = _recalcular_todo(store, result, escenario, pd.Timestamp(HOY), incremental.ignoradas)
+        pd.testing.assert_frame_equal(incremental.to_frame(), completo.to_frame())
+    # La base no se toca
+    pd.testing.assert_frame_equal(store.to_frame(), antes)
+
+
+def test_tareas_inexistentes_y_padres_se_ignoran(portafolio):
+    store, result = portafolio.store, portafolio.result
+    padre = next(t.task_id for t in store if t.idx in result.children)
+    calculado = apply_scenario(store, result, Scenario("x", {"NO-EXISTE": {"duracion": 3}, padre: {"duracion": 3}}), pd.Timestamp(HOY))
+    assert sorted(calculado.ignoradas) == sorted(["NO-EXISTE", padre])
+    assert calculado.moved() == []
@@ -0,0 +1,150 @@
+import pandas as pd
+import pytest
+
+from cronograma.headless import compute
+from cronograma.scheduling import INFO_CICLO, INFO_PADRE, schedule
+from cronograma.store import Task, TaskStore
+from cronograma.workdays import WorkCalendar
+
+D0 = pd.Timestamp("2026-03-02")
+
+
+def _dia(n):
+    return D0 + pd.Timedelta(days=n)
+
+
+def _programar(*tareas):
+    """(task_id, parent_id, duración, inicio manual en días desde D0, depende de[, responsables, horas])."""
+    store = TaskStore(
+        Task(tid, padre, "P", tid, *(extra or ("", 0.0)), "", "",
+             None if inicio is None else _dia(inicio), dur, dep)
+        for tid, padre, dur, inicio, dep, *extra in tareas
+    )
+    return store, schedule(store, D0, WorkCalendar.calendar_days())
+
+
+def _fechas(store, tid):
+    task = store.tasks[store.index[tid]]
+    return (task.start - D0).days, (task.finish - D0).days
+
+
+def test_varias_predecesoras_toma_la_mas_restrictiva():
+    store, _ = _programar(
+        ("A", None, 3, 0, ""),
+        ("B", None, 5, 1, ""),
+        ("C", None, 2, None, "A, B"),
+    )
+    assert _fechas(store, "B") == (1, 6)
+    assert _fechas(store, "C") == (6, 8)
+
+
+@pytest.mark.parametrize("vinculo, dur, esperado", [
+    ("P", 2, (4, 6)),
+    ("P FS+2", 2, (6, 8)),
+    ("P FS-1", 2, (3, 5)),
+    ("P SS+1", 2, (1, 3)),
+    ("P SS-2", 2, (-2, 0)),
+    ("P FF+1", 3, (2, 5)),
+    ("P:FF-1", 3, (0, 3)),
+    ("P SF", 2, (-2, 0)),
+    ("P SF+3", 2, (1, 3)),
+    ("P SF-1", 2, (-3, -1)),
+])
+def test_tipos_de_vinculo_con_desfase(vinculo, dur, esperado):
+    # P ocupa los días 0-3 (fin exclusivo en el día 4)
+    store, _ = _programar(("P", None, 4, 0, ""), ("X", None, dur, 10, vinculo))
+    assert _fechas(store, "X") == esperado
+
+
+def test_ciclo_se_reporta_y_el_resto_se_programa():
+    store, result = _programar(
+        ("X", None, 2, 0, "Y"),
+        ("Y", None, 3, 5, "X"),
+        ("Z", None, 1, None, "Y"),
+        ("W", None, 4, 1, ""),
+    )
+    assert [sorted(c) for c in result.cycles] == [["X", "Y"]]
+    assert result.cycle_members == {store.index["X"], store.index["Y"]}
+    assert len(result.order) == len(store)
+
+    x, y = (store.tasks[store.index[t]] for t in ("X", "Y"))
+    assert x.dependency_info == y.dependency_info == INFO_CICLO
+    assert _fechas(store, "X") == (0, 2)
+    assert _fechas(store, "Y") == (5, 8)
+    assert _fechas(store, "Z") == (8, 9)
+    assert _fechas(store, "W") == (1, 5)
+    assert x.total_float is None and not x.critical
+    assert y.total_float is None and not y.critical
+
+
+def test_padre_acumula_fechas_horas_y_responsables():
+    store, result = _programar(
+        ("F", None, 1, None, ""),
+        ("F.1", "F", 3, 0, "", "Ana", 5.0),
+        ("F.2", "F", 2, 10, "", "Beto, Ana", 3.0),
+        ("F.3", "F", 4, None, "F.1", "", 1.5),
+    )
+    padre = store.tasks[store.index["F"]]
+    assert store.index["F"] in result.children
+    assert _fechas(store, "F.3") == (3, 7)
+    assert _fechas(store, "F") == (0, 12)
+    assert padre.duration == 12
+    assert padre.horas == 9.5
+    assert sorted(padre.responsables.split(", ")) == ["Ana", "Beto"]
+    assert padre.dependency_info == INFO_PADRE
+
+
+def test_holgura_y_ruta_critica_en_diamante():
+    #      ┌─ A (3) ─┐
+    # S (2)          E (1)
+    #      └─ B (5) ─┘
+    store, _ = _programar(
+        ("S", None, 2, 0, ""),
+        ("A", None, 3, None, "S"),
+        ("B", None, 5, None, "S"),
+        ("E", None, 1, None, "A, B"),
+    )
+    assert _fechas(store, "E") == (7, 8)
+    holgura = {t.task_id: t.total_float for t in store}
+    critica = {t.task_id: t.critical for t in store}
+    assert holgura == {"S": 0, "A": 2, "B": 0, "E": 0}
+    assert critica == {"S": True, "A": False, "B": True, "E": True}
+
+    frame = store.to_frame(["task_id", "total_float", "critical"])
+    assert frame["Total_Float"].tolist() == [0, 2, 0, 0]
+    assert frame["Critical"].tolist() == [True, False, True, True]
+
+
+# Tabla con la forma de la hoja original (cadena, inicio manual, subtareas) y
+# las fechas que daba el ``compute_dates`` recursivo de la versión anterior
+TABLA_BASE = pd.DataFrame([
+    {"Task ID": "T1", "Parent Task ID": None, "Project Name": "Proyecto Alfa", "Task Name": "Fase de Desarrollo", "Depends On": None, "Duration (Days)": 7, "Start Date": D0},
+    {"Task ID": "T2", "Parent Task ID": "T1", "Project Name": "Proyecto Alfa", "Task Name": "Frontend", "Depends On": None, "Duration (Days)": 3, "Start Date": D0},
+    {"Task ID": "T3", "Parent Task ID": "T1", "Project Name": "Proyecto Alfa", "Task Name": "Backend", "Depends On": "T2", "Duration (Days)": 4, "Start Date": None},
+    {"Task ID": "T9", "Parent Task ID": "T1", "Project Name": "Proyecto Alfa", "Task Name": "Pruebas", "Depends On": "T3", "Duration (Days)": 2, "Start Date": _dia(20)},
+    {"Task ID": "T4", "Parent Task ID": None, "Project Name": "Proyecto Beta", "Task Name": "Lanzamiento", "Depends On": None, "Duration (Days)": 5, "Start Date": _dia(10)},
+    {"Task ID": "T5", "Parent Task ID": None, "Project Name": "Proyecto Beta", "Task Name": "Reunión Flash", "Depends On": "T4", "Duration (Days)": 1, "Start Date": _dia(10)},
+    {"Task ID": "T6", "Parent Task ID": None, "Project Name": "Proyecto Beta", "Task Name": "Cierre", "Depends On": "T5", "Duration (Days)": 2, "Start Date": None},
+    {"Task ID": "T7", "Parent Task ID": None, "Project Name": "Proyecto Gamma", "Task Name": "Sin fecha", "Depends On": None, "Duration (Days)": 3, "Start Date": None},
+])
+FECHAS_BASE = {
+    "T1": ("2026-03-02", "2026-03-11", 9),
+    "T2": ("2026-03-02", "2026-03-05", 3),
+    "T3": ("2026-03-05", "2026-03-09", 4),
+    "T9": ("2026-03-09", "2026-03-11", 2),
+    "T4": ("2026-03-12", "2026-03-17", 5),
+    "T5": ("2026-03-17", "2026-03-18", 1),
+    "T6": ("2026-03-18", "2026-03-20", 2),
+    "T7": ("2026-03-02", "2026-03-05", 3),
+}
+
+
+def test_tabla_base_conserva_las_fechas_del_calculo_original():
+    portafolio = compute(TABLA_BASE, D0, WorkCalendar.calendar_days())
+    assert portafolio.result.cycles == []
+    sched = portafolio.sched_df.set_index("Task ID")
+    obtenidas = {
+        tid: (fila.Original_Start.date().isoformat(), fila.Original_Finish.date().isoformat(), fila.Duration)
+        for tid, fila in sched.iterrows()
+    }
+    assert obtenidas == FECHAS_BASE
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cronograma.workdays import WorkCalendar
+
+# Semana del lunes 2 de marzo de 2026: feriado el miércoles 4 y Ana libre el jueves 5
+LUN, MAR, MIE, JUE, VIE, SAB, DOM = (pd.Timestamp("2026-03-02") + pd.Timedelta(days=n) for n in range(7))
+LUN2 = LUN + pd.Timedelta(days=7)
+
+
+@pytest.fixture
+def calendario(tmp_path):
+    archivo = tmp_path / "feriados.csv"
+    archivo.write_text(
+        "Fecha,Responsable\n"
+        "2026-03-04,\n"
+        "2026-03-05,Ana\n"
+        "no es fecha,Beto\n"
+    )
+    return WorkCalendar.from_file(str(archivo))
+
+
+def test_from_file_separa_feriados_y_dias_libres(calendario):
+    assert calendario.holidays.tolist() == [MIE.date()]
+    assert list(calendario.personal) == ["Ana"]
+    assert calendario.personal["Ana"].tolist() == [JUE.date()]
+    assert not calendario.natural
+
+
+def test_from_file_sin_archivo_solo_fines_de_semana(tmp_path):
+    calendario = WorkCalendar.from_file(str(tmp_path / "no_existe.csv"))
+    assert len(calendario.holidays) == 0 and calendario.personal == {}
+    assert calendario.finish(VIE, 2) == LUN2 + pd.Timedelta(days=1)
+
+
+def test_dia_libre_solo_afecta_la_llave_de_esa_persona(calendario):
+    assert calendario.key("Beto, Ana") == ("Ana",)
+    assert calendario.key("Beto") == ()
+    assert calendario.key("") == ()
+    assert calendario.workdays(LUN, LUN2) == 4
+    assert calendario.workdays(LUN, LUN2, calendario.key("Beto")) == 4
+    assert calendario.workdays(LUN, LUN2, calendario.key("Ana")) == 3
+
+
+def test_inicio_en_fin_de_semana_o_feriado_pasa_al_siguiente_habil(calendario):
+    assert calendario.shift(SAB, 0) == LUN2
+    assert calendario.shift(DOM, 0) == LUN2
+    assert calendario.shift(MIE, 0) == JUE
+    assert calendario.shift(MIE, 0, ("Ana",)) == VIE
+    assert calendario.finish(MIE, 1) == VIE
+
+
+def test_shift_finish_y_start_for_last(calendario):
+    ana = ("Ana",)
+    assert calendario.shift(LUN, 2) == JUE
+    assert calendario.shift(LUN, 2, ana) == VIE
+    assert calendario.shift(JUE, -1) == MAR
+    # Fin exclusivo: el día siguiente al último hábil (aunque sea sábado)
+    assert calendario.finish(LUN, 3) == VIE
+    assert calendario.finish(LUN, 3, ana) == SAB
+    assert calendario.start_for_last(VIE, 3) == MAR
+    assert calendario.start_for_last(VIE, 3, ana) == LUN
+
+
+@pytest.mark.parametrize("dias", [1, 2, 3, 7])
+@pytest.mark.parametrize("key", [(), ("Ana",)])
+def test_regla_del_fin_exclusivo(calendario, dias, key):
+    for inicio in (LUN, MAR, JUE, VIE):
+        inicio = calendario.shift(inicio, 0, key)
+        fin = calendario.finish(inicio, dias, key)
+        assert calendario.workdays(inicio, fin, key) == dias
+        assert calendario.start_for_last(fin - pd.Timedelta(days=1), dias, key) == inicio
+
+
+def test_schedule_array_igual_al_calculo_escalar(calendario):
+    inicios = [LUN, MIE, SAB, JUE, VIE, DOM]
+    dias = [1, 3, 2, 4, 5, 1]
+    keys = [(), ("Ana",), (), ("Ana",), ("Ana",), ()]
+    ini, fin = calendario.schedule_array(inicios, dias, keys)
+    for i, (s, d, k) in enumerate(zip(inicios, dias, keys)):
+        esperado = calendario.shift(s, 0, k)
+        assert pd.Timestamp(ini[i]) == esperado
+        assert pd.Timestamp(fin[i]) == calendario.finish(esperado, d, k)
+    assert calendario.workdays_array(ini, fin, keys).tolist() == dias
+
+
+def test_ordinals_ida_y_vuelta(calendario):
+    habiles = [LUN, MAR, JUE, VIE, LUN2]
+    ordinales = calendario.ordinals(habiles)
+    assert np.diff(ordinales).tolist() == [1, 1, 1, 1]
+    assert [pd.Timestamp(d) for d in calendario.from_ordinals(ordinales)] == habiles
+    # Un día no hábil cuenta como el siguiente hábil
+    assert calendario.ordinals([SAB, MIE]).tolist() == calendario.ordinals([LUN2, JUE]).tolist()
+
+
+def test_calendar_days_son_dias_corridos():
+    corridos = WorkCalendar.calendar_days()
+    assert corridos.natural
+    assert corridos.shift(VIE, 1) == SAB
+    assert corridos.finish(VIE, 3) == LUN2
+    assert corridos.start_for_last(DOM, 3) == VIE
+    assert corridos.workdays(LUN, LUN2) == 7
+    assert corridos.key("Ana") == ()
+    ini, fin = corridos.schedule_array([SAB, MIE], [2, 5])
+    assert [pd.Timestamp(d) for d in ini] == [SAB, MIE]
+    assert [pd.Timestamp(d) for d in fin] == [LUN2, LUN2]
+    ordinales = corridos.ordinals([LUN, SAB, LUN2])
+    assert np.diff(ordinales).tolist() == [5, 2]
+    assert [pd.Timestamp(d) for d in corridos.from_ordinals(ordinales)] == [LUN, SAB, LUN2]